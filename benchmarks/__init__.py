@@ -0,0 +1 @@
+"""Benchmark harness; see benchmarks/run.py."""
@@ -0,0 +1,105 @@
+"""Synthetic Maven/Gradle projects with seeded deprecated API usage.
+
+Generation is deterministic for a given seed, so timings from different runs
+are taken on identical trees.
+"""
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+# (import, statement, EMT4J check type, category, priority) for APIs removed or deprecated after Java 8.
+DEPRECATED_APIS = [
+    ("sun.misc.BASE64Encoder", "String encoded = new BASE64Encoder().encode(data);",
+     "jdk.internal.api", "jdk_internal", "P1"),
+    ("javax.xml.bind.DatatypeConverter", "String hex = DatatypeConverter.printHexBinary(data);",
+     "jdk.removed.api.jaxb", "removed_api", "P1"),
+    ("java.lang.Integer", "Integer boxed = new Integer(data.length);",
+     "jdk.deprecated.api.boxing", "deprecated_api", "P3"),
+    ("java.lang.Thread", "Thread.currentThread().stop();",
+     "jdk.removed.api.thread", "removed_api", "P2"),
+    ("java.lang.SecurityManager", "SecurityManager sm = System.getSecurityManager();",
+     "jdk.deprecated.api.security", "deprecated_api", "P2"),
+    ("javax.annotation.PostConstruct", "PostConstruct marker = null;",
+     "jdk.removed.api.javaee", "removed_api", "P2"),
+]
+
+POM = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>bench</groupId>
+  <artifactId>{artifact}</artifactId>
+  <version>1.0</version>
+  <packaging>{packaging}</packaging>
+{modules}</project>
+"""
+
+
+@dataclass
+class GeneratedProject:
+    root: Path
+    build_tool: str
+    modules: List[str]
+    java_files: int
+    findings: List[Dict[str, Any]] = field(default_factory=list)  # EMT4J-shaped records
+
+
+def _java_source(package: str, name: str, api=None) -> str:
+    imports = f"import {api[0]};\n" if api else ""
+    body = f"        {api[1]}\n" if api else ""
+    return (f"package {package};\n\n{imports}\npublic class {name} {{\n"
+            f"    public void run(byte[] data) {{\n{body}    }}\n}}\n")
+
+
+def generate_project(root: Union[str, Path], files: int = 1000, modules: int = 4, build_tool: str = "maven",
+                     deprecated_ratio: float = 0.1, seed: int = 0) -> GeneratedProject:
+    """Write a multi-module project of `files` classes, deprecated_ratio of them using a removed API."""
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    names = [f"module-{i}" for i in range(max(1, modules))]
+    project = GeneratedProject(root=root, build_tool=build_tool, modules=names, java_files=files)
+
+    if build_tool == "maven":
+        module_xml = "".join(f"    <module>{n}</module>\n" for n in names)
+        (root / "pom.xml").write_text(POM.format(artifact="bench", packaging="pom",
+                                                 modules=f"  <modules>\n{module_xml}  </modules>\n"))
+    else:
+        (root / "settings.gradle").write_text("".join(f"include '{n}'\n" for n in names))
+        (root / "build.gradle").write_text("subprojects { apply plugin: 'java' }\n")
+
+    for i in range(files):
+        module = names[i % len(names)]
+        package = f"com.bench.m{i % len(names)}.p{(i // len(names)) % 50}"
+        name = f"Class{i}"
+        api = rng.choice(DEPRECATED_APIS) if rng.random() < deprecated_ratio else None
+        rel = Path(module) / "src/main/java" / package.replace(".", "/") / f"{name}.java"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_java_source(package, name, api))
+        if api:
+            project.findings.append({
+                "filePath": rel.as_posix(),
+                "lineNumber": 7,
+                "checkType": api[2],
+                "mainResultCode": api[3],
+                "level": api[4],
+                "desc": f"{api[0]} is not available after Java 8",
+                "howToFix": f"Replace {api[0]}",
+            })
+
+    for module in names:
+        module_dir = root / module
+        if build_tool == "maven":
+            (module_dir / "pom.xml").write_text(POM.format(artifact=module, packaging="jar", modules=""))
+        else:
+            (module_dir / "build.gradle").write_text("dependencies {}\n")
+    return project
+
+
+def write_emt4j_report(path: Union[str, Path], findings: List[Dict[str, Any]]) -> Path:
+    """Write findings as an EMT4J JSON report (findings under checkResults)."""
+    path = Path(path)
+    with open(path, "w") as f:
+        json.dump({"tool": "emt4j", "version": "0.8.0", "checkResults": findings}, f)
+    return path
@@ -0,0 +1,195 @@
+"""Offline benchmark suite for the toolchain.
+
+Times file discovery, build tool detection, EMT4J report parsing, model
+serialization, analysis with a faked EMT4J process and planning against the
+local stub LLM on a generated project. Results are written as JSON and can be
+compared with a previous run:
+
+    python -m benchmarks.run --files 10000 --modules 20 --output bench.json
+    python -m benchmarks.run --files 10000 --modules 20 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from utils.config import settings  # noqa: E402
+from utils.file_utils import detect_build_tool, list_java_files  # noqa: E402
+from utils.jvm_pool import JvmWorkerPool  # noqa: E402
+from analyzer.emt4j_wrapper import EMT4JAnalyzer  # noqa: E402
+from analyzer.report_parser import parse_emt4j_report  # noqa: E402
+from models.analysis import AnalysisReport  # noqa: E402
+from planner.ai_planner import AIMigrationPlanner  # noqa: E402
+from tests.stub_anthropic import StubAnthropicServer  # noqa: E402
+
+from .generator import GeneratedProject, generate_project, write_emt4j_report  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run fn `repeat` times (after one warm-up call) and return timing statistics in seconds."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "runs": repeat,
+    }
+
+
+@contextmanager
+def offline(report_path: Path, stub: StubAnthropicServer) -> Iterator[None]:
+    """Point the planner at the stub LLM and replace EMT4J with a copy of the generated report."""
+    def fake_emt4j(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        output = cmd[cmd.index("-o") + 1]
+        shutil.copyfile(report_path, output)
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    overrides = {
+        "ANTHROPIC_BASE_URL": stub.base_url,
+        "ANTHROPIC_API_KEE": "stub",
+        "RULE_PLANNER_ENABLED": False,
+        "PLAN_CACHE_ENABLED": False,
+        "ANALYSIS_CACHE_ENABLED": False,
+        "LLM_REQUESTS_PER_MINUTE": 0,
+        "LLM_TOKENS_PER_MINUTE": 0,
+    }
+    saved = {name: getattr(settings, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    try:
+        with patch.object(JvmWorkerPool, "run_emt4j", fake_emt4j):
+            yield
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
+
+
+def run_suite(project: GeneratedProject, repeat: int, work_dir: Path) -> Dict[str, Dict[str, float]]:
+    report_path = write_emt4j_report(work_dir / "emt4j-report.json", project.findings)
+    root = str(project.root)
+    results: Dict[str, Dict[str, float]] = {}
+
+    with StubAnthropicServer() as stub, offline(report_path, stub):
+        results["list_java_files"] = measure(lambda: list_java_files(root), repeat)
+        module_dirs = [root] + [str(project.root / m) for m in project.modules]
+        results["detect_build_tool"] = measure(lambda: [detect_build_tool(d) for d in module_dirs], repeat)
+        results["parse_emt4j_report"] = measure(lambda: parse_emt4j_report(report_path, root), repeat)
+
+        analyzer = EMT4JAnalyzer(use_cache=False)
+        report = analyzer.analyze_project(root, 8, 21)
+        results["analyze_project"] = measure(lambda: analyzer.analyze_project(root, 8, 21), repeat)
+
+        dumped = report.model_dump_json()
+        results["report_model_dump_json"] = measure(report.model_dump_json, repeat)
+        results["report_model_validate_json"] = measure(lambda: AnalysisReport.model_validate_json(dumped),
+                                                        repeat)
+
+        planner = AIMigrationPlanner(use_cache=False)
+        results["build_planning_prompt"] = measure(lambda: planner._build_planning_prompt(report), repeat)
+        response = json.dumps(stub.plan)
+        results["parse_plan_response"] = measure(lambda: planner._parse_response(response, report), repeat)
+        results["create_migration_plan"] = measure(lambda: planner.create_migration_plan(report), repeat)
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Names of benchmarks whose median grew by more than threshold (a fraction) over the baseline."""
+    regressions = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before and before["median"] > 0 and stats["median"] > before["median"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def format_table(current: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"{'benchmark':<28} {'median':>10} {'min':>10}" + (f" {'baseline':>10} {'change':>8}" if baseline else "")]
+    for name, stats in current["results"].items():
+        line = f"{name:<28} {stats['median'] * 1000:>8.2f}ms {stats['min'] * 1000:>8.2f}ms"
+        before = (baseline or {}).get("results", {}).get(name)
+        if before:
+            change = (stats["median"] / before["median"] - 1) * 100 if before["median"] else 0.0
+            line += f" {before['median'] * 1000:>8.2f}ms {change:>+7.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000, help="Number of generated .java files")
+    parser.add_argument("--modules", type=int, default=4, help="Number of build modules")
+    parser.add_argument("--build-tool", choices=("maven", "gradle"), default="maven")
+    parser.add_argument("--deprecated-ratio", type=float, default=0.1,
+                        help="Fraction of classes using a removed or deprecated API")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Fail when a median is this fraction slower than the baseline")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="java-modernize-bench-"))
+    try:
+        started = time.perf_counter()
+        project = generate_project(work_dir / "project", files=args.files, modules=args.modules,
+                                   build_tool=args.build_tool, deprecated_ratio=args.deprecated_ratio,
+                                   seed=args.seed)
+        generation_seconds = time.perf_counter() - started
+        current = {
+            "version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {"files": args.files, "modules": args.modules, "build_tool": args.build_tool,
+                       "deprecated_ratio": args.deprecated_ratio, "seed": args.seed, "repeat": args.repeat,
+                       "findings": len(project.findings)},
+            "generation_seconds": generation_seconds,
+            "results": run_suite(project, args.repeat, work_dir),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("params") != current["params"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+    print(format_table(current, baseline))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+    if baseline is not None:
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+from loguru import logger
+
+from utils.config import settings
+from utils.file_utils import ensure_directory
+from utils.metrics import get_metrics
+from utils.manifest import FileManifest
+from models.analysis import AnalysisReport
+
+
+class AnalysisCache:
+    """Persistent, size-bounded LRU cache of analysis reports keyed by source tree content.
+
+    Layout under ``ANALYSIS_CACHE_DIR``:
+      reports/<key>.json        cached AnalysisReport (mtime doubles as LRU timestamp)
+      projects/<digest>.json    last manifest + tree hash seen for a project path
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(os.path.expanduser(cache_dir or settings.ANALYSIS_CACHE_DIR))
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ANALYSIS_CACHE_MAX_MB * 1024 * 1024
+        self.reports_dir = self.cache_dir / "reports"
+        self.projects_dir = self.cache_dir / "projects"
+
+    def key_for(self, project_path: str, from_version: int, to_version: int,
+                emt4j_version: str) -> Tuple[str, FileManifest]:
+        """Compute the cache key for a project, returning it with the fresh manifest.
+
+        If no tracked file changed size or mtime since the last run, the stored
+        tree hash is reused without reading any file content.
+        """
+        manifest = FileManifest.scan(project_path)
+        previous, previous_hash = self._load_project_state(project_path)
+
+        if previous is not None and previous_hash and manifest.same_stats(previous):
+            manifest.hashes = previous.hashes
+            tree_hash = previous_hash
+        else:
+            tree_hash = manifest.tree_hash(previous)
+
+        raw = f"{tree_hash}|{from_version}|{to_version}|{emt4j_version}"
+        return hashlib.sha256(raw.encode()).hexdigest(), manifest
+
+    def get(self, key: str) -> Optional[AnalysisReport]:
+        path = self.reports_dir / f"{key}.json"
+        try:
+            data = path.read_text()
+        except FileNotFoundError:
+            get_metrics().inc("cache_requests_total", cache="analysis", result="miss")
+            return None
+        get_metrics().inc("cache_requests_total", cache="analysis", result="hit")
+        os.utime(path)  # mark as recently used
+        logger.info(f"Analysis cache hit ({key[:12]})")
+        return AnalysisReport.model_validate_json(data)
+
+    def put(self, key: str, report: AnalysisReport, project_path: str, manifest: FileManifest) -> None:
+        ensure_directory(self.reports_dir)
+        ensure_directory(self.projects_dir)
+        self._atomic_write(self.reports_dir / f"{key}.json", report.model_dump_json())
+        self._atomic_write(
+            self._project_state_path(project_path),
+            json.dumps({"tree_hash": manifest.tree_hash(), "manifest": manifest.to_dict()}),
+        )
+        self.evict()
+
+    def load_manifest(self, project_path: str) -> Optional[FileManifest]:
+        """Return the file manifest recorded at the project's last cached analysis."""
+        return self._load_project_state(project_path)[0]
+
+    def evict(self) -> None:
+        """Drop least recently used reports until the cache fits in max_bytes."""
+        if not self.reports_dir.exists():
+            return
+        entries = []
+        for entry in os.scandir(self.reports_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.debug(f"Evicted cached analysis {path}")
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        for directory in (self.reports_dir, self.projects_dir):
+            if directory.exists():
+                for entry in os.scandir(directory):
+                    os.remove(entry.path)
+
+    def _project_state_path(self, project_path: str) -> Path:
+        digest = hashlib.sha1(os.path.abspath(project_path).encode()).hexdigest()
+        return self.projects_dir / f"{digest}.json"
+
+    def _load_project_state(self, project_path: str) -> Tuple[Optional[FileManifest], Optional[str]]:
+        path = self._project_state_path(project_path)
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None, None
+        return FileManifest.from_dict(project_path, data.get("manifest", {})), data.get("tree_hash")
+
+    def _atomic_write(self, path: Path, content: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.replace(tmp, path)
@@ -1,18 +1,28 @@
 import os
 import subprocess
 import json
+import shutil
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 from loguru import logger
 
 from utils.config import settings
 from utils.file_utils import ensure_directory
+from utils.git_utils import snapshot_revision
+from utils.jvm_pool import get_worker_pool
 from models.analysis import AnalysisReport, EMT4JIssue
+from .cache import AnalysisCache
+from .report_parser import IssueIndex, parse_emt4j_report
 
 class EMT4JAnalyzer:
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None):
         self.emt4j_path = os.path.expanduser(settings.EMT4J_PATH)
         self.version = settings.EMT4J_VERSION
+        if use_cache is None:
+            use_cache = settings.ANALYSIS_CACHE_ENABLED
+        self.cache = AnalysisCache() if use_cache else None
 
     def install_emt4j(self) -> None:
         """Verify EMT4J is installed."""
@@ -24,12 +34,33 @@ class EMT4JAnalyzer:
         else:
             logger.info(f"Using EMT4J at {self.emt4j_path}")
 
-    def analyze_project(self, project_path: str, from_version: int, to_version: int) -> AnalysisReport:
-        """Run EMT4J analysis on the project."""
+    def analyze_project(self, project_path: str, from_version: int, to_version: int,
+                        timeout: Optional[float] = None, fallback: bool = True) -> AnalysisReport:
+        """Run EMT4J analysis on the project.
+
+        ``timeout`` bounds the EMT4J run in seconds; ``subprocess.TimeoutExpired``
+        is propagated so batch callers can record the project as timed out.
+        When EMT4J fails, a placeholder report is returned, or RuntimeError is
+        raised if ``fallback`` is False.
+        """
         logger.info(f"Analyzing {project_path} from Java {from_version} to {to_version}")
+
+        cache_key = manifest = None
+        if self.cache is not None:
+            cache_key, manifest = self.cache.key_for(project_path, from_version, to_version, self.version)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                # The key is content-only, so the hit may come from an identical tree elsewhere.
+                return cached.model_copy(update={
+                    "project_name": os.path.basename(os.path.normpath(project_path)),
+                    "source_revision": snapshot_revision(project_path),
+                })
         
         script_path = Path(self.emt4j_path) / "bin" / "analysis.sh"
-        output_file = Path("analysis_report.txt") # EMT4J usually outputs text or HTML, CLI might vary.
+        # Each run writes into its own scratch directory so concurrent fleet
+        # analyses never clobber each other's report file.
+        work_dir = Path(tempfile.mkdtemp(prefix="emt4j-"))
+        output_file = work_dir / "report.json"
         # Check actual EMT4J usage: analysis.sh -f 8 -t 11 -o output_file project
         
         # NOTE: 0.8.0 CLI usage might differ, usually: -f FROM -t TO -o OUTPUT target
@@ -37,37 +68,63 @@ class EMT4JAnalyzer:
             str(script_path),
             "-f", str(from_version),
             "-t", str(to_version),
-            "-o", "report.json",
+            "-o", str(output_file),
             project_path
         ]
         
         logger.info(f"Executing: {' '.join(cmd)}")
         
+        report = None
         try:
-             # Just run it for now. In a real integration, we'd need to check if it produces JSON directly
-             # or if we need to parse a text report. 
-             # For this "skeleton" step, we will run it, but still parse mock data if parsing fails
-             # or unimplemented. 
-             
-             # Let's try to run it.
-             # Note: EMT4J usually produces a report, but the format (HTML/JSON) depends on options.
-             # The CLI help would confirm. Assuming standard CLI args for now.
-             
-             result = subprocess.run(cmd, capture_output=True, text=True)
+             # EMT4J usually produces a report, but the format (HTML/JSON) depends on options.
+             # We request JSON and stream-parse it; anything else falls back to the mock below.
+             result = get_worker_pool().run_emt4j(cmd, capture_output=True, text=True, timeout=timeout)
              if result.returncode != 0:
                  logger.error(f"EMT4J failed: {result.stderr}")
                  # Ensure we don't crash the whole flow for the user if they're testing on an empty dir
+             else:
+                 report = self._build_report(output_file, project_path, from_version, to_version)
         
+        except subprocess.TimeoutExpired:
+            logger.error(f"EMT4J timed out after {timeout}s on {project_path}")
+            raise
         except Exception as e:
             logger.error(f"Failed to execute EMT4J: {e}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
-        # For the purpose of this scaffold, since we don't know the EXACT output format of 0.8.0 without running help,
-        # and parsing it is a separate task, we will keep the structured return but log the real execution.
-        
-        # Real-world: Parse 'report.json' if it exists.
-        # Fallback: Return the mock structure so the Planner doesn't crash.
-        
-        mock_report = AnalysisReport(
+        if report is None:
+            if not fallback:
+                raise RuntimeError(f"EMT4J analysis of {project_path} failed")
+            # Fallback: Return the mock structure so the Planner doesn't crash.
+            return self._fallback_report(project_path, from_version, to_version)
+
+        # Only cache results backed by a successful EMT4J run, never failure fallbacks.
+        if self.cache is not None and cache_key is not None and manifest is not None:
+            self.cache.put(cache_key, report, project_path, manifest)
+
+        report.source_revision = snapshot_revision(project_path)
+        return report
+
+    def _build_report(self, output_file: Path, project_path: str, from_version: int,
+                      to_version: int) -> AnalysisReport:
+        """Stream-parse the EMT4J output into a report (empty if EMT4J wrote no findings)."""
+        index = IssueIndex()
+        header: Dict[str, Any] = {}
+        if output_file.exists():
+            index, header = parse_emt4j_report(output_file, project_path)
+
+        return index.to_report(
+            project_name=os.path.basename(os.path.normpath(project_path)),
+            from_version=from_version,
+            to_version=to_version,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            raw_report=header or None,
+        )
+
+    def _fallback_report(self, project_path: str, from_version: int, to_version: int) -> AnalysisReport:
+        """Mock report used when EMT4J could not be run."""
+        return AnalysisReport(
             project_name=os.path.basename(project_path),
             from_version=from_version,
             to_version=to_version,
@@ -88,7 +145,6 @@ class EMT4JAnalyzer:
                     )
                 ]
             },
-            issues_by_priority={"P1": []}
+            issues_by_priority={"P1": []},
+            source_revision=snapshot_revision(project_path)
         )
-        
-        return mock_report
@@ -0,0 +1,144 @@
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from loguru import logger
+
+from utils.config import settings
+from utils.file_utils import ensure_directory
+from models.analysis import FleetAnalysisResult
+from models.serialization import save_report
+from .emt4j_wrapper import EMT4JAnalyzer
+
+
+CANCEL_POLL_SECONDS = 1.0
+
+
+def available_memory_mb() -> Optional[int]:
+    """Best-effort amount of free physical memory in MB (None if unknown)."""
+    try:
+        pages = os.sysconf("SC_AVPHYS_PAGES")
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+    return int(pages * page_size / (1024 * 1024))
+
+
+def resolve_max_workers(requested: Optional[int] = None) -> int:
+    """Cap fleet concurrency by CPU count and by memory available for EMT4J JVMs."""
+    limit = requested or settings.FLEET_MAX_WORKERS or (os.cpu_count() or 1)
+    limit = min(limit, os.cpu_count() or 1)
+
+    free_mb = available_memory_mb()
+    if free_mb is not None and settings.FLEET_MEMORY_PER_JOB_MB > 0:
+        limit = min(limit, free_mb // settings.FLEET_MEMORY_PER_JOB_MB)
+
+    return max(1, limit)
+
+
+def _report_file_names(project_paths: List[str], suffix: str = ".json") -> Dict[str, str]:
+    """Map each project to a unique report file name based on its directory name."""
+    names: Dict[str, str] = {}
+    seen: Dict[str, int] = {}
+    for path in project_paths:
+        base = os.path.basename(os.path.normpath(path)) or "project"
+        count = seen.get(base, 0)
+        seen[base] = count + 1
+        names[path] = f"{base}{suffix}" if count == 0 else f"{base}-{count}{suffix}"
+    return names
+
+
+class FleetAnalyzer:
+    """Run EMT4J over many projects on a bounded worker pool."""
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_workers = resolve_max_workers(max_workers)
+        self.timeout = timeout or settings.FLEET_PROJECT_TIMEOUT_SECONDS
+        self._index_lock = threading.Lock()
+
+    def analyze_fleet(
+        self,
+        project_paths: Iterable[str],
+        from_version: int,
+        to_version: int,
+        output_dir: str,
+        on_result: Optional[Callable[[FleetAnalysisResult], None]] = None,
+        check_cancelled: Optional[Callable[[], None]] = None,
+    ) -> List[FleetAnalysisResult]:
+        """Analyze every project, writing each report to disk as soon as it completes.
+
+        A ``fleet-index.jsonl`` line is appended per finished project so that
+        progress can be tailed while the scan is still running. ``check_cancelled``
+        is polled while projects run; if it (or ``on_result``) raises, projects
+        that have not started yet are cancelled and the exception propagates
+        once the running ones finish.
+        """
+        paths = list(dict.fromkeys(project_paths))
+        out = ensure_directory(output_dir)
+        file_names = _report_file_names(paths, settings.FLEET_REPORT_SUFFIX)
+        index_file = out / "fleet-index.jsonl"
+
+        logger.info(f"Analyzing {len(paths)} projects with {self.max_workers} workers "
+                    f"(timeout {self.timeout}s per project)")
+
+        results: List[FleetAnalysisResult] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="emt4j") as pool:
+            futures = {
+                pool.submit(self._analyze_one, path, from_version, to_version,
+                            out / file_names[path]): path
+                for path in paths
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        with self._index_lock, open(index_file, "a") as f:
+                            f.write(result.model_dump_json() + "\n")
+                        results.append(result)
+                        if on_result:
+                            on_result(result)
+                    if check_cancelled and pending:
+                        check_cancelled()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        completed = sum(1 for r in results if r.status == "completed")
+        logger.info(f"Fleet analysis finished: {completed}/{len(results)} projects completed")
+        return results
+
+    def _analyze_one(self, project_path: str, from_version: int, to_version: int,
+                     report_file: Path) -> FleetAnalysisResult:
+        started = time.monotonic()
+        try:
+            report = EMT4JAnalyzer().analyze_project(project_path, from_version, to_version,
+                                                     timeout=self.timeout)
+            save_report(report, report_file)
+            return FleetAnalysisResult(
+                project_path=project_path,
+                status="completed",
+                report_file=str(report_file),
+                total_issues=report.total_issues,
+                duration_seconds=time.monotonic() - started,
+            )
+        except subprocess.TimeoutExpired:
+            return FleetAnalysisResult(
+                project_path=project_path,
+                status="timeout",
+                duration_seconds=time.monotonic() - started,
+                error=f"EMT4J exceeded {self.timeout}s",
+            )
+        except Exception as e:
+            logger.error(f"Fleet analysis failed for {project_path}: {e}")
+            return FleetAnalysisResult(
+                project_path=project_path,
+                status="failed",
+                duration_seconds=time.monotonic() - started,
+                error=str(e),
+            )
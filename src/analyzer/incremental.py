@@ -0,0 +1,143 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+from loguru import logger
+
+from utils.git_utils import changed_paths_since, snapshot_revision
+from utils.manifest import BUILD_FILES, FileManifest, is_tracked_path
+from models.analysis import AnalysisReport, EMT4JIssue, unique_issues
+from .emt4j_wrapper import EMT4JAnalyzer
+
+
+def find_module_root(project_path: str, rel_path: str) -> str:
+    """Return the project-relative directory of the nearest build module containing rel_path.
+
+    Returns "." for the root module.
+    """
+    root = Path(project_path)
+    current = Path(rel_path).parent
+    while current != Path("."):
+        if any((root / current / build_file).exists() for build_file in BUILD_FILES):
+            return current.as_posix()
+        current = current.parent
+    return "."
+
+
+def _in_module(file_path: str, module: str) -> bool:
+    return module == "." or file_path == module or file_path.startswith(module + "/")
+
+
+class IncrementalAnalyzer:
+    """Re-run EMT4J only on modules touched since a previous analysis and merge the results."""
+
+    def __init__(self, analyzer: Optional[EMT4JAnalyzer] = None):
+        self.analyzer = analyzer or EMT4JAnalyzer()
+
+    def changed_files(self, project_path: str, previous: AnalysisReport) -> Optional[List[str]]:
+        """Find .java and build files changed since previous was produced, via git or the cached manifest.
+
+        Returns None when no baseline is available and a full rescan is needed.
+        """
+        if previous.source_revision:
+            changed = changed_paths_since(project_path, previous.source_revision)
+            if changed is not None:
+                return [p for p in changed if is_tracked_path(p)]
+
+        cache = self.analyzer.cache
+        if cache is not None:
+            baseline = cache.load_manifest(project_path)
+            if baseline is not None:
+                added, modified, removed = FileManifest.scan(project_path).changed_since(baseline)
+                return added + modified + removed
+
+        return None
+
+    def reanalyze(self, project_path: str, previous: AnalysisReport,
+                  changed_files: Optional[Iterable[str]] = None) -> AnalysisReport:
+        """Update previous in place with fresh results for the modules that changed."""
+        changed = list(changed_files) if changed_files is not None else self.changed_files(project_path, previous)
+        from_version, to_version = previous.from_version, previous.to_version
+
+        if changed is None:
+            logger.info("No baseline for incremental analysis, running a full scan")
+            return self.analyzer.analyze_project(project_path, from_version, to_version)
+        if not changed:
+            logger.info("No files changed since the previous analysis")
+            return previous
+
+        modules = self._affected_modules(project_path, changed)
+        if "." in modules:
+            logger.info("Root module changed, running a full scan")
+            return self.analyzer.analyze_project(project_path, from_version, to_version)
+
+        logger.info(f"{len(changed)} changed files in {len(modules)} modules: {sorted(modules)}")
+        return self.analyze_modules(project_path, previous, modules)
+
+    def analyze_modules(self, project_path: str, previous: AnalysisReport, modules: Set[str]) -> AnalysisReport:
+        """Run EMT4J on each (non-root) module and replace previous's issues for those modules.
+
+        A module EMT4J fails on keeps its previous issues, and the report keeps its
+        source revision so the next run picks the module up again.
+        """
+        from_version, to_version = previous.from_version, previous.to_version
+        fresh: List[EMT4JIssue] = []
+        rescanned: Set[str] = set()
+        for module in sorted(modules):
+            module_path = Path(project_path) / module
+            if module_path.exists():
+                try:
+                    module_report = self.analyzer.analyze_project(str(module_path), from_version, to_version,
+                                                                  fallback=False)
+                except RuntimeError as e:
+                    logger.warning(f"Keeping previous issues of module {module}: {e}")
+                    continue
+                fresh.extend(self._rebase_issues(module_report, project_path, module))
+            rescanned.add(module)  # a deleted module's issues are simply dropped
+
+        self._merge(previous, rescanned, fresh)
+        previous.timestamp = datetime.now(timezone.utc).isoformat()
+        if rescanned == modules:
+            previous.source_revision = snapshot_revision(project_path)
+        return previous
+
+    def _affected_modules(self, project_path: str, changed: List[str]) -> Set[str]:
+        modules = set()
+        for rel in changed:
+            if Path(rel).name in BUILD_FILES:
+                parent = Path(rel).parent.as_posix()
+                modules.add(parent)
+            else:
+                modules.add(find_module_root(project_path, rel))
+        return modules
+
+    def _rebase_issues(self, module_report: AnalysisReport, project_path: str,
+                       module: str) -> List[EMT4JIssue]:
+        """Collect a module report's unique issues with paths made relative to the project root."""
+        rebased = []
+        for issue in unique_issues(module_report):
+            if os.path.isabs(issue.file_path):
+                rel = Path(os.path.relpath(issue.file_path, project_path)).as_posix()
+            elif _in_module(issue.file_path, module):
+                rel = issue.file_path
+            else:
+                rel = f"{module}/{issue.file_path}"
+            rebased.append(issue.model_copy(update={"file_path": rel}))
+        return rebased
+
+    def _merge(self, report: AnalysisReport, modules: Set[str], fresh: List[EMT4JIssue]) -> None:
+        """Replace issues of the rescanned modules, mutating the existing lists in place."""
+        def stale(issue: EMT4JIssue) -> bool:
+            return any(_in_module(issue.file_path, m) for m in modules)
+
+        for index in (report.issues_by_category, report.issues_by_priority):
+            for issues in index.values():
+                issues[:] = [i for i in issues if not stale(i)]
+
+        for issue in fresh:
+            report.issues_by_category.setdefault(issue.category, []).append(issue)
+            report.issues_by_priority.setdefault(issue.priority, []).append(issue)
+
+        unique = unique_issues(report)
+        report.total_issues = len(unique)
+        report.auto_fixable_count = sum(1 for i in unique if i.auto_fixable)
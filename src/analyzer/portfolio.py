@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+
+from utils.config import settings
+from utils.file_utils import ensure_directory
+from utils.manifest import SKIP_DIRS
+from models.analysis import AnalysisReport
+from models.migration_plan import MigrationPlan
+from models.portfolio import (IngestSummary, IssuePage, PhasePage, PortfolioIssue, PortfolioPhase, ProjectPage,
+                              ProjectUsage)
+from models.serialization import is_document, load_report, open_document, split_suffix
+
+ISSUE_COLUMNS = ("project_name", "source_file", "file_path", "line_number", "issue_code", "priority", "category",
+                 "auto_fixable", "description")
+
+
+class PortfolioIndex:
+    """SQLite index of analysis reports and migration plans across a fleet of services.
+
+    Report and plan files are ingested incrementally: a file is re-read only when
+    its size or mtime changed, and files that disappeared from an ingested
+    directory are dropped. Issues are indexed by code, file, priority and
+    category, with an FTS5 table for free-text search; plan phases are indexed
+    by recipe.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            project_name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            ingested_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS issues (
+            id INTEGER PRIMARY KEY,
+            doc_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+            project_name TEXT NOT NULL,
+            source_file TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            line_number INTEGER NOT NULL,
+            issue_code TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            category TEXT NOT NULL,
+            auto_fixable INTEGER NOT NULL,
+            description TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS issues_code ON issues (issue_code, project_name);
+        CREATE INDEX IF NOT EXISTS issues_file ON issues (file_path);
+        CREATE INDEX IF NOT EXISTS issues_priority ON issues (priority, category);
+        CREATE INDEX IF NOT EXISTS issues_doc ON issues (doc_id);
+        CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5 (
+            issue_code, file_path, description, content='issues', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN
+            INSERT INTO issues_fts (rowid, issue_code, file_path, description)
+            VALUES (new.id, new.issue_code, new.file_path, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN
+            INSERT INTO issues_fts (issues_fts, rowid, issue_code, file_path, description)
+            VALUES ('delete', old.id, old.issue_code, old.file_path, old.description);
+        END;
+        CREATE TABLE IF NOT EXISTS phases (
+            id INTEGER PRIMARY KEY,
+            doc_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+            project_name TEXT NOT NULL,
+            source_file TEXT NOT NULL,
+            phase_number INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            risk_level TEXT NOT NULL,
+            estimated_effort_hours INTEGER NOT NULL,
+            recipes TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS phase_recipes (
+            phase_id INTEGER NOT NULL REFERENCES phases (id) ON DELETE CASCADE,
+            recipe TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS phases_doc ON phases (doc_id);
+        CREATE INDEX IF NOT EXISTS phase_recipes_recipe ON phase_recipes (recipe, phase_id);
+        CREATE INDEX IF NOT EXISTS phase_recipes_phase ON phase_recipes (phase_id);
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = os.path.expanduser(db_path or settings.PORTFOLIO_DB_PATH)
+        ensure_directory(Path(self.db_path).parent)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -- ingestion ---------------------------------------------------------
+
+    def ingest(self, paths: Iterable[Union[str, Path]]) -> IngestSummary:
+        """Index report and plan files, descending into directories; unchanged files are skipped."""
+        summary = IngestSummary()
+        for root in paths:
+            root = Path(root).resolve()
+            seen = set()
+            for path in self._document_files(root):
+                seen.add(str(path))
+                self._ingest_file(path, summary)
+            if root.is_dir():
+                summary.removed += self._remove_missing(root, seen)
+        logger.info(f"Portfolio ingest: {summary.reports} reports, {summary.plans} plans, "
+                    f"{summary.unchanged} unchanged, {summary.removed} removed")
+        return summary
+
+    @staticmethod
+    def _document_files(root: Path) -> Iterator[Path]:
+        if root.is_file():
+            yield root
+            return
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for name in sorted(filenames):
+                if is_document(name):
+                    yield Path(dirpath) / name
+
+    def _ingest_file(self, path: Path, summary: IngestSummary) -> None:
+        stat = path.stat()
+        conn = self._conn()
+        row = conn.execute("SELECT size, mtime_ns FROM documents WHERE path = ?", (str(path),)).fetchone()
+        if row is not None and (row["size"], row["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            summary.unchanged += 1
+            return
+
+        document = load_document(path)
+        if document is None:
+            summary.skipped.append(str(path))
+            if row is not None:  # no longer a report or plan
+                with conn:
+                    conn.execute("DELETE FROM documents WHERE path = ?", (str(path),))
+            return
+        with conn:
+            conn.execute("DELETE FROM documents WHERE path = ?", (str(path),))
+            kind = "report" if isinstance(document, AnalysisReport) else "plan"
+            doc_id = conn.execute(
+                "INSERT INTO documents (path, kind, project_name, size, mtime_ns, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), kind, document.project_name, stat.st_size, stat.st_mtime_ns, time.time()),
+            ).lastrowid
+            if doc_id is None:  # only unset when the INSERT did not run
+                raise sqlite3.DatabaseError(f"Could not index {path}")
+            if isinstance(document, AnalysisReport):
+                self._insert_issues(conn, doc_id, str(path), document)
+                summary.reports += 1
+            else:
+                self._insert_phases(conn, doc_id, str(path), document)
+                summary.plans += 1
+
+    @staticmethod
+    def _insert_issues(conn: sqlite3.Connection, doc_id: int, source: str, report: AnalysisReport) -> None:
+        rows: Dict[Tuple[str, int, str, str], Tuple[Any, ...]] = {}
+        for grouping in (report.issues_by_category, report.issues_by_priority):
+            for issues in grouping.values():
+                for i in issues:
+                    rows.setdefault((i.file_path, i.line_number, i.issue_code, i.category), (
+                        doc_id, report.project_name, source, i.file_path, i.line_number, i.issue_code,
+                        i.priority, i.category, int(i.auto_fixable), i.description,
+                    ))
+        conn.executemany(
+            "INSERT INTO issues (doc_id, " + ", ".join(ISSUE_COLUMNS) + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows.values(),
+        )
+
+    @staticmethod
+    def _insert_phases(conn: sqlite3.Connection, doc_id: int, source: str, plan: MigrationPlan) -> None:
+        for phase in plan.phases:
+            phase_id = conn.execute(
+                "INSERT INTO phases (doc_id, project_name, source_file, phase_number, name, risk_level, "
+                "estimated_effort_hours, recipes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, plan.project_name, source, phase.phase_number, phase.name, phase.risk_level,
+                 phase.estimated_effort_hours, json.dumps(phase.openrewrite_recipes)),
+            ).lastrowid
+            conn.executemany("INSERT INTO phase_recipes (phase_id, recipe) VALUES (?, ?)",
+                             [(phase_id, recipe) for recipe in dict.fromkeys(phase.openrewrite_recipes)])
+
+    def _remove_missing(self, root: Path, seen: set) -> int:
+        prefix = str(root).rstrip(os.sep) + os.sep
+        conn = self._conn()
+        stale = [row["path"] for row in conn.execute(
+            "SELECT path FROM documents WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        ) if row["path"] not in seen]
+        with conn:
+            conn.executemany("DELETE FROM documents WHERE path = ?", [(p,) for p in stale])
+        return len(stale)
+
+    # -- queries -----------------------------------------------------------
+
+    def issues(self, issue_code: Optional[str] = None, file_path: Optional[str] = None,
+               priority: Optional[str] = None, category: Optional[str] = None,
+               project_name: Optional[str] = None, text: Optional[str] = None,
+               offset: int = 0, limit: int = 100) -> IssuePage:
+        """Issues across all reports; file_path is a prefix, text a full-text (FTS5) query."""
+        where, params = self._issue_filters(issue_code, file_path, priority, category, project_name, text)
+        total = self._conn().execute(f"SELECT COUNT(*) FROM issues {where}", params).fetchone()[0]
+        rows = self._conn().execute(
+            f"SELECT {', '.join(ISSUE_COLUMNS)} FROM issues {where} "
+            "ORDER BY project_name, file_path, line_number, id LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        issues = [PortfolioIssue(**dict(row, auto_fixable=bool(row["auto_fixable"]))) for row in rows]
+        return IssuePage(total=total, offset=offset, issues=issues)
+
+    def projects(self, issue_code: Optional[str] = None, file_path: Optional[str] = None,
+                 priority: Optional[str] = None, category: Optional[str] = None,
+                 text: Optional[str] = None, offset: int = 0, limit: int = 100) -> ProjectPage:
+        """Services with at least one matching issue, e.g. everything still using an internal API."""
+        where, params = self._issue_filters(issue_code, file_path, priority, category, None, text)
+        grouped = (f"SELECT project_name, source_file, COUNT(*) AS issue_count, "
+                   f"COUNT(DISTINCT file_path) AS file_count FROM issues {where} GROUP BY source_file")
+        total = self._conn().execute(f"SELECT COUNT(*) FROM ({grouped})", params).fetchone()[0]
+        rows = self._conn().execute(f"{grouped} ORDER BY issue_count DESC, project_name LIMIT ? OFFSET ?",
+                                    (*params, limit, offset))
+        return ProjectPage(total=total, offset=offset, projects=[ProjectUsage(**dict(row)) for row in rows])
+
+    def phases(self, recipe: Optional[str] = None, project_name: Optional[str] = None,
+               risk_level: Optional[str] = None, offset: int = 0, limit: int = 100) -> PhasePage:
+        """Plan phases across all plans, optionally only those applying a recipe."""
+        clauses, params = [], []
+        if recipe:
+            clauses.append("id IN (SELECT phase_id FROM phase_recipes WHERE recipe = ?)")
+            params.append(recipe)
+        if project_name:
+            clauses.append("project_name = ?")
+            params.append(project_name)
+        if risk_level:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        total = self._conn().execute(f"SELECT COUNT(*) FROM phases {where}", params).fetchone()[0]
+        rows = self._conn().execute(
+            f"SELECT * FROM phases {where} ORDER BY project_name, source_file, phase_number LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        phases = [PortfolioPhase(project_name=row["project_name"], source_file=row["source_file"],
+                                 phase_number=row["phase_number"], name=row["name"], risk_level=row["risk_level"],
+                                 estimated_effort_hours=row["estimated_effort_hours"],
+                                 openrewrite_recipes=json.loads(row["recipes"]))
+                  for row in rows]
+        return PhasePage(total=total, offset=offset, phases=phases)
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        counts = dict(conn.execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall())
+        return {
+            "reports": counts.get("report", 0),
+            "plans": counts.get("plan", 0),
+            "issues": conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0],
+            "phases": conn.execute("SELECT COUNT(*) FROM phases").fetchone()[0],
+        }
+
+    @staticmethod
+    def _issue_filters(issue_code: Optional[str], file_path: Optional[str], priority: Optional[str],
+                       category: Optional[str], project_name: Optional[str],
+                       text: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (("issue_code", issue_code), ("priority", priority), ("category", category),
+                              ("project_name", project_name)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if file_path:
+            # A range on the prefix can use the issues_file index; the upper bound
+            # is the prefix with its last character incremented.
+            clauses.append("file_path >= ? AND file_path < ?")
+            params += [file_path, file_path[:-1] + chr(ord(file_path[-1]) + 1)]
+        if text:
+            clauses.append("id IN (SELECT rowid FROM issues_fts WHERE issues_fts MATCH ?)")
+            params.append(fts_query(text))
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def fts_query(text: str) -> str:
+    """Quote each word so input like "sun.misc" is matched literally; all words must match."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def load_document(path: Union[str, Path]) -> Optional[Union[AnalysisReport, MigrationPlan]]:
+    """Read a stored report or plan (.json / .jsonl, optionally compressed), or None if the file is neither."""
+    try:
+        if split_suffix(path)[0] == ".jsonl":
+            return load_report(path)
+        with open_document(path) as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.debug(f"Not indexing {path}: {e}")
+        return None
+    if not isinstance(data, dict):
+        return None
+    try:
+        if "issues_by_category" in data:
+            return AnalysisReport.model_validate(data)
+        if "phases" in data and "project_name" in data:
+            return MigrationPlan.model_validate(data)
+    except ValueError as e:
+        logger.warning(f"Not indexing {path}: {e}")
+    return None
+
+
+_portfolio_index: Optional[PortfolioIndex] = None
+_portfolio_index_lock = threading.Lock()
+
+
+def get_portfolio_index() -> PortfolioIndex:
+    """Return the process-wide portfolio index, opening PORTFOLIO_DB_PATH on first use."""
+    global _portfolio_index
+    with _portfolio_index_lock:
+        if _portfolio_index is None:
+            _portfolio_index = PortfolioIndex()
+        return _portfolio_index
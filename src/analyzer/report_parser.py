@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+from loguru import logger
+
+from models.analysis import AnalysisReport, EMT4JIssue
+
+# Keys under which an EMT4J JSON report may carry its list of findings.
+ISSUE_ARRAY_KEYS = {"issues", "results", "checkResults", "details", "items"}
+
+# EMT4J field name variants mapped onto EMT4JIssue fields.
+FIELD_ALIASES = {
+    "file_path": ("file_path", "filePath", "file", "location", "target"),
+    "line_number": ("line_number", "lineNumber", "line"),
+    "issue_code": ("issue_code", "issueCode", "code", "ruleCode", "checkType", "type"),
+    "priority": ("priority", "level", "severity"),
+    "description": ("description", "desc", "title", "message"),
+    "suggestion": ("suggestion", "solution", "howToFix", "advice"),
+    "category": ("category", "mainResultCode", "group"),
+    "auto_fixable": ("auto_fixable", "autoFixable"),
+}
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Minimal pull tokenizer that decodes one JSON value at a time from a text stream.
+
+    Only the current value is held in memory, so arrays with millions of
+    elements can be iterated with a flat memory profile.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in EMT4J report, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2  # grow reads so a large value is not re-decoded per chunk
+                continue
+            # A number at the very end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and not self.eof and isinstance(obj, (int, float)):
+                if self._fill(read_size):
+                    continue
+            self.pos = end
+            return obj
+
+    def array_items(self) -> Iterator[Any]:
+        """Yield elements of the array whose '[' is the next token."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Malformed array in EMT4J report near '{sep or 'EOF'}'")
+
+
+def iter_report_records(path: Union[str, Path], header: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream raw issue records from an EMT4J report without loading it whole.
+
+    Supports a top-level JSON array, a JSON object holding the findings under
+    one of ISSUE_ARRAY_KEYS, and JSON Lines (``.jsonl``). Scalar top-level
+    fields of an object report are collected into ``header`` when given.
+    """
+    with open(path, "r", encoding="utf-8") as fp:
+        if str(path).endswith(".jsonl"):
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        stream = _JsonStream(fp)
+        first = stream.peek()
+        if first == "[":
+            yield from stream.array_items()
+            return
+        if first != "{":
+            raise ValueError(f"Unsupported EMT4J report format in {path}")
+
+        stream.expect("{")
+        while stream.peek() not in ("}", ""):
+            key = stream.value()
+            stream.expect(":")
+            if key in ISSUE_ARRAY_KEYS and stream.peek() == "[":
+                yield from stream.array_items()
+            else:
+                value = stream.value()
+                if header is not None and not isinstance(value, (list, dict)):
+                    header[key] = value
+            if stream.peek() == ",":
+                stream.pos += 1
+
+
+def _field(record: Dict[str, Any], name: str, default: Any = None) -> Any:
+    for alias in FIELD_ALIASES[name]:
+        if alias in record and record[alias] is not None:
+            return record[alias]
+    return default
+
+
+def _normalize_priority(value: Any) -> str:
+    text = str(value).strip().upper()
+    if text.isdigit():
+        return f"P{text}"
+    return text or "P4"
+
+
+def record_to_issue(record: Dict[str, Any], project_path: Optional[str] = None) -> EMT4JIssue:
+    """Convert one raw EMT4J record into an EMT4JIssue with interned low-cardinality fields."""
+    file_path = str(_field(record, "file_path", ""))
+    if project_path and os.path.isabs(file_path):
+        file_path = Path(os.path.relpath(file_path, project_path)).as_posix()
+
+    issue_code = str(_field(record, "issue_code", "unknown"))
+    return EMT4JIssue(
+        file_path=sys.intern(file_path),
+        line_number=int(_field(record, "line_number", 0) or 0),
+        issue_code=sys.intern(issue_code),
+        priority=sys.intern(_normalize_priority(_field(record, "priority", "P4"))),
+        description=str(_field(record, "description", "")),
+        suggestion=str(_field(record, "suggestion", "")),
+        category=sys.intern(str(_field(record, "category", issue_code))),
+        auto_fixable=bool(_field(record, "auto_fixable", False)),
+    )
+
+
+class IssueIndex:
+    """Holds each issue exactly once plus compact positional indexes into that list."""
+
+    def __init__(self):
+        self.issues: List[EMT4JIssue] = []
+        self.by_category: Dict[str, List[int]] = {}
+        self.by_priority: Dict[str, List[int]] = {}
+        self.by_file: Dict[str, List[int]] = {}
+        self.auto_fixable_count = 0
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+    def add(self, issue: EMT4JIssue) -> int:
+        position = len(self.issues)
+        self.issues.append(issue)
+        self.by_category.setdefault(issue.category, []).append(position)
+        self.by_priority.setdefault(issue.priority, []).append(position)
+        self.by_file.setdefault(issue.file_path, []).append(position)
+        if issue.auto_fixable:
+            self.auto_fixable_count += 1
+        return position
+
+    def select(self, positions: List[int]) -> List[EMT4JIssue]:
+        return [self.issues[i] for i in positions]
+
+    def for_file(self, file_path: str) -> List[EMT4JIssue]:
+        return self.select(self.by_file.get(file_path, []))
+
+    def to_report(self, project_name: str, from_version: int, to_version: int, timestamp: str,
+                  raw_report: Optional[Dict[str, Any]] = None) -> AnalysisReport:
+        """Build an AnalysisReport whose category and priority lists share the same issue objects."""
+        return AnalysisReport(
+            project_name=project_name,
+            from_version=from_version,
+            to_version=to_version,
+            timestamp=timestamp,
+            total_issues=len(self.issues),
+            auto_fixable_count=self.auto_fixable_count,
+            issues_by_category={k: self.select(v) for k, v in self.by_category.items()},
+            issues_by_priority={k: self.select(v) for k, v in self.by_priority.items()},
+            raw_report=raw_report,
+        )
+
+
+def parse_emt4j_report(path: Union[str, Path], project_path: Optional[str] = None) -> Tuple[IssueIndex, Dict[str, Any]]:
+    """Stream an EMT4J report into an IssueIndex, returning it with the report's header fields."""
+    index = IssueIndex()
+    header: Dict[str, Any] = {}
+    skipped = 0
+    for record in iter_report_records(path, header):
+        if not isinstance(record, dict):
+            skipped += 1
+            continue
+        index.add(record_to_issue(record, project_path))
+    if skipped:
+        logger.warning(f"Skipped {skipped} malformed records in {path}")
+    logger.info(f"Parsed {len(index)} issues from {path}")
+    return index, header
@@ -0,0 +1,208 @@
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple, Union
+from loguru import logger
+
+from utils.config import settings
+from utils.git_utils import snapshot_revision
+from utils.manifest import SKIP_DIRS
+from models.analysis import AnalysisReport, EMT4JIssue
+from .emt4j_wrapper import EMT4JAnalyzer
+from .incremental import IncrementalAnalyzer, find_module_root
+from .report_parser import IssueIndex
+
+
+@dataclass(frozen=True)
+class ScanRule:
+    pattern: str  # regex over the raw source bytes
+    issue_code: str  # matches the planner's ISSUE_RULES keys where one exists
+    category: str
+    priority: str
+    removed_in: int  # first JDK version where the API is gone, encapsulated or deprecated for removal
+    description: str
+    suggestion: str
+    auto_fixable: bool = False
+
+
+SCAN_RULES = (
+    ScanRule(r"sun\.misc\.BASE64Encoder", "sun.misc.BASE64Encoder", "internal_api", "P1", 9,
+             "sun.misc.BASE64Encoder is a JDK internal API", "Use java.util.Base64", True),
+    ScanRule(r"sun\.misc\.BASE64Decoder", "sun.misc.BASE64Decoder", "internal_api", "P1", 9,
+             "sun.misc.BASE64Decoder is a JDK internal API", "Use java.util.Base64", True),
+    ScanRule(r"sun\.misc\.Unsafe", "sun.misc.Unsafe", "internal_api", "P2", 9,
+             "sun.misc.Unsafe is a JDK internal API", "Use VarHandle or supported APIs"),
+    ScanRule(r"sun\.reflect\.\w+", "sun.reflect", "internal_api", "P2", 9,
+             "sun.reflect classes are JDK internal APIs", "Use java.lang.invoke or StackWalker"),
+    ScanRule(r"com\.sun\.image\.codec\.jpeg", "com.sun.image.codec.jpeg", "removed_api", "P1", 9,
+             "com.sun.image.codec.jpeg was removed", "Use javax.imageio"),
+    ScanRule(r"javax\.xml\.bind\b", "javax.xml.bind", "removed_module", "P1", 11,
+             "JAXB (java.xml.bind) was removed from the JDK", "Add the Jakarta XML Binding dependency", True),
+    ScanRule(r"javax\.xml\.ws\b|javax\.jws\b", "javax.xml.ws", "removed_module", "P1", 11,
+             "JAX-WS (java.xml.ws) was removed from the JDK", "Add the Jakarta XML Web Services dependency", True),
+    ScanRule(r"javax\.activation\b", "javax.activation", "removed_module", "P1", 11,
+             "JavaBeans Activation Framework was removed from the JDK", "Add the Jakarta Activation dependency",
+             True),
+    ScanRule(r"javax\.annotation\.(?:PostConstruct|PreDestroy|Resource|Generated)\b", "javax.annotation",
+             "removed_module", "P2", 11, "Common annotations (java.xml.ws.annotation) were removed from the JDK",
+             "Add the Jakarta Annotations dependency", True),
+    ScanRule(r"org\.omg\.\w+|javax\.rmi\.CORBA", "java.corba", "removed_module", "P1", 11,
+             "CORBA (java.corba) was removed from the JDK", "Use a standalone ORB or remove CORBA usage"),
+    ScanRule(r"jdk\.nashorn\.\w+", "jdk.nashorn", "removed_module", "P1", 15,
+             "The Nashorn JavaScript engine was removed", "Add org.openjdk.nashorn or migrate scripts"),
+    ScanRule(r"java\.rmi\.activation\b", "java.rmi.activation", "removed_api", "P1", 17,
+             "RMI Activation was removed", "Replace RMI Activation"),
+    ScanRule(r"\bSecurityManager\b", "java.lang.SecurityManager", "deprecated_api", "P2", 17,
+             "SecurityManager is deprecated for removal", "Remove SecurityManager usage"),
+    ScanRule(r"\b\w*[Tt]hread\w*\.stop\(\s*\)", "java.lang.Thread.stop", "removed_api", "P2", 20,
+             "Thread.stop throws UnsupportedOperationException", "Use cooperative interruption"),
+    ScanRule(r"\bprotected\s+void\s+finalize\s*\(\s*\)", "java.lang.Object.finalize", "deprecated_api", "P3", 18,
+             "finalize() is deprecated for removal", "Use Cleaner or try-with-resources"),
+    ScanRule(r"\bnew\s+(?:Integer|Long|Short|Byte|Double|Float|Character|Boolean)\s*\(",
+             "java.lang.boxing.constructor", "deprecated_api", "P3", 16,
+             "Primitive wrapper constructors are deprecated for removal", "Use valueOf", True),
+)
+
+# One alternation over all rules; the named group that matched identifies the rule.
+_SCAN_PATTERN = re.compile(
+    b"|".join(f"(?P<r{i}>{rule.pattern})".encode() for i, rule in enumerate(SCAN_RULES))
+)
+
+# (project-relative path, rule index, line number)
+Finding = Tuple[str, int, int]
+
+
+def iter_java_files(root: Union[str, Path]) -> Iterator[str]:
+    """Yield .java paths below root with os.scandir, skipping build output and VCS dirs."""
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".java"):
+                        yield entry.path
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory: {e}")
+
+
+def scan_file(path: str) -> List[Tuple[int, int]]:
+    """(rule index, line) of the first match of each rule in a file, read through mmap."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                hits = {}
+                line, last = 1, 0
+                for match in _SCAN_PATTERN.finditer(data):
+                    if match.lastgroup is None:  # every alternative is a named group
+                        continue
+                    rule = int(match.lastgroup[1:])
+                    if rule in hits:
+                        continue
+                    line += data[last:match.start()].count(b"\n")
+                    last = match.start()
+                    hits[rule] = line
+                return sorted(hits.items())
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not scan {path}: {e}")
+        return []
+
+
+def _scan_batch(root: str, paths: List[str]) -> List[Finding]:
+    findings: List[Finding] = []
+    for path in paths:
+        rel = Path(os.path.relpath(path, root)).as_posix()
+        findings.extend((rel, rule, line) for rule, line in scan_file(path))
+    return findings
+
+
+class SourceScanner:
+    """Regex triage of Java sources for removed and internal JDK APIs, without starting a JVM.
+
+    Findings are preliminary: they name the files and modules that need a real
+    EMT4J run, not everything EMT4J would report (reflection, JVM options and
+    binary dependencies are invisible to a text scan).
+    """
+
+    def __init__(self, from_version: int, to_version: int, max_workers: Optional[int] = None):
+        self.from_version = from_version
+        self.to_version = to_version
+        self.max_workers = max_workers or settings.TRIAGE_MAX_WORKERS or os.cpu_count() or 1
+        self.rules = {i for i, rule in enumerate(SCAN_RULES) if from_version < rule.removed_in <= to_version}
+
+    def scan(self, project_path: Union[str, Path]) -> List[EMT4JIssue]:
+        root = os.fspath(project_path)
+        paths = list(iter_java_files(root))
+        batch = settings.TRIAGE_BATCH_SIZE
+        batches = [paths[i:i + batch] for i in range(0, len(paths), batch)]
+        if len(batches) > 1 and self.max_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                results = list(executor.map(_scan_batch, [root] * len(batches), batches))
+        else:
+            results = [_scan_batch(root, b) for b in batches]
+
+        issues = [self._to_issue(*finding) for findings in results for finding in findings
+                  if finding[1] in self.rules]
+        logger.info(f"Triage scanned {len(paths)} files, {len(issues)} preliminary issues")
+        return issues
+
+    def triage_report(self, project_path: Union[str, Path]) -> AnalysisReport:
+        index = IssueIndex()
+        for issue in self.scan(project_path):
+            index.add(issue)
+        return index.to_report(
+            project_name=os.path.basename(os.path.normpath(project_path)),
+            from_version=self.from_version,
+            to_version=self.to_version,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            raw_report={"source": "triage"},
+        )
+
+    def modules_to_analyze(self, project_path: Union[str, Path], report: AnalysisReport) -> Set[str]:
+        """Project-relative module dirs ("." for the root) holding at least one triage finding."""
+        files = {i.file_path for issues in report.issues_by_category.values() for i in issues}
+        return {find_module_root(os.fspath(project_path), f) for f in files}
+
+    def _to_issue(self, file_path: str, rule_index: int, line: int) -> EMT4JIssue:
+        rule = SCAN_RULES[rule_index]
+        return EMT4JIssue(
+            file_path=sys.intern(file_path),
+            line_number=line,
+            issue_code=rule.issue_code,
+            priority=rule.priority,
+            description=rule.description,
+            suggestion=rule.suggestion,
+            category=rule.category,
+            auto_fixable=rule.auto_fixable,
+        )
+
+
+def analyze_with_triage(analyzer: EMT4JAnalyzer, project_path: str, from_version: int,
+                        to_version: int) -> AnalysisReport:
+    """Scan sources first and run EMT4J only on the modules the scan flagged.
+
+    With no findings EMT4J is skipped entirely and the (empty) triage report is
+    returned; if the root module is flagged the whole project is analyzed.
+    """
+    scanner = SourceScanner(from_version, to_version)
+    report = scanner.triage_report(project_path)
+    modules = scanner.modules_to_analyze(project_path, report)
+    if not modules:
+        logger.info("Triage found no removed or internal API usage, skipping EMT4J")
+        report.source_revision = snapshot_revision(project_path)
+        return report
+    if "." in modules:
+        return analyzer.analyze_project(project_path, from_version, to_version)
+    logger.info(f"Triage flagged {len(modules)} modules for EMT4J: {sorted(modules)}")
+    report = IncrementalAnalyzer(analyzer).analyze_modules(project_path, report, modules)
+    report.raw_report = {"source": "triage", "emt4j_modules": sorted(modules)}
+    return report
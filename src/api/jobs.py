@@ -0,0 +1,261 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from utils.config import settings
+from utils.file_utils import ensure_directory
+from utils.metrics import get_metrics
+from models.job import JobEvent, JobInfo
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a cancel was requested."""
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of unfinished jobs reaches JOBS_MAX_PENDING."""
+
+
+class JobStore:
+    """SQLite persistence for job state so status survives API restarts."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT NOT NULL DEFAULT '',
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            request TEXT,
+            result TEXT,
+            error TEXT
+        )
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = os.path.expanduser(db_path)
+        ensure_directory(Path(self.db_path).parent)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self.SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def insert(self, job: JobInfo, request: Dict[str, Any]) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, created_at, request) VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.status, job.created_at, json.dumps(request)),
+            )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._conn() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[JobInfo]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_info(row, include_result) if row else None
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[JobInfo]:
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._to_info(row, False) for row in self._conn().execute(query, params)]
+
+    def mark_interrupted(self) -> int:
+        """Fail jobs left unfinished by a previous process."""
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by service restart', finished_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _to_info(row: sqlite3.Row, include_result: bool) -> JobInfo:
+        return JobInfo(
+            id=row["id"],
+            kind=row["kind"],
+            status=row["status"],
+            progress=row["progress"],
+            message=row["message"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            result=json.loads(row["result"]) if include_result and row["result"] else None,
+            error=row["error"],
+        )
+
+
+class JobReporter:
+    """Handle passed to running jobs for progress updates and cancellation checks."""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self._manager = manager
+        self.job_id = job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self.job_id in self._manager._cancel_requested
+
+    def check_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelled(self.job_id)
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        self.check_cancelled()
+        self._manager._store.update(self.job_id, progress=fraction, message=message)
+        self._manager._emit(self.job_id, "progress", {"progress": fraction, "message": message})
+
+    def partial(self, data: Any) -> None:
+        """Publish an intermediate result (e.g. one finished project of a fleet scan)."""
+        self._manager._emit(self.job_id, "partial", data)
+
+
+class JobManager:
+    """Bounded executor for long-running analyze/plan work with persisted state and event streams."""
+
+    def __init__(self, db_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self._store = JobStore(db_path or settings.JOBS_DB_PATH)
+        interrupted = self._store.mark_interrupted()
+        if interrupted:
+            logger.warning(f"Marked {interrupted} unfinished jobs from a previous run as failed")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or settings.JOBS_MAX_WORKERS,
+                                            thread_name_prefix="job")
+        self.max_pending = max_pending or settings.JOBS_MAX_PENDING
+        self._futures: Dict[str, Future] = {}
+        self._events: Dict[str, List[JobEvent]] = {}
+        self._cancel_requested: set = set()
+        self._lock = threading.RLock()
+
+    def submit(self, kind: str, request: Dict[str, Any], fn: Callable[[JobReporter], Any]) -> JobInfo:
+        """Queue fn for execution; its return value becomes the job result."""
+        with self._lock:
+            self._prune()
+            pending = sum(1 for f in self._futures.values() if not f.done())
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            job = JobInfo(id=uuid.uuid4().hex, kind=kind, status="queued", created_at=time.time())
+            self._store.insert(job, request)
+            self._events[job.id] = []
+            self._emit(job.id, "status", {"status": "queued"})
+            self._futures[job.id] = self._executor.submit(self._run, job.id, fn, job.kind, job.created_at)
+        return job
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[JobInfo]:
+        return self._store.get(job_id, include_result)
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[JobInfo]:
+        return self._store.list(limit, status)
+
+    def cancel(self, job_id: str) -> Optional[JobInfo]:
+        """Cancel a queued job immediately, or flag a running one to stop at its next checkpoint."""
+        job = self._store.get(job_id, include_result=False)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return job
+        self._cancel_requested.add(job_id)
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._finish(job_id, "cancelled")
+        return self._store.get(job_id, include_result=False)
+
+    def events_since(self, job_id: str, seq: int) -> List[JobEvent]:
+        return [e for e in self._events.get(job_id, []) if e.seq >= seq]
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _prune(self) -> None:
+        """Forget in-memory futures and event logs of finished jobs once the map grows large."""
+        if len(self._futures) <= self.max_pending:
+            return
+        for job_id, future in list(self._futures.items()):
+            if future.done():
+                del self._futures[job_id]
+                self._events.pop(job_id, None)
+
+    def _run(self, job_id: str, fn: Callable[[JobReporter], Any], kind: str = "", queued_at: float = 0.0) -> None:
+        if job_id in self._cancel_requested:
+            self._finish(job_id, "cancelled")
+            return
+        started = time.time()
+        metrics = get_metrics()
+        if queued_at:
+            metrics.observe("job_queue_wait_seconds", max(0.0, started - queued_at), kind=kind)
+        self._store.update(job_id, status="running", started_at=started)
+        self._emit(job_id, "status", {"status": "running"})
+        with metrics.timer("job_duration_seconds", kind=kind) as labels:
+            try:
+                result = fn(JobReporter(self, job_id))
+                labels["status"] = "completed"
+                self._finish(job_id, "completed", result=result)
+            except JobCancelled:
+                labels["status"] = "cancelled"
+                self._finish(job_id, "cancelled")
+            except Exception as e:
+                labels["status"] = "failed"
+                logger.error(f"Job {job_id} failed: {e}")
+                self._finish(job_id, "failed", error=str(e))
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        fields: Dict[str, Any] = {"status": status, "finished_at": time.time()}
+        if status == "completed":
+            fields["progress"] = 1.0
+            fields["result"] = result
+        if error:
+            fields["error"] = error
+        # Events first: an event stream that sees the terminal status must find them already logged.
+        if result is not None:
+            self._emit(job_id, "result", result)
+        if error:
+            self._emit(job_id, "error", {"error": error})
+        self._emit(job_id, "status", {"status": status})
+        self._store.update(job_id, **fields)
+        self._cancel_requested.discard(job_id)
+
+    def _emit(self, job_id: str, event_type: str, data: Any) -> None:
+        with self._lock:
+            events = self._events.setdefault(job_id, [])
+            events.append(JobEvent(job_id=job_id, seq=len(events), type=event_type, data=data))
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -1,32 +1,157 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import asyncio
+import json
+import os
+import time
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from analyzer.emt4j_wrapper import EMT4JAnalyzer
-from planner.ai_planner import AIMigrationPlanner
-from models.analysis import AnalysisReport
+from analyzer.fleet import FleetAnalyzer
+from analyzer.incremental import IncrementalAnalyzer
+from analyzer.portfolio import get_portfolio_index
+from analyzer.source_scanner import analyze_with_triage
+from planner.llm_client import PRIORITY_BATCH
+from planner.sharded_planner import select_planner
+from models.analysis import AnalysisReport, EMT4JIssue, FleetAnalysisResult
 from models.migration_plan import MigrationPlan
+from models.issue_table import IssueTable
+from models.job import JobInfo
+from models.portfolio import IngestSummary, IssuePage, PhasePage, ProjectPage
+from models.serialization import iter_report_lines
+from models.transformation import DiffPage
+from transformer.change_capture import ChangeCapture
+from pipeline.migration_pipeline import MigrationPipeline
+from utils.config import settings
+from utils.metrics import get_metrics
+from planner.plan_cache import get_plan_cache
+from .jobs import TERMINAL_STATUSES, JobQueueFull, JobReporter, get_job_manager
 
 app = FastAPI(title="Java Modernization Assistant API")
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request, labelled by route template so job ids do not explode the series."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    get_metrics().observe("http_request_duration_seconds", time.perf_counter() - started,
+                          method=request.method, route=getattr(route, "path", "unmatched"),
+                          status=str(response.status_code))
+    return response
+
 class AnalyzeRequest(BaseModel):
     project_path: str
     from_version: int = 8
     to_version: int = 21
+    use_cache: bool = True
+    triage: Optional[bool] = None
+
+class IncrementalAnalyzeRequest(BaseModel):
+    project_path: str
+    previous_report: AnalysisReport
+    changed_files: Optional[List[str]] = None
+
+class BatchAnalyzeRequest(BaseModel):
+    project_paths: List[str]
+    from_version: int = 8
+    to_version: int = 21
+    output_dir: str = "fleet-reports"
+    max_workers: Optional[int] = None
+    timeout: Optional[int] = None
+
+class IssueQueryRequest(BaseModel):
+    analysis_report: AnalysisReport
+    issue_code: Optional[List[str]] = None
+    category: Optional[List[str]] = None
+    priority: Optional[List[str]] = None
+    file_prefix: Optional[str] = None
+    auto_fixable: Optional[bool] = None
+    group_by: List[str] = ["category"]
+    offset: int = 0
+    limit: int = 100
+
+class IssueQueryResponse(BaseModel):
+    total: int
+    counts: Dict[str, int]
+    issues: List[EMT4JIssue]
 
 class PlanRequest(BaseModel):
     analysis_report: AnalysisReport
+    sharded: Optional[bool] = None
+
+class PortfolioIngestRequest(BaseModel):
+    paths: List[str]
+
+class SnapshotRequest(BaseModel):
+    project_path: str
+
+class MigrateRequest(BaseModel):
+    project_path: str
+    from_version: int = 8
+    to_version: int = 21
+    phases: Optional[List[int]] = None
+    validate_phases: bool = True
+    speculate: Optional[bool] = None
+    parallel_phases: Optional[bool] = None
+    resume: bool = True
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "service": "Java Modernization Assistant"}
 
+def _model_response(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes, skipping FastAPI's intermediate dict."""
+    return Response(model.model_dump_json(), media_type="application/json")
+
+def _report_response(report: AnalysisReport, http_request: Request) -> Response:
+    """A report as one JSON document, or as JSON Lines (header, then one issue per line) for
+    clients sending ``Accept: application/x-ndjson``."""
+    if "application/x-ndjson" in http_request.headers.get("accept", ""):
+        return StreamingResponse(iter_report_lines(report), media_type="application/x-ndjson")
+    return _model_response(report)
+
 @app.post("/api/analyze", response_model=AnalysisReport)
-def analyze_project(request: AnalyzeRequest):
+def analyze_project(request: AnalyzeRequest, http_request: Request):
     """Analyze a project and return the report."""
     try:
-        analyzer = EMT4JAnalyzer()
-        report = analyzer.analyze_project(request.project_path, request.from_version, request.to_version)
-        return report
+        analyzer = EMT4JAnalyzer(use_cache=request.use_cache)
+        if settings.ANALYSIS_TRIAGE_ENABLED if request.triage is None else request.triage:
+            report = analyze_with_triage(analyzer, request.project_path, request.from_version, request.to_version)
+        else:
+            report = analyzer.analyze_project(request.project_path, request.from_version, request.to_version)
+        return _report_response(report, http_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/analyze/incremental", response_model=AnalysisReport)
+def analyze_incremental(request: IncrementalAnalyzeRequest, http_request: Request):
+    """Re-analyze only the modules changed since a previous report."""
+    try:
+        report = IncrementalAnalyzer().reanalyze(request.project_path, request.previous_report,
+                                                 request.changed_files)
+        return _report_response(report, http_request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/issues/query", response_model=IssueQueryResponse)
+def query_issues(request: IssueQueryRequest):
+    """Filter and aggregate a report's issues using the columnar issue table."""
+    try:
+        table = IssueTable.from_report(request.analysis_report).filter(
+            issue_code=request.issue_code,
+            category=request.category,
+            priority=request.priority,
+            file_prefix=request.file_prefix,
+            auto_fixable=request.auto_fixable,
+        )
+        counts = table.count_by(*request.group_by) if len(table) and request.group_by else {}
+        return IssueQueryResponse(
+            total=len(table),
+            counts={"/".join(k) if isinstance(k, tuple) else str(k): v for k, v in counts.items()},
+            issues=table.page(request.offset, request.limit),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -34,12 +159,213 @@ def analyze_project(request: AnalyzeRequest):
 def generate_plan(request: PlanRequest):
     """Generate a migration plan from an analysis report."""
     try:
-        planner = AIMigrationPlanner()
+        planner = select_planner(request.analysis_report, request.sharded)
         plan = planner.create_migration_plan(request.analysis_report)
-        return plan
+        return _model_response(plan)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/plan/stream")
+def stream_plan(request: PlanRequest):
+    """Server-Sent Events: each phase as soon as Claude has written it, then the complete plan."""
+    planner = select_planner(request.analysis_report, request.sharded)
+
+    def event_stream():
+        try:
+            for event in planner.stream_migration_plan(request.analysis_report):
+                yield f"event: {event.type}\ndata: {event.model_dump_json(exclude_none=True)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.post("/api/snapshot")
+def snapshot_project(request: SnapshotRequest):
+    """Record the project's current tree; the returned ref can be passed to /api/diff as head."""
+    try:
+        return {"ref": ChangeCapture(request.project_path).snapshot()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/diff", response_model=DiffPage)
+def get_diff(project_path: str, base: str, head: str, offset: int = 0, limit: int = 50):
+    """Page through per-file diffs between two refs, e.g. a transform's baseline_ref and result_ref."""
+    if limit < 1 or limit > 500 or offset < 0:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 500")
+    try:
+        return ChangeCapture(project_path).diff_page(base, head, offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _check_page(offset: int, limit: int) -> None:
+    if limit < 1 or limit > 500 or offset < 0:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 500")
+
+@app.post("/api/portfolio/ingest", response_model=IngestSummary)
+def ingest_portfolio(request: PortfolioIngestRequest):
+    """Index stored reports and plans (files or directories); unchanged files are skipped."""
+    missing = [p for p in request.paths if not os.path.exists(p)]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Not found: {', '.join(missing)}")
+    try:
+        return get_portfolio_index().ingest(request.paths)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/portfolio/issues", response_model=IssuePage)
+def query_portfolio_issues(issue_code: Optional[str] = None, file_path: Optional[str] = None,
+                           priority: Optional[str] = None, category: Optional[str] = None,
+                           project_name: Optional[str] = None, text: Optional[str] = None,
+                           offset: int = 0, limit: int = 100):
+    """Issues across all indexed reports; file_path is a prefix, text a full-text query."""
+    _check_page(offset, limit)
+    try:
+        return get_portfolio_index().issues(issue_code, file_path, priority, category, project_name, text,
+                                            offset, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/portfolio/projects", response_model=ProjectPage)
+def query_portfolio_projects(issue_code: Optional[str] = None, file_path: Optional[str] = None,
+                             priority: Optional[str] = None, category: Optional[str] = None,
+                             text: Optional[str] = None, offset: int = 0, limit: int = 100):
+    """Services with matching issues, most affected first."""
+    _check_page(offset, limit)
+    try:
+        return get_portfolio_index().projects(issue_code, file_path, priority, category, text, offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/portfolio/phases", response_model=PhasePage)
+def query_portfolio_phases(recipe: Optional[str] = None, project_name: Optional[str] = None,
+                           risk_level: Optional[str] = None, offset: int = 0, limit: int = 100):
+    """Plan phases across all indexed plans, optionally only those applying a recipe."""
+    _check_page(offset, limit)
+    try:
+        return get_portfolio_index().phases(recipe, project_name, risk_level, offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/portfolio/stats")
+def portfolio_stats():
+    """Number of indexed reports, plans, issues and phases."""
+    return get_portfolio_index().stats()
+
+@app.get("/api/plan/cache")
+def plan_cache_stats():
+    """Hit/miss counters of the planner response cache."""
+    return get_plan_cache().stats()
+
+def _submit_job(kind: str, request: BaseModel, fn) -> JobInfo:
+    try:
+        return get_job_manager().submit(kind, request.model_dump(mode="json"), fn)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@app.post("/api/jobs/analyze", response_model=JobInfo, status_code=202)
+def submit_analyze_job(request: AnalyzeRequest):
+    """Queue an analysis; poll /api/jobs/{id} or stream /api/jobs/{id}/events."""
+    def run(reporter: JobReporter):
+        reporter.progress(0.0, f"Analyzing {request.project_path}")
+        analyzer = EMT4JAnalyzer(use_cache=request.use_cache)
+        if settings.ANALYSIS_TRIAGE_ENABLED if request.triage is None else request.triage:
+            report = analyze_with_triage(analyzer, request.project_path, request.from_version, request.to_version)
+        else:
+            report = analyzer.analyze_project(request.project_path, request.from_version, request.to_version)
+        return report.model_dump(mode="json")
+    return _submit_job("analyze", request, run)
+
+@app.post("/api/jobs/analyze/batch", response_model=JobInfo, status_code=202)
+def submit_batch_analyze_job(request: BatchAnalyzeRequest):
+    """Queue a fleet analysis; each finished project is streamed as a partial result."""
+    def run(reporter: JobReporter):
+        total = len(request.project_paths)
+        done = []
+        def on_result(result: FleetAnalysisResult):
+            done.append(result)
+            reporter.partial(result.model_dump(mode="json"))
+            reporter.progress(len(done) / total, f"{len(done)}/{total} projects analyzed")
+        fleet = FleetAnalyzer(max_workers=request.max_workers, timeout=request.timeout)
+        results = fleet.analyze_fleet(request.project_paths, request.from_version,
+                                      request.to_version, request.output_dir, on_result=on_result,
+                                      check_cancelled=reporter.check_cancelled)
+        return [r.model_dump(mode="json") for r in results]
+    return _submit_job("analyze_batch", request, run)
+
+@app.post("/api/jobs/plan", response_model=JobInfo, status_code=202)
+def submit_plan_job(request: PlanRequest):
+    """Queue plan generation for an analysis report."""
+    def run(reporter: JobReporter):
+        reporter.progress(0.0, "Generating migration plan")
+        planner = select_planner(request.analysis_report, request.sharded, priority=PRIORITY_BATCH)
+        plan = planner.create_migration_plan(request.analysis_report)
+        return plan.model_dump(mode="json")
+    return _submit_job("plan", request, run)
+
+@app.post("/api/jobs/migrate", response_model=JobInfo, status_code=202)
+def submit_migrate_job(request: MigrateRequest):
+    """Queue the full analyze -> plan -> transform -> validate pipeline; each finished phase is a partial result."""
+    def run(reporter: JobReporter):
+        pipeline = MigrationPipeline(
+            request.project_path, request.from_version, request.to_version,
+            phases=request.phases, validate=request.validate_phases, speculate=request.speculate,
+            parallel=request.parallel_phases, on_progress=reporter.progress,
+            on_phase=lambda outcome: reporter.partial(outcome.model_dump(mode="json")),
+        )
+        state = pipeline.run(resume=request.resume)
+        if state.status == "failed":
+            raise RuntimeError(state.error)
+        return state.model_dump(mode="json")
+    return _submit_job("migrate", request, run)
+
+@app.get("/api/jobs", response_model=List[JobInfo])
+def list_jobs(limit: int = 50, status: Optional[str] = None):
+    return get_job_manager().list(limit=min(limit, 500), status=status)
+
+@app.get("/api/jobs/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/api/jobs/{job_id}", response_model=JobInfo)
+def cancel_job(job_id: str):
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, since: int = 0):
+    """Server-Sent Events stream of a job's status, progress, partial and final results."""
+    manager = get_job_manager()
+    if await run_in_threadpool(manager.get, job_id, include_result=False) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        seq = since
+        while True:
+            for event in manager.events_since(job_id, seq):
+                yield f"id: {event.seq}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+                seq = event.seq + 1
+            job = await run_in_threadpool(manager.get, job_id, include_result=False)
+            if job is None:  # deleted from the store while streaming
+                break
+            if job.status in TERMINAL_STATUSES and not manager.events_since(job_id, seq):
+                if seq == since == 0:
+                    # Event log already pruned: send the final state once.
+                    yield f"event: status\ndata: {json.dumps({'status': job.status})}\n\n"
+                break
+            await asyncio.sleep(settings.JOBS_EVENT_POLL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/health")
 def health_check():
     return {"status": "healthy"}
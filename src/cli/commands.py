@@ -1,57 +1,131 @@
+"""CLI entry point.
+
+Commands import their dependencies when they run, so ``--help`` and light
+commands do not load the planner (anthropic/httpx), pandas or settings.
+tests/test_cli_startup.py enforces this.
+"""
 import click
-import json
 import os
-from pathlib import Path
+import time
 from loguru import logger
-from analyzer.emt4j_wrapper import EMT4JAnalyzer
-from planner.ai_planner import AIMigrationPlanner
-from transformer.openrewrite_wrapper import OpenRewriteTransformer
-from validator.compilation_validator import CompilationValidator
-from utils.logging_config import setup_logging
-from models.migration_plan import MigrationPlan
 
 @click.group()
 @click.option('--verbose', is_flag=True, help="Enable verbose logging")
-def cli(verbose):
+@click.option('--profile', type=click.Path(dir_okay=False),
+              help="Write timings, token usage and cache hits of this run to a JSON file")
+@click.pass_context
+def cli(ctx, verbose, profile):
     """Java Modernization Assistant CLI"""
+    from utils.logging_config import setup_logging
+
     if verbose:
         os.environ["LOG_LEVEL"] = "DEBUG"
     setup_logging()
+    if profile:
+        from utils.metrics import write_profile
+        started = time.perf_counter()
+
+        def dump_profile():
+            write_profile(profile, time.perf_counter() - started)
+            logger.info(f"Run profile written to {profile}")
+        ctx.call_on_close(dump_profile)
 
 @cli.command()
 @click.argument('project_path', type=click.Path(exists=True))
 @click.option('--from-version', default=8, help="Current Java version")
 @click.option('--to-version', default=21, help="Target Java version")
-@click.option('--output', default="analysis-report.json", help="Output file for report")
-def analyze(project_path, from_version, to_version, output):
+@click.option('--output', default="analysis-report.json",
+              help="Output file for report (.json or .jsonl, optionally .gz/.zst compressed)")
+@click.option('--no-cache', is_flag=True, help="Bypass the analysis cache")
+@click.option('--previous', type=click.Path(exists=True), help="Previous report to update incrementally")
+@click.option('--triage/--no-triage', default=None,
+              help="Pre-scan sources and run EMT4J only on modules using removed or internal APIs")
+def analyze(project_path, from_version, to_version, output, no_cache, previous, triage):
     """Analyze a legacy Java project."""
-    analyzer = EMT4JAnalyzer()
+    from analyzer.emt4j_wrapper import EMT4JAnalyzer
+    from analyzer.incremental import IncrementalAnalyzer
+    from analyzer.source_scanner import analyze_with_triage
+    from models.serialization import load_report, save_report
+    from utils.config import settings
+
+    analyzer = EMT4JAnalyzer(use_cache=not no_cache)
     analyzer.install_emt4j()
     
-    report = analyzer.analyze_project(project_path, from_version, to_version)
+    if previous:
+        previous_report = load_report(previous)
+        report = IncrementalAnalyzer(analyzer).reanalyze(project_path, previous_report)
+    elif settings.ANALYSIS_TRIAGE_ENABLED if triage is None else triage:
+        report = analyze_with_triage(analyzer, project_path, from_version, to_version)
+    else:
+        report = analyzer.analyze_project(project_path, from_version, to_version)
     
-    with open(output, 'w') as f:
-        f.write(report.model_dump_json(indent=2))
+    save_report(report, output)
         
     logger.info(f"Analysis complete. Report saved to {output}")
 
+@cli.command('analyze-fleet')
+@click.argument('project_paths', nargs=-1, type=click.Path(exists=True))
+@click.option('--projects-file', type=click.Path(exists=True), help="File listing one project path per line")
+@click.option('--from-version', default=8, help="Current Java version")
+@click.option('--to-version', default=21, help="Target Java version")
+@click.option('--output-dir', default="fleet-reports", help="Directory for per-project reports")
+@click.option('--max-workers', type=int, default=None, help="Maximum concurrent EMT4J runs")
+@click.option('--timeout', type=int, default=None, help="Per-project timeout in seconds")
+def analyze_fleet(project_paths, projects_file, from_version, to_version, output_dir, max_workers, timeout):
+    """Analyze many Java projects in parallel."""
+    from analyzer.emt4j_wrapper import EMT4JAnalyzer
+    from analyzer.fleet import FleetAnalyzer
+
+    paths = list(project_paths)
+    if projects_file:
+        with open(projects_file, 'r') as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not paths:
+        raise click.UsageError("Provide project paths or --projects-file")
+
+    EMT4JAnalyzer().install_emt4j()
+
+    fleet = FleetAnalyzer(max_workers=max_workers, timeout=timeout)
+    results = fleet.analyze_fleet(
+        paths, from_version, to_version, output_dir,
+        on_result=lambda r: logger.info(f"[{r.status}] {r.project_path} ({r.duration_seconds:.1f}s)")
+    )
+
+    failed = [r for r in results if r.status != "completed"]
+    logger.info(f"Fleet analysis complete. Reports saved to {output_dir}")
+    print(f"Fleet Summary: {len(results) - len(failed)} completed, {len(failed)} failed or timed out.")
+
 @cli.command()
 @click.argument('project_path')
 @click.option('--analysis', required=True, help="Path to analysis report")
-@click.option('--output', default="migration-plan.json", help="Output file for plan")
-def plan(project_path, analysis, output):
+@click.option('--output', default="migration-plan.json", help="Output file for plan (.json, optionally .gz/.zst)")
+@click.option('--sharded/--no-sharded', default=None, help="Plan in concurrent shards (default: auto by report size)")
+@click.option('--stream', is_flag=True, help="Print phases as Claude writes them")
+def plan(project_path, analysis, output, sharded, stream):
     """Generate a migration plan using AI."""
-    from models.analysis import AnalysisReport
+    from models.serialization import load_report, save_plan
+    from planner.sharded_planner import select_planner
     
-    with open(analysis, 'r') as f:
-        data = json.load(f)
-        report = AnalysisReport(**data)
+    report = load_report(analysis)
         
-    planner = AIMigrationPlanner()
-    migration_plan = planner.create_migration_plan(report)
+    planner = select_planner(report, sharded)
+    if stream:
+        migration_plan = None
+        for event in planner.stream_migration_plan(report):
+            if event.type == "phase":
+                phase = event.phase
+                print(f"Phase {phase.phase_number}: {phase.name} "
+                      f"({phase.risk_level}, {phase.estimated_effort_hours}h)")
+            elif event.type == "reset":
+                print(f"-- {event.message}, discarding the phases above")
+            else:
+                migration_plan = event.plan
+        if migration_plan is None:
+            raise click.ClickException("The plan stream ended without a plan")
+    else:
+        migration_plan = planner.create_migration_plan(report)
     
-    with open(output, 'w') as f:
-        f.write(migration_plan.model_dump_json(indent=2))
+    save_plan(migration_plan, output)
         
     logger.info(f"Plan generated. Saved to {output}")
     print(f"Plan Summary: {migration_plan.total_phases} phases, {migration_plan.total_estimated_hours} hours estimated.")
@@ -59,13 +133,44 @@ def plan(project_path, analysis, output):
 @cli.command()
 @click.argument('project_path')
 @click.option('--plan', required=True, help="Path to migration plan")
-@click.option('--phase', type=int, required=True, help="Phase number to execute")
+@click.option('--phase', type=int, help="Phase number to execute")
+@click.option('--phases', help="Phase range to execute in batched runs, e.g. 1-3")
+@click.option('--applied', help="Phases already applied to the project, e.g. 1-2 (with --phases)")
 @click.option('--dry-run', is_flag=True, help="Dry run mode")
-def transform(project_path, plan, phase, dry_run):
+def transform(project_path, plan, phase, phases, applied, dry_run):
     """Execute a transformation phase."""
-    with open(plan, 'r') as f:
-        data = json.load(f)
-        migration_plan = MigrationPlan(**data)
+    from models.serialization import load_plan
+    from transformer.batching import parse_phase_range
+    from transformer.openrewrite_wrapper import OpenRewriteTransformer
+
+    if (phase is None) == (phases is None):
+        raise click.UsageError("Provide exactly one of --phase or --phases")
+
+    migration_plan = load_plan(plan)
+
+    if phases is not None:
+        try:
+            numbers = parse_phase_range(phases)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--phases')
+        try:
+            applied_numbers = parse_phase_range(applied) if applied else []
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--applied')
+        selected = [p for p in migration_plan.phases if p.phase_number in numbers]
+        missing = sorted(set(numbers) - {p.phase_number for p in selected})
+        if missing:
+            logger.error(f"Phases {missing} not found in plan")
+            return
+
+        transformer = OpenRewriteTransformer()
+        results = transformer.run_phases(project_path, selected, dry_run, applied=applied_numbers)
+        for number, result in results.items():
+            if result.success:
+                logger.info(f"Phase {number}: transformation successful")
+            else:
+                logger.error(f"Phase {number}: transformation failed: {result.errors}")
+        return
         
     target_phase = next((p for p in migration_plan.phases if p.phase_number == phase), None)
     if not target_phase:
@@ -80,12 +185,82 @@ def transform(project_path, plan, phase, dry_run):
     else:
         logger.error(f"Transformation failed: {result.errors}")
 
+@cli.command()
+@click.argument('project_path', type=click.Path(exists=True))
+@click.option('--from-version', default=8, help="Current Java version")
+@click.option('--to-version', default=21, help="Target Java version")
+@click.option('--phases', help="Only run these plan phases, e.g. 1-3")
+@click.option('--no-validate', is_flag=True, help="Skip validation after each phase")
+@click.option('--no-speculate', is_flag=True, help="Do not run the next phase in a worktree during validation")
+@click.option('--parallel-phases/--serial-phases', default=None,
+              help="Run phases without mutual dependencies in parallel worktrees")
+@click.option('--restart', is_flag=True, help="Ignore the checkpoint of a previous run")
+@click.option('--output', default="migration-result.json", help="Output file for the pipeline state")
+def migrate(project_path, from_version, to_version, phases, no_validate, no_speculate, parallel_phases, restart, output):
+    """Run analyze, plan, transform and validate end to end, resuming from the last checkpoint."""
+    from models.serialization import save_model
+    from pipeline.migration_pipeline import MigrationPipeline
+    from transformer.batching import parse_phase_range
+
+    try:
+        selected = parse_phase_range(phases) if phases else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--phases')
+
+    pipeline = MigrationPipeline(
+        project_path, from_version, to_version, phases=selected, validate=not no_validate,
+        speculate=False if no_speculate else None, parallel=parallel_phases,
+        on_progress=lambda fraction, message: logger.info(f"[{fraction:.0%}] {message}"),
+    )
+    state = pipeline.run(resume=not restart)
+
+    save_model(state, output)
+
+    if state.status == "completed":
+        logger.success(f"Migration complete: {len(state.completed_phases)} phases applied. State saved to {output}")
+    else:
+        logger.error(f"Migration stopped: {state.error}. Re-run migrate to resume from the checkpoint.")
+
+@cli.command()
+@click.argument('project_path', type=click.Path(exists=True))
+@click.option('--base', required=True, help="Baseline ref logged by transform")
+@click.option('--head', default=None, help="Result ref (default: current working tree)")
+@click.option('--name-only', is_flag=True, help="List changed files only")
+@click.option('--offset', default=0, help="Skip this many changed files")
+@click.option('--limit', type=int, default=None, help="Show at most this many files")
+def diff(project_path, base, head, name_only, offset, limit):
+    """Show the changes a transformation made, file by file."""
+    from transformer.change_capture import ChangeCapture
+
+    capture = ChangeCapture(project_path)
+    head = head or capture.snapshot()
+    changes = capture.changed_files(base, head)
+    page = changes[offset:offset + limit if limit is not None else None]
+    if name_only:
+        for status, path in page:
+            click.echo(f"{status}\t{path}")
+        return
+    for file_diff in capture.iter_file_diffs(base, head, paths=[path for _, path in page]):
+        click.echo(file_diff.diff, nl=False)
+
 @cli.command()
 @click.argument('project_path')
-def validate(project_path):
+@click.option('--since', help="Validate incrementally against a baseline ref logged by transform")
+@click.option('--changed', multiple=True, help="Validate incrementally for these project-relative files")
+def validate(project_path, since, changed):
     """Validate project compilation and tests."""
+    from validator.compilation_validator import CompilationValidator
+
+    changed_files = list(changed) if changed else None
+    if since:
+        from transformer.change_capture import ChangeCapture
+
+        capture = ChangeCapture(project_path)
+        changed_files = sorted(set(changed_files or []) |
+                               {path for _, path in capture.changed_files(since, capture.snapshot())})
+
     validator = CompilationValidator()
-    result = validator.validate_project(project_path)
+    result = validator.validate_project(project_path, changed_files)
     
     if result.compilation_passed and result.unit_tests_passed:
         logger.success("Validation PASSED")
@@ -96,5 +271,90 @@ def validate(project_path):
         if not result.unit_tests_passed:
             logger.error(f"Tests failed: {result.failed_tests}")
 
+@cli.group()
+@click.option('--db', default=None, help="Portfolio database (default: PORTFOLIO_DB_PATH)")
+@click.pass_context
+def portfolio(ctx, db):
+    """Index and query reports and plans across many services."""
+    ctx.obj = db
+
+def _portfolio_index(ctx):
+    from analyzer.portfolio import PortfolioIndex, get_portfolio_index
+
+    return PortfolioIndex(ctx.obj) if ctx.obj else get_portfolio_index()
+
+def _echo_page_footer(page, shown):
+    click.echo(f"-- {page.offset + 1 if shown else 0}-{page.offset + shown} of {page.total}")
+
+@portfolio.command('ingest')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.pass_context
+def portfolio_ingest(ctx, paths):
+    """Index analysis reports and migration plans (files or directories); unchanged files are skipped."""
+    summary = _portfolio_index(ctx).ingest(paths)
+    click.echo(f"{summary.reports} reports, {summary.plans} plans indexed; {summary.unchanged} unchanged, "
+               f"{summary.removed} removed, {len(summary.skipped)} skipped")
+
+@portfolio.command('issues')
+@click.option('--code', help="Issue code, e.g. sun.misc.BASE64Encoder")
+@click.option('--file', 'file_path', help="File path prefix")
+@click.option('--priority', help="Priority, e.g. P1")
+@click.option('--category', help="Issue category")
+@click.option('--project', help="Project name")
+@click.option('--text', help="Full-text query over codes, paths and descriptions")
+@click.option('--offset', default=0, help="Skip this many issues")
+@click.option('--limit', default=50, help="Show at most this many issues")
+@click.pass_context
+def portfolio_issues(ctx, code, file_path, priority, category, project, text, offset, limit):
+    """List issues across all indexed reports."""
+    page = _portfolio_index(ctx).issues(code, file_path, priority, category, project, text, offset, limit)
+    for issue in page.issues:
+        click.echo(f"{issue.project_name}\t{issue.file_path}:{issue.line_number}\t{issue.issue_code}\t{issue.priority}")
+    _echo_page_footer(page, len(page.issues))
+
+@portfolio.command('projects')
+@click.option('--code', help="Issue code, e.g. sun.misc.BASE64Encoder")
+@click.option('--file', 'file_path', help="File path prefix")
+@click.option('--priority', help="Priority, e.g. P1")
+@click.option('--category', help="Issue category")
+@click.option('--text', help="Full-text query over codes, paths and descriptions")
+@click.option('--offset', default=0, help="Skip this many projects")
+@click.option('--limit', default=50, help="Show at most this many projects")
+@click.pass_context
+def portfolio_projects(ctx, code, file_path, priority, category, text, offset, limit):
+    """List services with matching issues, most affected first."""
+    page = _portfolio_index(ctx).projects(code, file_path, priority, category, text, offset, limit)
+    for usage in page.projects:
+        click.echo(f"{usage.project_name}\t{usage.issue_count} issues in {usage.file_count} files\t{usage.source_file}")
+    _echo_page_footer(page, len(page.projects))
+
+@portfolio.command('phases')
+@click.option('--recipe', help="OpenRewrite recipe name")
+@click.option('--project', help="Project name")
+@click.option('--risk', help="Risk level, e.g. HIGH")
+@click.option('--offset', default=0, help="Skip this many phases")
+@click.option('--limit', default=50, help="Show at most this many phases")
+@click.pass_context
+def portfolio_phases(ctx, recipe, project, risk, offset, limit):
+    """List plan phases across all indexed plans."""
+    page = _portfolio_index(ctx).phases(recipe, project, risk, offset, limit)
+    for phase in page.phases:
+        click.echo(f"{phase.project_name}\tphase {phase.phase_number}: {phase.name}\t{phase.risk_level}\t"
+                   f"{', '.join(phase.openrewrite_recipes)}")
+    _echo_page_footer(page, len(page.phases))
+
+@cli.command('stop-daemons')
+@click.argument('project_paths', nargs=-1, type=click.Path(exists=True, file_okay=False))
+def stop_daemons(project_paths):
+    """Stop Maven/Gradle daemons kept warm by the worker pool.
+
+    Gradle daemons of projects built by earlier runs are found through
+    JVM_POOL_DAEMON_PROJECTS_FILE; PROJECT_PATHS adds projects to stop explicitly.
+    """
+    from utils.jvm_pool import get_worker_pool
+
+    get_worker_pool().shutdown(project_paths)
+    logger.info("Build daemons stopped")
+
 if __name__ == '__main__':
     cli()
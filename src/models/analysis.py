@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
 
 class EMT4JIssue(BaseModel):
@@ -22,3 +22,28 @@ class AnalysisReport(BaseModel):
     issues_by_category: Dict[str, List[EMT4JIssue]]
     issues_by_priority: Dict[str, List[EMT4JIssue]]
     raw_report: Optional[Dict[str, Any]] = None
+    source_revision: Optional[str] = None  # git snapshot the report was computed from
+
+def issue_key(issue: EMT4JIssue) -> Tuple[str, int, str, str]:
+    return (issue.file_path, issue.line_number, issue.issue_code, issue.category)
+
+def unique_issues(report: AnalysisReport) -> List[EMT4JIssue]:
+    """Each issue of a report once, deduplicated by value.
+
+    Reports built by the analyzer share issue objects between both groupings,
+    but reports loaded from JSON hold separate copies, so identity is not enough.
+    """
+    unique: Dict[Tuple[str, int, str, str], EMT4JIssue] = {}
+    for grouping in (report.issues_by_category, report.issues_by_priority):
+        for issues in grouping.values():
+            for issue in issues:
+                unique.setdefault(issue_key(issue), issue)
+    return list(unique.values())
+
+class FleetAnalysisResult(BaseModel):
+    project_path: str
+    status: str  # "completed" | "failed" | "timeout"
+    report_file: Optional[str] = None
+    total_issues: int = 0
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+from .analysis import AnalysisReport, EMT4JIssue, unique_issues
+
+# Low-cardinality text columns stored as pandas categoricals (codes + one copy of each string).
+CATEGORICAL_COLUMNS = ("file_path", "issue_code", "priority", "category", "description", "suggestion")
+COLUMNS = ("file_path", "line_number", "issue_code", "priority", "description",
+           "suggestion", "category", "auto_fixable")
+
+FilterValue = Union[str, Sequence[str], None]
+
+
+class IssueTable:
+    """Columnar store of EMT4J issues with vectorized filter / group-by / count.
+
+    Strings are interned as categoricals, so 100k issues spread over a few
+    hundred files and rules cost a few integer arrays rather than 100k
+    pydantic objects. A table built from a report keeps the report's raw_report
+    and source_revision, so to_report can carry them over.
+    """
+
+    def __init__(self, frame: pd.DataFrame, raw_report: Optional[Dict[str, Any]] = None,
+                 source_revision: Optional[str] = None):
+        self.frame = frame
+        self.raw_report = raw_report
+        self.source_revision = source_revision
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[EMT4JIssue]) -> "IssueTable":
+        columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        for issue in issues:
+            for name in COLUMNS:
+                columns[name].append(getattr(issue, name))
+        return cls(cls._frame_from_columns(columns))
+
+    @classmethod
+    def from_report(cls, report: AnalysisReport) -> "IssueTable":
+        """Build a table from a report, counting issues listed under both groupings once."""
+        table = cls.from_issues(unique_issues(report))
+        table.raw_report, table.source_revision = report.raw_report, report.source_revision
+        return table
+
+    @staticmethod
+    def _frame_from_columns(columns: Dict[str, List[Any]]) -> pd.DataFrame:
+        frame = pd.DataFrame({
+            name: pd.Categorical(columns[name]) if name in CATEGORICAL_COLUMNS else columns[name]
+            for name in COLUMNS
+        })
+        frame["line_number"] = frame["line_number"].astype("int32")
+        frame["auto_fixable"] = frame["auto_fixable"].astype(bool)
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def filter(
+        self,
+        issue_code: FilterValue = None,
+        category: FilterValue = None,
+        priority: FilterValue = None,
+        file_path: FilterValue = None,
+        file_prefix: Optional[str] = None,
+        auto_fixable: Optional[bool] = None,
+    ) -> "IssueTable":
+        """Return the issues matching every given criterion (lists match any of their values)."""
+        mask = pd.Series(True, index=self.frame.index)
+        for column, value in (("issue_code", issue_code), ("category", category),
+                              ("priority", priority), ("file_path", file_path)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            mask &= self.frame[column].isin(values)
+        if file_prefix:
+            mask &= self.frame["file_path"].astype(str).str.startswith(file_prefix)
+        if auto_fixable is not None:
+            mask &= self.frame["auto_fixable"] == auto_fixable
+        return IssueTable(self.frame[mask], self.raw_report, self.source_revision)
+
+    def count_by(self, *columns: str) -> Dict[Any, int]:
+        """Count issues per value (or value tuple) of the given columns, largest first."""
+        if not columns:
+            raise ValueError("count_by needs at least one column")
+        counts = self.frame.groupby(list(columns), observed=True).size().sort_values(ascending=False)
+        return {key: int(count) for key, count in counts.items()}
+
+    def top(self, column: str, limit: int = 10) -> List[Tuple[str, int]]:
+        return list(self.count_by(column).items())[:limit]
+
+    def page(self, offset: int = 0, limit: int = 100) -> List[EMT4JIssue]:
+        """Materialize a slice of the table as EMT4JIssue models."""
+        return list(self._iter_issues(self.frame.iloc[offset:offset + limit]))
+
+    def to_issues(self) -> Iterator[EMT4JIssue]:
+        return self._iter_issues(self.frame)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_issues": len(self),
+            "auto_fixable_count": int(self.frame["auto_fixable"].sum()),
+            "by_category": self.count_by("category") if len(self) else {},
+            "by_priority": self.count_by("priority") if len(self) else {},
+        }
+
+    def to_report(self, project_name: str, from_version: int, to_version: int, timestamp: str,
+                  raw_report: Optional[Dict[str, Any]] = None,
+                  source_revision: Optional[str] = None) -> AnalysisReport:
+        """Rebuild an AnalysisReport; each issue object is shared by its category and priority lists.
+
+        raw_report and source_revision default to those of the report the table was built from.
+        """
+        by_category: Dict[str, List[EMT4JIssue]] = {}
+        by_priority: Dict[str, List[EMT4JIssue]] = {}
+        for issue in self.to_issues():
+            by_category.setdefault(issue.category, []).append(issue)
+            by_priority.setdefault(issue.priority, []).append(issue)
+        return AnalysisReport(
+            project_name=project_name,
+            from_version=from_version,
+            to_version=to_version,
+            timestamp=timestamp,
+            total_issues=len(self),
+            auto_fixable_count=int(self.frame["auto_fixable"].sum()),
+            issues_by_category=by_category,
+            issues_by_priority=by_priority,
+            raw_report=raw_report if raw_report is not None else self.raw_report,
+            source_revision=source_revision if source_revision is not None else self.source_revision,
+        )
+
+    @staticmethod
+    def _iter_issues(frame: pd.DataFrame) -> Iterator[EMT4JIssue]:
+        for row in frame.itertuples(index=False):
+            yield EMT4JIssue(
+                file_path=row.file_path,
+                line_number=int(row.line_number),
+                issue_code=row.issue_code,
+                priority=row.priority,
+                description=row.description,
+                suggestion=row.suggestion,
+                category=row.category,
+                auto_fixable=bool(row.auto_fixable),
+            )
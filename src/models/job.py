@@ -0,0 +1,20 @@
+from typing import Any, Optional
+from pydantic import BaseModel
+
+class JobInfo(BaseModel):
+    id: str
+    kind: str
+    status: str  # "queued" | "running" | "completed" | "failed" | "cancelled"
+    progress: float = 0.0
+    message: str = ""
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class JobEvent(BaseModel):
+    job_id: str
+    seq: int
+    type: str  # "status" | "progress" | "partial" | "result" | "error"
+    data: Any = None
@@ -21,3 +21,9 @@ class MigrationPlan(BaseModel):
     testing_strategy: str
     rollback_plan: str
     risk_summary: str
+
+class PlanStreamEvent(BaseModel):
+    type: str  # "phase" | "reset" | "plan"; "reset" discards the phases streamed so far
+    phase: Optional[MigrationPhase] = None
+    plan: Optional[MigrationPlan] = None
+    message: Optional[str] = None
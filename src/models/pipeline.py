@@ -0,0 +1,29 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from .analysis import AnalysisReport
+from .migration_plan import MigrationPlan
+from .transformation import TransformationResult, ValidationResult
+
+class PhaseOutcome(BaseModel):
+    phase_number: int
+    transformation: TransformationResult
+    validation: Optional[ValidationResult] = None
+    speculative: bool = False  # changes came from a run in a worktree while the previous phase validated
+
+class PipelineState(BaseModel):
+    project_path: str
+    from_version: int
+    to_version: int
+    status: str = "running"  # "running" | "completed" | "failed"
+    stage: str = "analyze"   # "analyze" | "plan" | "transform" | "done"
+    report: Optional[AnalysisReport] = None
+    plan: Optional[MigrationPlan] = None
+    phases: List[PhaseOutcome] = []
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+    @property
+    def completed_phases(self) -> List[int]:
+        return [p.phase_number for p in self.phases
+                if p.transformation.success and (p.validation is None or
+                                                 (p.validation.compilation_passed and p.validation.unit_tests_passed))]
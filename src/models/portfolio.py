@@ -0,0 +1,50 @@
+from typing import List
+from pydantic import BaseModel
+
+class PortfolioIssue(BaseModel):
+    project_name: str
+    source_file: str  # report the issue was ingested from
+    file_path: str
+    line_number: int = 0
+    issue_code: str
+    priority: str
+    category: str
+    auto_fixable: bool = False
+    description: str = ""
+
+class ProjectUsage(BaseModel):
+    project_name: str
+    source_file: str
+    issue_count: int
+    file_count: int
+
+class PortfolioPhase(BaseModel):
+    project_name: str
+    source_file: str  # plan the phase was ingested from
+    phase_number: int
+    name: str
+    risk_level: str
+    estimated_effort_hours: int
+    openrewrite_recipes: List[str]
+
+class IssuePage(BaseModel):
+    total: int
+    offset: int
+    issues: List[PortfolioIssue]
+
+class ProjectPage(BaseModel):
+    total: int
+    offset: int
+    projects: List[ProjectUsage]
+
+class PhasePage(BaseModel):
+    total: int
+    offset: int
+    phases: List[PortfolioPhase]
+
+class IngestSummary(BaseModel):
+    reports: int = 0
+    plans: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    skipped: List[str] = []  # files that are neither a report nor a plan
@@ -0,0 +1,167 @@
+import gzip
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Type, TypeVar, Union
+from pydantic import BaseModel
+
+from .analysis import AnalysisReport, EMT4JIssue
+from .migration_plan import MigrationPlan
+
+try:  # optional, only needed for .zst files
+    import zstandard
+except ImportError:
+    zstandard = None
+
+REPORT_FORMAT = "emt4j-report"
+REPORT_FORMAT_VERSION = 1
+COMPRESSIONS = (".gz", ".zst")
+DOCUMENT_SUFFIXES = (".json", ".jsonl")
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+PathLike = Union[str, Path]
+BinaryFile = Union[IO[bytes], gzip.GzipFile]
+
+
+class ReportHeader(BaseModel):
+    """First line of a JSON Lines report: everything but the issues."""
+    format: str = REPORT_FORMAT
+    version: int = REPORT_FORMAT_VERSION
+    report: AnalysisReport  # groupings left empty
+    categories: List[str]  # group keys in order, so empty groups survive a round trip
+    priorities: List[str]
+
+
+class IssueRecord(BaseModel):
+    """One issue line; an issue listed under both groupings is written once."""
+    c: Optional[str] = None  # issues_by_category key
+    p: Optional[str] = None  # issues_by_priority key
+    i: EMT4JIssue
+
+
+def split_suffix(path: PathLike) -> Tuple[str, Optional[str]]:
+    """Return the document suffix (".json" / ".jsonl") and compression suffix of a path."""
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    compression = suffixes.pop() if suffixes and suffixes[-1] in COMPRESSIONS else None
+    return (suffixes[-1] if suffixes else ""), compression
+
+
+def is_document(path: PathLike) -> bool:
+    """True for file names this module can read (.json / .jsonl, optionally compressed)."""
+    return split_suffix(path)[0] in DOCUMENT_SUFFIXES
+
+
+@contextmanager
+def open_document(path: PathLike, mode: str = "rb") -> Iterator[BinaryFile]:
+    """Open a file in binary mode, compressing or decompressing according to its suffix."""
+    _, compression = split_suffix(path)
+    if compression == ".gz":
+        with gzip.GzipFile(path, mode) as f:
+            yield f
+    elif compression == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"Reading or writing {path} requires the 'zstandard' package")
+        with zstandard.open(path, mode) as f:
+            yield f
+    else:
+        with open(path, mode) as f:
+            yield f
+
+
+def iter_report_lines(report: AnalysisReport) -> Iterator[bytes]:
+    """Serialize a report as JSON Lines: a ReportHeader record, then one IssueRecord per issue.
+
+    Issues shared by both groupings (the analyzer builds reports that way) are
+    written once. Equal issues that are separate objects, as in a report loaded
+    from plain JSON, are paired up by value instead.
+    """
+    header = ReportHeader(
+        report=report.model_copy(update={"issues_by_category": {}, "issues_by_priority": {}}),
+        categories=list(report.issues_by_category),
+        priorities=list(report.issues_by_priority),
+    )
+    yield header.model_dump_json().encode() + b"\n"
+
+    pending: Dict[tuple, List[Tuple[str, EMT4JIssue]]] = {}
+    for priority, issues in report.issues_by_priority.items():
+        for issue in issues:
+            pending.setdefault(_issue_key(issue), []).append((priority, issue))
+
+    for category, issues in report.issues_by_category.items():
+        for issue in issues:
+            matches = pending.get(_issue_key(issue))
+            paired: Optional[str] = None
+            if matches:
+                n = next((n for n, (_, other) in enumerate(matches) if other is issue), 0)
+                paired = matches.pop(n)[0]
+            yield IssueRecord(c=category, p=paired, i=issue).model_dump_json().encode() + b"\n"
+    for matches in pending.values():
+        for priority, issue in matches:
+            yield IssueRecord(p=priority, i=issue).model_dump_json().encode() + b"\n"
+
+
+def _issue_key(issue: EMT4JIssue) -> tuple:
+    return tuple(issue.__dict__.values())
+
+
+def read_report_lines(lines: Iterator[bytes]) -> AnalysisReport:
+    """Rebuild a report from JSON Lines; each issue becomes one object shared by both groupings."""
+    try:
+        header = ReportHeader.model_validate_json(next(lines))
+    except StopIteration:
+        raise ValueError("Empty report file") from None
+    if header.format != REPORT_FORMAT or header.version > REPORT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported report format {header.format!r} version {header.version}")
+    by_category: Dict[str, List[EMT4JIssue]] = {key: [] for key in header.categories}
+    by_priority: Dict[str, List[EMT4JIssue]] = {key: [] for key in header.priorities}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = IssueRecord.model_validate_json(line)
+        if record.c is not None:
+            by_category.setdefault(record.c, []).append(record.i)
+        if record.p is not None:
+            by_priority.setdefault(record.p, []).append(record.i)
+    report = header.report
+    report.issues_by_category = by_category
+    report.issues_by_priority = by_priority
+    return report
+
+
+def save_report(report: AnalysisReport, path: PathLike) -> None:
+    """Write a report as .json or .jsonl, gzip/zstd-compressed for .gz/.zst names."""
+    if split_suffix(path)[0] == ".jsonl":
+        with open_document(path, "wb") as f:
+            f.writelines(iter_report_lines(report))
+    else:
+        save_model(report, path)
+
+
+def load_report(path: PathLike) -> AnalysisReport:
+    """Read a report written by save_report (or any plain JSON report)."""
+    if split_suffix(path)[0] == ".jsonl":
+        with open_document(path) as f:
+            return read_report_lines(iter(f))
+    return load_model(AnalysisReport, path)
+
+
+def save_plan(plan: MigrationPlan, path: PathLike) -> None:
+    save_model(plan, path)
+
+
+def load_plan(path: PathLike) -> MigrationPlan:
+    return load_model(MigrationPlan, path)
+
+
+def save_model(model: BaseModel, path: PathLike) -> None:
+    """Write a model as a single JSON document; plain .json files stay indented for reading."""
+    document, compression = split_suffix(path)
+    if document == ".jsonl":
+        raise ValueError(f"JSON Lines is only supported for analysis reports: {path}")
+    with open_document(path, "wb") as f:
+        f.write(model.model_dump_json(indent=None if compression else 2).encode())
+
+
+def load_model(model: Type[ModelT], path: PathLike) -> ModelT:
+    """Validate a JSON document straight from bytes, without building a dict first."""
+    with open_document(path) as f:
+        return model.model_validate_json(f.read())
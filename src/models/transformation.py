@@ -8,6 +8,27 @@ class TransformationResult(BaseModel):
     errors: List[str]
     compilation_success: bool
     test_results: Optional[Dict[str, Any]] = None
+    baseline_ref: Optional[str] = None  # snapshot before the run; pass to diff to page through changes
+    result_ref: Optional[str] = None
+
+class FileDiff(BaseModel):
+    path: str
+    status: str  # git status letter: A, M, D
+    diff: str
+
+class DiffPage(BaseModel):
+    baseline_ref: str
+    result_ref: str
+    total: int
+    offset: int
+    files: List[FileDiff]
+
+class TestCaseResult(BaseModel):
+    class_name: str
+    name: str
+    time_seconds: float
+    status: str  # passed, failed, error, skipped
+    message: Optional[str] = None
 
 class ValidationResult(BaseModel):
     compilation_passed: bool
@@ -15,3 +36,8 @@ class ValidationResult(BaseModel):
     failed_tests: List[str]
     code_coverage_delta: float
     new_issues_found: List[str]
+    selected_tests: Optional[List[str]] = None  # None = every test ran
+    tests_run: int = 0
+    test_cases: List[TestCaseResult] = []
+    line_coverage: Optional[float] = None
+    build_log: Optional[str] = None
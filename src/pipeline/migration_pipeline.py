@@ -0,0 +1,238 @@
+import hashlib
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+from loguru import logger
+from git import GitCommandError
+
+from utils.config import settings
+from utils.file_utils import detect_build_tool, ensure_directory
+from utils.jvm_pool import get_worker_pool
+from analyzer.emt4j_wrapper import EMT4JAnalyzer
+from planner.llm_client import PRIORITY_BATCH
+from planner.sharded_planner import select_planner
+from transformer.change_capture import ChangeCapture, capture_for
+from transformer.openrewrite_wrapper import OpenRewriteTransformer
+from validator.compilation_validator import CompilationValidator
+from models.migration_plan import MigrationPhase
+from models.pipeline import PhaseOutcome, PipelineState
+from models.transformation import TransformationResult, ValidationResult
+from .parallel_phases import ParallelPhaseRunner, unmet_outcomes
+
+
+def checkpoint_path_for(project_path: str) -> Path:
+    key = hashlib.sha1(str(Path(project_path).resolve()).encode()).hexdigest()[:16]
+    return ensure_directory(os.path.expanduser(settings.PIPELINE_CHECKPOINT_DIR)) / f"{key}.json"
+
+
+class MigrationPipeline:
+    """analyze -> plan -> transform/validate per phase, with models kept in memory between stages.
+
+    Stages overlap where they touch disjoint state: the build is compiled while
+    the plan is generated, and phase N+1 runs in a worktree of the post-phase-N
+    snapshot while phase N validates, its changes being applied to the project
+    once phase N passes. With parallel phases, phases without mutual dependencies
+    run side by side instead (see ParallelPhaseRunner). State is checkpointed
+    after every stage and phase so an interrupted or failed run resumes where it
+    stopped.
+    """
+
+    def __init__(self, project_path: str, from_version: int = 8, to_version: int = 21,
+                 phases: Optional[List[int]] = None, validate: bool = True, speculate: Optional[bool] = None,
+                 parallel: Optional[bool] = None, checkpoint_path: Optional[str] = None,
+                 on_progress: Optional[Callable[[float, str], None]] = None,
+                 on_phase: Optional[Callable[[PhaseOutcome], None]] = None):
+        self.project_path = project_path
+        self.from_version = from_version
+        self.to_version = to_version
+        self.selected_phases = set(phases) if phases else None
+        self.validate = validate
+        self.speculate = settings.PIPELINE_SPECULATE if speculate is None else speculate
+        self.parallel = settings.PIPELINE_PARALLEL_PHASES if parallel is None else parallel
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else checkpoint_path_for(project_path)
+        self.on_progress = on_progress or (lambda fraction, message: None)
+        self.on_phase = on_phase or (lambda outcome: None)
+        self.build_tool = detect_build_tool(project_path)
+        self.transformer = OpenRewriteTransformer()
+        self.validator = CompilationValidator()
+
+    def run(self, resume: bool = True) -> PipelineState:
+        state = self._load() if resume else None
+        if state is None:
+            state = PipelineState(project_path=self.project_path, from_version=self.from_version,
+                                  to_version=self.to_version)
+        else:
+            logger.info(f"Resuming migration at stage '{state.stage}' "
+                        f"({len(state.completed_phases)} phases done)")
+        state.status, state.error = "running", None
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="pipeline") as executor:
+            try:
+                if state.report is None:
+                    self.on_progress(0.0, "Analyzing project")
+                    analyzer = EMT4JAnalyzer()
+                    analyzer.install_emt4j()
+                    state.report = analyzer.analyze_project(self.project_path, self.from_version, self.to_version)
+                    state.stage = "plan"
+                    self._save(state)
+
+                if state.plan is None:
+                    self.on_progress(0.2, "Generating migration plan")
+                    warm = executor.submit(self._warm_build) if self.validate else None
+                    state.plan = select_planner(state.report, priority=PRIORITY_BATCH).create_migration_plan(state.report)
+                    state.stage = "transform"
+                    self._save(state)
+                    if warm is not None:
+                        warm.result()
+
+                self._run_phases(state, executor)
+            except Exception as e:
+                logger.error(f"Migration pipeline failed at stage '{state.stage}': {e}")
+                state.status, state.error = "failed", str(e)
+                self._save(state)
+                raise
+
+        if state.status == "running":
+            state.status, state.stage = "completed", "done"
+            self.on_progress(1.0, "Migration complete")
+        self._save(state)
+        return state
+
+    def _run_phases(self, state: PipelineState, executor: ThreadPoolExecutor) -> None:
+        if state.plan is None:
+            raise RuntimeError("Cannot run phases without a migration plan")
+        done = set(state.completed_phases)
+        state.phases = [p for p in state.phases if p.phase_number in done]
+        pending = [p for p in sorted(state.plan.phases, key=lambda p: p.phase_number)
+                   if p.phase_number not in done
+                   and (self.selected_phases is None or p.phase_number in self.selected_phases)]
+        blocked = unmet_outcomes(pending, done)
+        for outcome in blocked:
+            logger.error(f"Phase {outcome.phase_number}: {outcome.transformation.errors[0]}")
+            state.phases.append(outcome)
+            self.on_phase(outcome)
+        if blocked:
+            numbers = [o.phase_number for o in blocked]
+            state.status, state.error = "failed", f"Phases {numbers} depend on phases neither selected nor applied"
+            pending = [p for p in pending if p.phase_number not in numbers]
+        if self.parallel and pending:
+            self._run_parallel(state, pending, done)
+            return
+        capture = capture_for(self.project_path) if self.speculate else None
+
+        speculation: Optional[Future] = None
+        for i, phase in enumerate(pending):
+            self.on_progress(0.3 + 0.7 * i / len(pending), f"Phase {phase.phase_number}: {phase.name}")
+            transformation = self._adopt(capture, speculation) \
+                if capture is not None and speculation is not None else None
+            speculative = transformation is not None
+            if transformation is None:
+                transformation = self.transformer.run_phases(self.project_path, [phase])[phase.phase_number]
+            outcome = PhaseOutcome(phase_number=phase.phase_number, transformation=transformation,
+                                   speculative=speculative)
+            state.phases.append(outcome)
+            if not transformation.success:
+                state.status, state.error = "failed", f"Phase {phase.phase_number} transformation failed"
+                self.on_phase(outcome)
+                return
+
+            next_phase = pending[i + 1] if i + 1 < len(pending) else None
+            speculation = None
+            if self.validate and capture is not None and next_phase is not None and transformation.result_ref:
+                speculation = executor.submit(self._speculate, capture, next_phase, transformation.result_ref)
+
+            if self.validate:
+                outcome.validation = self._validate(transformation)
+                if not (outcome.validation.compilation_passed and outcome.validation.unit_tests_passed):
+                    state.status, state.error = "failed", f"Phase {phase.phase_number} failed validation"
+                    if speculation is not None:
+                        speculation.result()  # let the worktree run finish and clean up
+                    self.on_phase(outcome)
+                    return
+            self._save(state)
+            self.on_phase(outcome)
+
+    def _run_parallel(self, state: PipelineState, pending: List[MigrationPhase], done: set) -> None:
+        runner = ParallelPhaseRunner(self.project_path, validate=self.validate,
+                                     transformer=self.transformer, validator=self.validator)
+
+        def record(outcome: PhaseOutcome) -> None:
+            state.phases.append(outcome)
+            self.on_progress(0.3 + 0.7 * len(state.phases) / (len(pending) + len(done)),
+                             f"Phase {outcome.phase_number} finished")
+            self._save(state)
+            self.on_phase(outcome)
+
+        outcomes = runner.run(pending, applied=done, on_outcome=record)
+        failed = [o.phase_number for o in outcomes if o.phase_number not in state.completed_phases]
+        if failed:
+            state.status, state.error = "failed", f"Phases {failed} failed"
+
+    def _validate(self, transformation: TransformationResult) -> ValidationResult:
+        changed = transformation.changed_files if transformation.baseline_ref else None
+        return self.validator.validate_project(self.project_path, changed)
+
+    def _speculate(self, capture: ChangeCapture, phase: MigrationPhase, tree: str) -> Optional[TransformationResult]:
+        """Run a phase against a worktree checkout of tree; the result refs live in the shared object store."""
+        try:
+            with capture.worktree(tree) as worktree:
+                logger.info(f"Speculatively running phase {phase.phase_number} in {worktree}")
+                result = self.transformer.run_phases(str(worktree), [phase])[phase.phase_number]
+            return result if result.success and result.baseline_ref == tree else None
+        except (GitCommandError, OSError) as e:
+            logger.warning(f"Speculative run of phase {phase.phase_number} failed: {e}")
+            return None
+
+    def _adopt(self, capture: ChangeCapture, speculation: Future) -> Optional[TransformationResult]:
+        """Apply a finished speculative run to the project if it was based on the current tree."""
+        result = speculation.result()
+        if result is None:
+            return None
+        try:
+            base = capture.snapshot()
+            if base != result.baseline_ref:
+                logger.info("Project changed since the speculative run, running the phase directly")
+                return None
+            capture.apply(result.baseline_ref, result.result_ref)
+            head = capture.snapshot()
+        except GitCommandError as e:
+            logger.warning(f"Could not apply speculative changes, running the phase directly: {e}")
+            return None
+        changes = capture.changed_files(base, head)
+        diff = capture.unified_diff(base, head) if len(changes) <= settings.TRANSFORM_INLINE_DIFF_MAX_FILES else ""
+        logger.info(f"Applied speculative changes to {len(changes)} files")
+        return TransformationResult(success=True, changed_files=[p for _, p in changes], diff=diff, errors=[],
+                                    compilation_success=True, baseline_ref=base, result_ref=head)
+
+    def _warm_build(self) -> None:
+        """Compile once so the build daemon and incremental compile state are warm for validation."""
+        if self.build_tool not in ("maven", "gradle"):
+            return
+        try:
+            get_worker_pool().run_build(self.build_tool, self.project_path, ["-q", "compile"], ["-q", "classes"],
+                                        check=False, capture_output=True,
+                                        timeout=settings.JVM_POOL_WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Build warm-up failed: {e}")
+
+    def _load(self) -> Optional[PipelineState]:
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            state = PipelineState.model_validate_json(self.checkpoint_path.read_text())
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return None
+        if state.status == "completed" or (state.from_version, state.to_version) != (self.from_version,
+                                                                                     self.to_version):
+            return None
+        return state
+
+    def _save(self, state: PipelineState) -> None:
+        state.updated_at = time.time()
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(state.model_dump_json())
+        tmp.replace(self.checkpoint_path)
@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Set
+from loguru import logger
+from git import GitCommandError
+
+from utils.config import settings
+from utils.jvm_pool import get_worker_pool
+from transformer.batching import unmet_dependencies
+from transformer.change_capture import ChangeCapture, capture_for
+from transformer.openrewrite_wrapper import OpenRewriteTransformer
+from validator.compilation_validator import CompilationValidator
+from models.migration_plan import MigrationPhase
+from models.pipeline import PhaseOutcome
+from models.transformation import TransformationResult, ValidationResult
+
+
+def _passed(outcome: PhaseOutcome) -> bool:
+    validation = outcome.validation
+    return outcome.transformation.success and (
+        validation is None or (validation.compilation_passed and validation.unit_tests_passed))
+
+
+def _failed_transformation(message: str) -> TransformationResult:
+    return TransformationResult(success=False, changed_files=[], diff="", errors=[message],
+                                compilation_success=False)
+
+
+def unmet_outcomes(phases: Iterable[MigrationPhase], applied: Iterable[int]) -> List[PhaseOutcome]:
+    """Failed outcomes for the phases depending on phases that are neither among phases nor applied."""
+    return [PhaseOutcome(phase_number=number, transformation=_failed_transformation(
+                f"Skipped: depends on phases {missing}, which are neither selected nor applied"))
+            for number, missing in unmet_dependencies(phases, applied).items()]
+
+
+class ParallelPhaseRunner:
+    """Run independent plan phases side by side in git worktrees and merge the passing ones.
+
+    Phases are scheduled in dependency waves. Every phase of a wave is
+    transformed and validated in its own worktree checked out from the current
+    project snapshot; passing phases are then applied to the project in phase
+    order. A phase whose changes no longer apply after an earlier merge is re-run
+    in place. Phases depending on a failed phase, or on a phase that is neither
+    given nor applied, are skipped.
+    """
+
+    def __init__(self, project_path: str, validate: bool = True, max_parallel: Optional[int] = None,
+                 transformer: Optional[OpenRewriteTransformer] = None,
+                 validator: Optional[CompilationValidator] = None):
+        self.project_path = project_path
+        self.validate = validate
+        self.max_parallel = max_parallel or settings.PIPELINE_MAX_PARALLEL_PHASES or \
+            max(1, get_worker_pool().size // 2)
+        self.transformer = transformer or OpenRewriteTransformer()
+        self.validator = validator or CompilationValidator()
+
+    def run(self, phases: Iterable[MigrationPhase], applied: Iterable[int] = (),
+            on_outcome: Optional[Callable[[PhaseOutcome], None]] = None) -> List[PhaseOutcome]:
+        """Run phases and return their outcomes in merge order.
+
+        If the merged phases of a wave fail validation together, the wave is
+        rolled back, its phases are reported failed and nothing further runs.
+        If the rollback itself fails, the phases are still marked failed before
+        the git error is re-raised, so a checkpoint saved by the caller does not
+        count them as applied.
+        """
+        on_outcome = on_outcome or (lambda outcome: None)
+        capture = capture_for(self.project_path)
+        if capture is None:
+            raise RuntimeError("Parallel phase execution needs git and change capture enabled")
+
+        remaining = sorted(phases, key=lambda p: p.phase_number)
+        merged: Set[int] = set(applied)
+        failed: Set[int] = set()
+        outcomes: List[PhaseOutcome] = []
+
+        def record(outcome: PhaseOutcome) -> None:
+            outcomes.append(outcome)
+            (merged if _passed(outcome) else failed).add(outcome.phase_number)
+            on_outcome(outcome)
+
+        for outcome in unmet_outcomes(remaining, merged):
+            logger.error(f"Phase {outcome.phase_number}: {outcome.transformation.errors[0]}")
+            record(outcome)
+        remaining = [p for p in remaining if p.phase_number not in failed]
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="phase") as executor:
+            while remaining:
+                blocked = [p for p in remaining if failed.intersection(p.dependencies)]
+                for phase in blocked:
+                    record(PhaseOutcome(phase_number=phase.phase_number, transformation=_failed_transformation(
+                        f"Skipped: depends on failed phase(s) {sorted(failed.intersection(phase.dependencies))}")))
+                remaining = [p for p in remaining if p not in blocked]
+                wave = [p for p in remaining if merged.issuperset(p.dependencies)] or remaining[:1]
+                if not wave:
+                    break
+                remaining = [p for p in remaining if p not in wave]
+
+                base = capture.snapshot()
+                logger.info(f"Running phases {[p.phase_number for p in wave]} in parallel worktrees")
+                results = list(executor.map(partial(self._run_in_worktree, capture, base), wave))
+
+                wave_changes: List[str] = []
+                merged_from_worktrees = 0
+                for phase, outcome in zip(wave, results, strict=True):
+                    if _passed(outcome):
+                        outcome = self._merge(capture, phase, outcome)
+                        merged_from_worktrees += outcome.speculative
+                        wave_changes.extend(outcome.transformation.changed_files)
+                    record(outcome)
+
+                if self.validate and merged_from_worktrees > 1:
+                    combined = self.validator.validate_project(self.project_path, sorted(set(wave_changes)))
+                    if not (combined.compilation_passed and combined.unit_tests_passed):
+                        logger.error("Merged phases pass alone but fail together; rolling the wave back")
+                        for outcome in outcomes[-len(wave):]:
+                            if outcome.phase_number in merged:
+                                outcome.validation = combined
+                                merged.discard(outcome.phase_number)
+                                failed.add(outcome.phase_number)
+                        try:
+                            capture.apply(capture.snapshot(), base)
+                        except GitCommandError as e:
+                            logger.error(f"Could not roll back phases {[p.phase_number for p in wave]}: {e}")
+                            raise
+                        break
+        return outcomes
+
+    def _run_in_worktree(self, capture: ChangeCapture, base: str, phase: MigrationPhase) -> PhaseOutcome:
+        try:
+            with capture.worktree(base) as worktree:
+                result = self.transformer.run_phases(str(worktree), [phase])[phase.phase_number]
+                validation = None
+                if self.validate and result.success:
+                    validation = self._validate(str(worktree), result)
+            return PhaseOutcome(phase_number=phase.phase_number, transformation=result,
+                                validation=validation, speculative=True)
+        except (GitCommandError, OSError) as e:
+            logger.error(f"Phase {phase.phase_number} failed in its worktree: {e}")
+            return PhaseOutcome(phase_number=phase.phase_number, transformation=_failed_transformation(str(e)))
+
+    def _merge(self, capture: ChangeCapture, phase: MigrationPhase, outcome: PhaseOutcome) -> PhaseOutcome:
+        """Apply a worktree result to the project, re-running the phase in place if it conflicts."""
+        result = outcome.transformation
+        base = capture.snapshot()
+        try:
+            if result.baseline_ref and result.result_ref:
+                capture.apply(result.baseline_ref, result.result_ref)
+                head = capture.snapshot()
+                changes = capture.changed_files(base, head)
+                logger.info(f"Merged phase {phase.phase_number} ({len(changes)} files)")
+                merged = result.model_copy(update={"changed_files": [p for _, p in changes],
+                                                   "baseline_ref": base, "result_ref": head})
+                return outcome.model_copy(update={"transformation": merged})
+        except GitCommandError as e:
+            logger.warning(f"Phase {phase.phase_number} conflicts with merged phases, re-running in place: {e}")
+
+        result = self.transformer.run_phases(self.project_path, [phase])[phase.phase_number]
+        validation = self._validate(self.project_path, result) if self.validate and result.success else None
+        return PhaseOutcome(phase_number=phase.phase_number, transformation=result, validation=validation)
+
+    def _validate(self, project_path: str, result: TransformationResult) -> ValidationResult:
+        changed = result.changed_files if result.baseline_ref else None
+        return self.validator.validate_project(project_path, changed)
@@ -1,54 +1,24 @@
 import json
-from typing import Dict, Any
-import anthropic
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from loguru import logger
 from utils.config import settings
+from utils.metrics import get_metrics
 from models.analysis import AnalysisReport
-from models.migration_plan import MigrationPlan, MigrationPhase
+from models.migration_plan import MigrationPlan, MigrationPhase, PlanStreamEvent
+from models.issue_table import IssueTable
+from .llm_client import PRIORITY_INTERACTIVE, get_llm_client
+from .plan_cache import PlanCache, get_plan_cache, plan_digest
+from .plan_stream import PlanStreamError, PlanStreamParser
+from .rule_engine import plan_with_rules
 
-class AIMigrationPlanner:
-    def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEE, base_url=settings.ANTHROPIC_BASE_URL)
-        self.model = settings.AI_MODEL
-
-    def create_migration_plan(self, report: AnalysisReport) -> MigrationPlan:
-        """Generate a migration plan using Claude."""
-        logger.info("Generating migration plan with Claude...")
-        logger.info("Using ANTHROPIC API KEY: ", settings.ANTHROPIC_API_KEE)
-        prompt = self._build_planning_prompt(report)
-        
-        try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=settings.AI_MAX_TOKENS,
-                temperature=0,
-                system="You are an expert Java Architect specializing in legacy migrations. "
-                       "Create a phased migration plan in JSON format.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            response_text = message.content[0].text
-            return self._parse_response(response_text, report)
-            
-        except Exception as e:
-            logger.error(f"Failed to generate plan: {e}")
-            # Return a fallback plan for robustness
-            return self._create_fallback_plan(report)
+SYSTEM_PROMPT = ("You are an expert Java Architect specializing in legacy migrations. "
+                 "Create a phased migration plan in JSON format.")
 
-    def _build_planning_prompt(self, report: AnalysisReport) -> str:
-        return f"""
-        Analyze this Java project report and create a migration plan from Java {report.from_version} to {report.to_version}.
-        
-        Project: {report.project_name}
-        Total Issues: {report.total_issues}
-        Categories: {list(report.issues_by_category.keys())}
-        
+PLAN_RESPONSE_FORMAT = """
         Please generate a JSON response with the following structure:
-        {{
+        {
             "phases": [
-                {{
+                {
                     "phase_number": 1,
                     "name": "Phase Name",
                     "description": "What this phase achieves",
@@ -56,13 +26,15 @@ class AIMigrationPlanner:
                     "manual_steps": ["step description"],
                     "risk_level": "LOW|MEDIUM|HIGH",
                     "estimated_effort_hours": 4
-                }}
+                }
             ],
             "testing_strategy": "Description",
             "rollback_plan": "Description",
             "risk_summary": "Description"
-        }}
+        }
+"""
 
+RECIPE_CONTEXT = """
         CONTEXT: VALID OPENREWRITE RECIPES (Use ONLY these or known valid ones)
         
         Version Migration:
@@ -77,33 +49,199 @@ class AIMigrationPlanner:
         - org.openrewrite.staticanalysis.CommonStaticAnalysis
         - org.openrewrite.java.cleanup.UnnecessaryCloseInTryWithResources
         - org.openrewrite.java.cleanup.ExplicitInitialization
+"""
+
+FALLBACK_RISK_SUMMARY = "Automated fallback plan due to AI error"
+
+def extract_plan_json(response: str) -> Dict[str, Any]:
+    """Extract the first JSON object with phases from a model response, ignoring any text around it."""
+    decoder = json.JSONDecoder()
+    start = response.find('{')
+    while start >= 0:
+        try:
+            data, _ = decoder.raw_decode(response, start)
+            if isinstance(data, dict) and "phases" in data:
+                return data
+        except ValueError:
+            pass
+        start = response.find('{', start + 1)
+    raise ValueError("No plan object in response")
+
+def plan_events(plan: MigrationPlan) -> Iterator[PlanStreamEvent]:
+    """Stream events for an already complete plan."""
+    for phase in plan.phases:
+        yield PlanStreamEvent(type="phase", phase=phase)
+    yield PlanStreamEvent(type="plan", plan=plan)
+
+def record_token_usage(message: Any, planner: str) -> None:
+    """Count the input/output tokens reported for a Claude response."""
+    usage = getattr(message, "usage", None)
+    if usage is None:
+        return
+    metrics = get_metrics()
+    metrics.inc("llm_tokens_total", usage.input_tokens or 0, planner=planner, direction="input")
+    metrics.inc("llm_tokens_total", usage.output_tokens or 0, planner=planner, direction="output")
+
+class AIMigrationPlanner:
+    def __init__(self, cache: Optional[PlanCache] = None, priority: int = PRIORITY_INTERACTIVE,
+                 use_cache: Optional[bool] = None):
+        """``cache`` defaults to the shared plan cache; ``use_cache=False`` disables caching for
+        this instance (``None``: on if a cache is given, else PLAN_CACHE_ENABLED)."""
+        self.priority = priority
+        self.model = settings.AI_MODEL
+        if use_cache is None:
+            use_cache = cache is not None or settings.PLAN_CACHE_ENABLED
+        self.cache = (cache or get_plan_cache()) if use_cache else None
+
+    def create_migration_plan(self, report: AnalysisReport) -> MigrationPlan:
+        """Generate a migration plan, using Claude only when the rule engine is not confident."""
+        rule_plan = plan_with_rules(report)
+        if rule_plan is not None:
+            return rule_plan
+        if self.cache is None:
+            return self._generate_plan(report)[0]
+
+        plan, from_cache = self.cache.get_or_create(
+            plan_digest(report, self.model), lambda: self._generate_plan(report)
+        )
+        if from_cache:
+            logger.info("Reusing cached migration plan for identical issue profile")
+        return plan.model_copy(update={"project_name": report.project_name}, deep=True)
+
+    def stream_migration_plan(self, report: AnalysisReport) -> Iterator[PlanStreamEvent]:
+        """Yield phases while Claude writes them, then the complete plan.
+
+        A response that stops matching the plan schema is aborted and requested
+        again (PLAN_STREAM_MAX_ATTEMPTS in total); a "reset" event tells the
+        consumer to discard the phases received so far.
+        """
+        plan = plan_with_rules(report)
+        key = plan_digest(report, self.model)
+        if plan is None and self.cache is not None:
+            plan = self.cache.get(key)
+            if plan is not None:
+                plan = plan.model_copy(update={"project_name": report.project_name}, deep=True)
+        if plan is not None:
+            yield from plan_events(plan)
+            return
+
+        logger.info("Streaming migration plan from Claude...")
+        prompt = self._build_planning_prompt(report)
+        streamed = 0
+        for attempt in range(1, settings.PLAN_STREAM_MAX_ATTEMPTS + 1):
+            if streamed:
+                yield PlanStreamEvent(type="reset", message=f"Plan stream restarted (attempt {attempt})")
+                streamed = 0
+            parser = PlanStreamParser()
+            stream = get_llm_client().stream(
+                priority=self.priority,
+                model=self.model,
+                max_tokens=settings.AI_MAX_TOKENS,
+                temperature=0,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            try:
+                with get_metrics().timer("llm_request_duration_seconds", planner="stream") as labels:
+                    labels["status"] = "error"
+                    for text in stream:
+                        for phase in parser.feed(text):
+                            streamed += 1
+                            yield PlanStreamEvent(type="phase", phase=phase)
+                    data = parser.finish()
+                    labels["status"] = "ok"
+                record_token_usage(stream.message, "stream")
+            except PlanStreamError as e:
+                logger.warning(f"Plan stream diverged from the schema on attempt {attempt}: {e}")
+                continue
+            except Exception as e:
+                logger.error(f"Failed to stream plan: {e}")
+                break
+            finally:
+                stream.close()
+
+            plan = self._build_plan(report, data["phases"], data)
+            if self.cache is not None:
+                self.cache.put(key, plan)
+            yield PlanStreamEvent(type="plan", plan=plan)
+            return
+
+        if streamed:
+            yield PlanStreamEvent(type="reset", message="Falling back to the default plan")
+        yield from plan_events(self._create_fallback_plan(report))
+
+    def _generate_plan(self, report: AnalysisReport) -> Tuple[MigrationPlan, bool]:
+        """Call Claude; returns (plan, cacheable) where fallback plans are not cacheable."""
+        logger.info("Generating migration plan with Claude...")
+        logger.info("Using ANTHROPIC API KEY: ", settings.ANTHROPIC_API_KEE)
+        prompt = self._build_planning_prompt(report)
+        
+        try:
+            with get_metrics().timer("llm_request_duration_seconds", planner="single") as labels:
+                labels["status"] = "error"
+                message = get_llm_client().create(
+                    priority=self.priority,
+                    model=self.model,
+                    max_tokens=settings.AI_MAX_TOKENS,
+                    temperature=0,
+                    system=SYSTEM_PROMPT,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ]
+                )
+                labels["status"] = "ok"
+            record_token_usage(message, "single")
+            
+            response_text = message.content[0].text
+            plan = self._parse_response(response_text, report)
+            return plan, plan.risk_summary != FALLBACK_RISK_SUMMARY
+            
+        except Exception as e:
+            logger.error(f"Failed to generate plan: {e}")
+            # Return a fallback plan for robustness
+            return self._create_fallback_plan(report), False
+
+    def _build_planning_prompt(self, report: AnalysisReport) -> str:
+        table = IssueTable.from_report(report)
+        category_counts = table.count_by("category") if len(table) else {}
+        top_codes = table.top("issue_code", limit=15) if len(table) else []
+        return f"""
+        Analyze this Java project report and create a migration plan from Java {report.from_version} to {report.to_version}.
+        
+        Project: {report.project_name}
+        Total Issues: {report.total_issues}
+        Categories: {list(report.issues_by_category.keys())}
+        Issue Counts by Category: {category_counts}
+        Most Frequent Issue Codes: {top_codes}
+        {PLAN_RESPONSE_FORMAT}
+        {RECIPE_CONTEXT}
         """
 
     def _parse_response(self, response: str, report: AnalysisReport) -> MigrationPlan:
-        # Simple extraction of JSON
         try:
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            json_str = response[start:end]
-            data = json.loads(json_str)
+            data = extract_plan_json(response)
             
             phases = [MigrationPhase(**p) for p in data.get("phases", [])]
             
-            return MigrationPlan(
-                project_name=report.project_name,
-                from_version=str(report.from_version),
-                to_version=str(report.to_version),
-                total_phases=len(phases),
-                total_estimated_hours=sum(p.estimated_effort_hours for p in phases),
-                phases=phases,
-                testing_strategy=data.get("testing_strategy", "Standard unit testing"),
-                rollback_plan=data.get("rollback_plan", "Git revert"),
-                risk_summary=data.get("risk_summary", "Standard migration risks")
-            )
+            return self._build_plan(report, phases, data)
         except Exception as e:
             logger.error(f"Error parsing AI response: {e}")
             return self._create_fallback_plan(report)
 
+    def _build_plan(self, report: AnalysisReport, phases: List[MigrationPhase],
+                    data: Dict[str, Any]) -> MigrationPlan:
+        return MigrationPlan(
+            project_name=report.project_name,
+            from_version=str(report.from_version),
+            to_version=str(report.to_version),
+            total_phases=len(phases),
+            total_estimated_hours=sum(p.estimated_effort_hours for p in phases),
+            phases=phases,
+            testing_strategy=data.get("testing_strategy", "Standard unit testing"),
+            rollback_plan=data.get("rollback_plan", "Git revert"),
+            risk_summary=data.get("risk_summary", "Standard migration risks")
+        )
+
     def _create_fallback_plan(self, report: AnalysisReport) -> MigrationPlan:
         """Create a default plan if AI fails."""
         return MigrationPlan(
@@ -125,5 +263,5 @@ class AIMigrationPlanner:
             ],
             testing_strategy="Run existing tests",
             rollback_plan="Git revert",
-            risk_summary="Automated fallback plan due to AI error"
+            risk_summary=FALLBACK_RISK_SUMMARY
         )
@@ -0,0 +1,341 @@
+import asyncio
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import anthropic
+import httpx
+from loguru import logger
+
+from utils.config import settings
+from utils.metrics import get_metrics
+
+# Lower values are served first.
+PRIORITY_INTERACTIVE = 0  # a user is waiting on the response (/api/plan, CLI plan)
+PRIORITY_BATCH = 10       # queued jobs, pipelines and fleet planning
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    """Refills rate_per_minute units per minute up to capacity.
+
+    Units are taken before the real cost is known, so the balance may go negative
+    when a request turns out larger than estimated; later callers then wait longer.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount units are available (0 when they are available now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        while True:
+            wait = self.delay(amount)
+            if wait <= 0:
+                self.take(amount)
+                return
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(request: dict) -> int:
+    """Rough input token count of a messages request (about four characters per token)."""
+    return len(json.dumps([request.get("system"), request.get("messages")], default=str)) // 4
+
+
+def retry_delay(error: Exception, attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's retry-after."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, anthropic.APIConnectionError):  # includes timeouts
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+@dataclass(order=True)
+class _Call:
+    priority: int
+    seq: int
+    request: dict = field(compare=False)
+    future: Future = field(compare=False)
+    chunks: Optional[queue.Queue] = field(default=None, compare=False)  # text deltas, None ends the stream
+    attempt: int = field(default=0, compare=False)
+    queued_at: float = field(default_factory=time.perf_counter, compare=False)
+    retry: Optional[asyncio.TimerHandle] = field(default=None, compare=False)  # pending backoff
+    tokens: Optional[int] = field(default=None, compare=False)  # estimated input tokens
+
+    def succeed(self, message: Any) -> None:
+        if not self.future.done():
+            self.future.set_result(message)
+        if self.chunks is not None:
+            self.chunks.put(None)
+
+    def fail(self, error: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(error)
+        if self.chunks is not None:
+            self.chunks.put(None)
+
+
+class TextStream:
+    """Text deltas of a streaming request; close() aborts the request on the server side."""
+
+    def __init__(self, call: _Call, chunks: queue.Queue):
+        self._call = call
+        self._chunks = chunks  # call.chunks, typed as present
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            text = self._chunks.get()
+            if text is None or self._call.future.cancelled():
+                break
+            yield text
+        if not self._call.future.cancelled():
+            self._call.future.result()  # raises the error that ended the stream
+
+    @property
+    def message(self) -> Any:
+        """Final Message with usage, once the stream has been read to the end."""
+        return self._call.future.result()
+
+    def close(self) -> None:
+        if self._call.future.cancel():
+            self._chunks.put(None)
+
+
+class LLMClient:
+    """Process-wide Claude client shared by all planners.
+
+    One AsyncAnthropic client with a pooled keep-alive HTTP connection runs on a
+    dedicated event loop thread. Requests wait in a priority queue served by
+    max_concurrency workers. A worker only sends a request once the limiters have
+    request and token budget for it; otherwise it puts the request back and waits,
+    so a higher-priority request queued meanwhile is served first. Throttled or
+    overloaded requests are re-queued with jittered backoff at their original
+    priority. A request stays active
+    from submit until it has succeeded or failed, including while it waits to
+    be retried; close(drain=True) waits for the active count to reach zero.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None, max_retries: Optional[int] = None):
+        self.api_key = api_key if api_key is not None else settings.ANTHROPIC_API_KEE
+        self.base_url = base_url or settings.ANTHROPIC_BASE_URL
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        rpm = settings.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tpm = settings.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.request_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.token_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self._sequence = itertools.count()
+        self._active = 0
+        self._closed = False
+        self._idle = threading.Condition()
+        self._retrying: Dict[int, _Call] = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    @property
+    def config(self) -> Tuple[Optional[str], str]:
+        return self.api_key, self.base_url
+
+    async def _start(self) -> None:
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        limits = httpx.Limits(max_connections=self.max_concurrency,
+                              max_keepalive_connections=self.max_concurrency)
+        self._client = anthropic.AsyncAnthropic(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=limits),
+        )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    def submit(self, priority: int = PRIORITY_INTERACTIVE, **request: Any) -> Future:
+        """Queue a messages.create request; the future resolves to the Message."""
+        call = _Call(priority, next(self._sequence), request, Future())
+        self._enqueue(call)
+        return call.future
+
+    def create(self, priority: int = PRIORITY_INTERACTIVE, **request: Any) -> Any:
+        return self.submit(priority, **request).result()
+
+    async def acreate(self, priority: int = PRIORITY_INTERACTIVE, **request: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(priority, **request))
+
+    def stream(self, priority: int = PRIORITY_INTERACTIVE, **request: Any) -> "TextStream":
+        """Queue a streaming request; iterate the result for text deltas as they arrive.
+
+        Requests are only retried until the first delta has been delivered.
+        """
+        chunks: queue.Queue = queue.Queue()
+        call = _Call(priority, next(self._sequence), request, Future(), chunks=chunks)
+        self._enqueue(call)
+        return TextStream(call, chunks)
+
+    def _enqueue(self, call: "_Call") -> None:
+        with self._idle:
+            if self._closed:
+                raise RuntimeError("LLM client was closed")
+            self._active += 1
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, call)
+
+    def _finished(self) -> None:
+        with self._idle:
+            self._active -= 1
+            if not self._active:
+                self._idle.notify_all()
+
+    def _requeue(self, call: "_Call") -> None:
+        self._retrying.pop(call.seq, None)
+        call.retry = None
+        self._queue.put_nowait(call)
+
+    async def _worker(self) -> None:
+        while True:
+            call = await self._queue.get()
+            wait = 0.0 if call.future.cancelled() else self._budget_delay(call)
+            if wait > 0:
+                self._queue.put_nowait(call)
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await self._send(call)
+            except asyncio.CancelledError:
+                call.fail(RuntimeError("LLM client was closed"))
+                raise
+            finally:
+                if call.retry is None:
+                    self._finished()
+
+    def _budget_delay(self, call: "_Call") -> float:
+        """Seconds until the limiters can admit call (0 when it can be sent now)."""
+        if call.tokens is None:
+            call.tokens = estimate_tokens(call.request)
+        return max(self.request_bucket.delay(1) if self.request_bucket is not None else 0.0,
+                   self.token_bucket.delay(call.tokens) if self.token_bucket is not None else 0.0)
+
+    async def _send(self, call: "_Call") -> None:
+        """Send call, taking its budget from the limiters (the worker has checked it is available)."""
+        if call.future.cancelled():
+            return
+        delivered = False
+        estimate = call.tokens if call.tokens is not None else estimate_tokens(call.request)
+        try:
+            if self.request_bucket is not None:
+                self.request_bucket.take(1)
+            if self.token_bucket is not None:
+                self.token_bucket.take(estimate)
+            get_metrics().observe("llm_queue_wait_seconds", time.perf_counter() - call.queued_at,
+                                  priority=str(call.priority))
+            if call.chunks is None:
+                message = await self._client.messages.create(**call.request)
+            else:
+                async with self._client.messages.stream(**call.request) as stream:
+                    async for text in stream.text_stream:
+                        if call.future.cancelled():  # the consumer stopped reading
+                            return
+                        call.chunks.put(text)
+                        delivered = True
+                    message = await stream.get_final_message()
+        except Exception as e:
+            if call.attempt < self.max_retries and is_retryable(e) and not delivered:
+                delay = retry_delay(e, call.attempt, settings.LLM_RETRY_BASE_SECONDS,
+                                    settings.LLM_RETRY_MAX_SECONDS)
+                logger.warning(f"Claude request failed ({e}), retry {call.attempt + 1} in {delay:.1f}s")
+                get_metrics().inc("llm_retries_total", reason=str(getattr(e, "status_code", "connection")))
+                call.attempt += 1
+                call.queued_at = time.perf_counter()
+                call.retry = self._loop.call_later(delay, self._requeue, call)
+                self._retrying[call.seq] = call
+            else:
+                call.fail(e)
+            return
+
+        usage = getattr(message, "usage", None)
+        if self.token_bucket is not None and usage is not None:
+            self.token_bucket.take((usage.input_tokens or 0) + (usage.output_tokens or 0) - estimate)
+        call.succeed(message)
+
+    def close(self, drain: bool = False) -> None:
+        """Stop the client, failing requests still queued, in flight or waiting to be retried.
+
+        With drain=True, first wait until every submitted request has finished.
+        """
+        async def shutdown():
+            closed = RuntimeError("LLM client was closed")
+            for worker in self._workers:
+                worker.cancel()
+            for call in self._retrying.values():
+                if call.retry is not None:
+                    call.retry.cancel()
+                call.fail(closed)
+            self._retrying.clear()
+            while not self._queue.empty():
+                self._queue.get_nowait().fail(closed)
+            await self._client.close()
+
+        with self._idle:
+            if drain:
+                self._idle.wait_for(lambda: not self._active)
+            self._closed = True
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+
+_llm_client: Optional[LLMClient] = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, replacing it if the API key or base URL changed.
+
+    A replaced client keeps serving the requests already submitted to it and is
+    closed in the background once they have finished.
+    """
+    global _llm_client
+    with _llm_client_lock:
+        config = (settings.ANTHROPIC_API_KEE, settings.ANTHROPIC_BASE_URL)
+        if _llm_client is not None and _llm_client.config != config:
+            threading.Thread(target=_llm_client.close, kwargs={"drain": True},
+                             name="llm-client-retire", daemon=True).start()
+            _llm_client = None
+        if _llm_client is None:
+            _llm_client = LLMClient(*config)
+        return _llm_client
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from loguru import logger
+
+from utils.config import settings
+from utils.metrics import get_metrics
+from models.analysis import AnalysisReport
+from models.migration_plan import MigrationPlan
+
+# Bump when the planning prompt changes so stale plans are not reused.
+PROMPT_VERSION = 1
+
+
+def plan_digest(report: AnalysisReport, model: str) -> str:
+    """Digest of everything that shapes the planning prompt, independent of project name and order."""
+    unique = {id(i): i for issues in report.issues_by_category.values() for i in issues}
+    payload = {
+        "prompt_version": PROMPT_VERSION,
+        "model": model,
+        "max_tokens": settings.AI_MAX_TOKENS,
+        "from": report.from_version,
+        "to": report.to_version,
+        "total_issues": report.total_issues,
+        "categories": sorted((k, len(v)) for k, v in report.issues_by_category.items()),
+        "issue_codes": sorted(Counter(i.issue_code for i in unique.values()).items()),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class PlanCache:
+    """In-memory TTL + LRU cache of migration plans with single-flight request coalescing.
+
+    Concurrent requests for the same digest wait on the first caller's LLM
+    call instead of issuing their own.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries or settings.PLAN_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PLAN_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, Tuple[float, MigrationPlan]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Optional[MigrationPlan]:
+        with self._lock:
+            return self._get_locked(key)
+
+    def put(self, key: str, plan: MigrationPlan) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, plan)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key: str,
+                      factory: Callable[[], Tuple[MigrationPlan, bool]]) -> Tuple[MigrationPlan, bool]:
+        """Return (plan, from_cache). factory returns (plan, cacheable)."""
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            plan, cacheable = factory()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, plan, cacheable)
+        return plan, False
+
+    async def aget_or_create(self, key: str, factory: Callable[[], Awaitable[Tuple[MigrationPlan, bool]]]
+                             ) -> Tuple[MigrationPlan, bool]:
+        """Async get_or_create; coalesces with sync and async callers of the same key."""
+        future, leader = self._claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+
+        try:
+            plan, cacheable = await factory()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, plan, cacheable)
+        return plan, False
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        """Return (future of the plan, whether the caller is the leader that must create and settle it).
+
+        A cache hit comes back as an already resolved future.
+        """
+        with self._lock:
+            cached = self._get_locked(key)
+            if cached is not None:
+                self.hits += 1
+                get_metrics().inc("cache_requests_total", cache="plan", result="hit")
+                hit: Future = Future()
+                hit.set_result(cached)
+                return hit, False
+            waiting = self._inflight.get(key)
+            if waiting is not None:
+                self.coalesced += 1
+                get_metrics().inc("cache_requests_total", cache="plan", result="coalesced")
+                logger.info(f"Waiting on in-flight plan request ({key[:12]})")
+                return waiting, False
+            self.misses += 1
+            get_metrics().inc("cache_requests_total", cache="plan", result="miss")
+            leader = self._inflight[key] = Future()
+            return leader, True
+
+    def _settle(self, key: str, leader: Future, plan: Optional[MigrationPlan] = None, cacheable: bool = False,
+                error: Optional[BaseException] = None) -> None:
+        if error is None and cacheable and plan is not None:
+            self.put(key, plan)
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is None:
+            leader.set_result(plan)
+        else:
+            leader.set_exception(error)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_locked(self, key: str) -> Optional[MigrationPlan]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, plan = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return plan
+
+
+_cache: Optional[PlanCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """Return the process-wide plan cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PlanCache()
+        return _cache
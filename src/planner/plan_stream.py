@@ -0,0 +1,151 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from models.migration_plan import MigrationPhase
+
+PLAN_KEYS = {"phases", "testing_strategy", "rollback_plan", "risk_summary"}
+_CLOSING = {"}": "{", "]": "["}
+
+
+class PlanStreamError(ValueError):
+    """The streamed response stopped matching the plan schema."""
+
+
+class PlanStreamParser:
+    """Incremental parser for the plan object in a streamed Claude response.
+
+    Text is fed as it arrives; every phase object is validated as soon as its
+    closing brace is seen, so a response that drifts from the schema (unknown
+    keys, non-object phases, invalid or misnumbered phases, no JSON at all) is
+    rejected without waiting for the rest of the generation. Text before the
+    opening brace and after the matching closing brace is ignored.
+    """
+
+    def __init__(self, max_preamble: int = 2000):
+        self.max_preamble = max_preamble
+        self.phases: List[MigrationPhase] = []
+        self.data: Optional[Dict[str, Any]] = None
+        self._text = ""  # from the opening brace of the plan object on
+        self._pos = 0
+        self._preamble = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key_string = False
+        self._token_start = 0  # start of the key being read, or of the current phase object
+        self._expect_key = False
+        self._expect_value = False
+        self._key: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.data is not None
+
+    def feed(self, chunk: str) -> List[MigrationPhase]:
+        """Consume the next piece of text and return the phases it completed."""
+        if self.done:
+            return []
+        if not self._text:
+            start = chunk.find("{")
+            self._preamble += len(chunk) if start < 0 else start
+            if self._preamble > self.max_preamble:
+                raise PlanStreamError(f"No plan object within the first {self.max_preamble} characters")
+            if start < 0:
+                return []
+            chunk = chunk[start:]
+        self._text += chunk
+
+        completed: List[MigrationPhase] = []
+        while self._pos < len(self._text) and not self.done:
+            self._step(self._text[self._pos], completed)
+            self._pos += 1
+        return completed
+
+    def finish(self) -> Dict[str, Any]:
+        """The parsed plan object, with phases as MigrationPhase models."""
+        if self.data is None:
+            raise PlanStreamError("Response ended before the plan object was complete")
+        return dict(self.data, phases=list(self.phases))
+
+    def _step(self, ch: str, completed: List[MigrationPhase]) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._key_string:
+                    self._read_key(self._text[self._token_start:self._pos + 1])
+            return
+        if ch.isspace():
+            return
+
+        depth = len(self._stack)
+        if self._expect_value:
+            self._expect_value = False
+            if (ch != "[") if self._key == "phases" else (ch != '"'):
+                raise PlanStreamError(f"Unexpected value for {self._key!r}: {ch!r}")
+        elif depth == 1 and self._expect_key and ch not in '"}':
+            raise PlanStreamError(f"Expected a key in the plan object, got {ch!r}")
+
+        if ch == '"':
+            if depth == 2 and self._in_phases():
+                raise PlanStreamError("Phase entries must be objects")
+            self._in_string = True
+            self._key_string = depth == 1 and self._expect_key
+            if self._key_string:
+                self._token_start = self._pos
+        elif ch in "{[":
+            if depth == 2 and self._in_phases():
+                if ch != "{":
+                    raise PlanStreamError("Phase entries must be objects")
+                self._token_start = self._pos
+            self._stack.append(ch)
+            self._expect_key = depth == 0
+        elif ch in "}]":
+            if not self._stack or self._stack[-1] != _CLOSING[ch]:
+                raise PlanStreamError(f"Unbalanced {ch!r} in plan")
+            self._stack.pop()
+            if not self._stack:
+                self._finish_object()
+            elif ch == "}" and len(self._stack) == 2 and self._in_phases():
+                completed.append(self._read_phase(self._text[self._token_start:self._pos + 1]))
+        elif depth == 1:
+            if ch == ":":
+                self._expect_value = True
+            elif ch == ",":
+                self._expect_key = True
+            else:
+                raise PlanStreamError(f"Unexpected {ch!r} in the plan object")
+        elif depth == 2 and self._in_phases() and ch != ",":
+            raise PlanStreamError("Phase entries must be objects")
+
+    def _in_phases(self) -> bool:
+        return self._key == "phases" and self._stack[:2] == ["{", "["]
+
+    def _read_key(self, raw: str) -> None:
+        self._key = json.loads(raw)
+        self._expect_key = False
+        if self._key not in PLAN_KEYS:
+            raise PlanStreamError(f"Unexpected key {self._key!r} in plan")
+
+    def _read_phase(self, raw: str) -> MigrationPhase:
+        expected = len(self.phases) + 1
+        try:
+            phase = MigrationPhase(**json.loads(raw))
+        except (ValueError, TypeError) as e:
+            raise PlanStreamError(f"Phase {expected} does not match the schema: {e}") from e
+        if phase.phase_number != expected:
+            raise PlanStreamError(f"Expected phase {expected}, got phase {phase.phase_number}")
+        self.phases.append(phase)
+        return phase
+
+    def _finish_object(self) -> None:
+        try:
+            data = json.loads(self._text[:self._pos + 1])
+        except ValueError as e:
+            raise PlanStreamError(f"Plan is not valid JSON: {e}") from e
+        if not self.phases:
+            raise PlanStreamError("Plan has no phases")
+        self.data = data
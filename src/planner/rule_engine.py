@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from utils.config import settings
+from models.analysis import AnalysisReport, EMT4JIssue
+from models.migration_plan import MigrationPlan, MigrationPhase
+
+CLEANUP_TARGET = 0  # pseudo target version for the final cleanup phase
+
+
+@dataclass(frozen=True)
+class VersionStep:
+    target: int
+    name: str
+    recipe: str
+
+
+@dataclass(frozen=True)
+class IssueRule:
+    target: int  # JDK version whose phase handles the issue (CLEANUP_TARGET for cleanup)
+    recipes: Tuple[str, ...] = ()
+    manual_step: Optional[str] = None
+    confidence: float = 1.0
+
+
+VERSION_STEPS = (
+    VersionStep(11, "Upgrade to Java 11", "org.openrewrite.java.migrate.Java8toJava11"),
+    VersionStep(17, "Upgrade to Java 17", "org.openrewrite.java.migrate.UpgradeToJava17"),
+    VersionStep(21, "Upgrade to Java 21", "org.openrewrite.java.migrate.UpgradeToJava21"),
+)
+
+CLEANUP_RECIPES = (
+    "org.openrewrite.java.format.AutoFormat",
+    "org.openrewrite.java.RemoveUnusedImports",
+    "org.openrewrite.staticanalysis.RemoveUnusedPrivateFields",
+)
+
+# Keyed by issue code or by a dotted prefix of it; lookup walks from the full
+# code to shorter prefixes, so each probe is a dict hit.
+ISSUE_RULES: Dict[str, IssueRule] = {
+    "sun.misc.BASE64Encoder": IssueRule(11, ("org.openrewrite.java.migrate.UseJavaUtilBase64",)),
+    "sun.misc.BASE64Decoder": IssueRule(11, ("org.openrewrite.java.migrate.UseJavaUtilBase64",)),
+    "javax.xml.bind": IssueRule(11, ("org.openrewrite.java.migrate.javax.AddJaxbDependencies",)),
+    "javax.xml.ws": IssueRule(11, ("org.openrewrite.java.migrate.javax.AddJaxwsDependencies",)),
+    "javax.annotation": IssueRule(11, ("org.openrewrite.java.migrate.javax.AddCommonAnnotationsDependencies",)),
+    "javax.activation": IssueRule(11, ("org.openrewrite.java.migrate.javax.AddJaxbDependencies",)),
+    "sun.misc.Unsafe": IssueRule(11, manual_step="Replace sun.misc.Unsafe usages with VarHandle or supported APIs",
+                                 confidence=0.8),
+    "sun.reflect": IssueRule(11, manual_step="Replace sun.reflect internals with java.lang.invoke / StackWalker",
+                             confidence=0.8),
+    "com.sun.image.codec.jpeg": IssueRule(11, manual_step="Replace com.sun.image.codec.jpeg with javax.imageio",
+                                          confidence=0.8),
+    "jdk.nashorn": IssueRule(17, manual_step="Add the standalone org.openjdk.nashorn dependency or migrate scripts",
+                             confidence=0.8),
+    "java.lang.SecurityManager": IssueRule(17, manual_step="Remove SecurityManager usage (deprecated for removal)",
+                                           confidence=0.8),
+    "java.rmi.activation": IssueRule(17, manual_step="Replace RMI Activation, removed in Java 17", confidence=0.8),
+    "java.lang.Thread.stop": IssueRule(21, manual_step="Replace Thread.stop with cooperative interruption",
+                                       confidence=0.8),
+    "java.lang.Object.finalize": IssueRule(CLEANUP_TARGET,
+                                           manual_step="Replace finalize() with Cleaner or try-with-resources",
+                                           confidence=0.8),
+}
+
+# Coarser fallback keyed by issue category; counts for less than an exact rule.
+CATEGORY_RULES: Dict[str, IssueRule] = {
+    "removed_api": IssueRule(11, confidence=0.5),
+    "internal_api": IssueRule(11, confidence=0.5),
+    "removed_module": IssueRule(11, confidence=0.5),
+    "deprecated_api": IssueRule(17, confidence=0.5),
+    "jvm_option": IssueRule(11, manual_step="Update removed or changed JVM options in launch scripts",
+                            confidence=0.6),
+}
+
+
+def lookup_rule(issue: EMT4JIssue) -> Optional[IssueRule]:
+    """Find the most specific rule for an issue: exact code, dotted prefixes, then category."""
+    code = issue.issue_code
+    while code:
+        rule = ISSUE_RULES.get(code)
+        if rule is not None:
+            return rule
+        cut = code.rfind(".")
+        code = code[:cut] if cut > 0 else ""
+    return CATEGORY_RULES.get(issue.category)
+
+
+class RuleBasedPlanner:
+    """Deterministic planner built from the version pair and an indexed issue rule table."""
+
+    def plan(self, report: AnalysisReport) -> Tuple[Optional[MigrationPlan], float]:
+        """Return (plan, confidence); plan is None when the version pair is not covered.
+
+        A report without issues gives no evidence that the rules fit the
+        project, so its confidence is 0.0.
+        """
+        steps = [s for s in VERSION_STEPS if report.from_version < s.target <= report.to_version]
+        if not steps or steps[-1].target != report.to_version:
+            return None, 0.0
+
+        targets = [s.target for s in steps]
+        unique = {id(i): i for issues in report.issues_by_category.values() for i in issues}
+        matched: Dict[int, List[Tuple[EMT4JIssue, IssueRule]]] = {t: [] for t in targets + [CLEANUP_TARGET]}
+        weight = 0.0
+        for issue in unique.values():
+            rule = lookup_rule(issue)
+            if rule is None:
+                continue
+            weight += rule.confidence
+            target = rule.target if rule.target in matched else self._nearest_target(rule.target, targets)
+            if target is None:
+                continue  # the issue only matters for a later JDK than this migration's target
+            matched[target].append((issue, rule))
+        confidence = weight / len(unique) if unique else 0.0
+
+        phases = [self._version_phase(n, step, matched[step.target])
+                  for n, step in enumerate(steps, start=1)]
+        phases.append(self._cleanup_phase(len(phases) + 1, matched[CLEANUP_TARGET]))
+
+        plan = MigrationPlan(
+            project_name=report.project_name,
+            from_version=str(report.from_version),
+            to_version=str(report.to_version),
+            total_phases=len(phases),
+            total_estimated_hours=sum(p.estimated_effort_hours for p in phases),
+            phases=phases,
+            testing_strategy="Compile and run the full test suite after every phase",
+            rollback_plan="Git revert the phase commit",
+            risk_summary=f"Rule-based plan covering {len(unique)} issues (confidence {confidence:.2f})",
+        )
+        return plan, confidence
+
+    def _nearest_target(self, target: int, targets: List[int]) -> Optional[int]:
+        """Map a rule's JDK version onto the first phase reaching it; None if the migration stops below it."""
+        later = [t for t in targets if t >= target]
+        return later[0] if later else None
+
+    def _version_phase(self, number: int, step: VersionStep,
+                       matched: List[Tuple[EMT4JIssue, IssueRule]]) -> MigrationPhase:
+        recipes = [step.recipe]
+        manual_steps: List[str] = []
+        for _, rule in matched:
+            recipes.extend(r for r in rule.recipes if r not in recipes)
+            if rule.manual_step and rule.manual_step not in manual_steps:
+                manual_steps.append(rule.manual_step)
+        manual_steps.append("Verify compilation and run the test suite")
+
+        manual_issues = sum(1 for _, rule in matched if not rule.recipes)
+        high_priority = sum(1 for issue, _ in matched if issue.priority == "P1")
+        risk = "HIGH" if manual_issues > 20 else "MEDIUM" if manual_issues or high_priority else "LOW"
+        return MigrationPhase(
+            phase_number=number,
+            name=step.name,
+            description=f"Apply the {step.recipe.rsplit('.', 1)[-1]} recipe and resolve issues "
+                        f"blocking Java {step.target}",
+            openrewrite_recipes=recipes,
+            manual_steps=manual_steps,
+            risk_level=risk,
+            estimated_effort_hours=4 + manual_issues,
+            dependencies=[number - 1] if number > 1 else [],
+        )
+
+    def _cleanup_phase(self, number: int, matched: List[Tuple[EMT4JIssue, IssueRule]]) -> MigrationPhase:
+        manual_steps = list(dict.fromkeys(rule.manual_step for _, rule in matched if rule.manual_step))
+        return MigrationPhase(
+            phase_number=number,
+            name="Cleanup",
+            description="Format code and remove unused imports and fields",
+            openrewrite_recipes=list(CLEANUP_RECIPES),
+            manual_steps=manual_steps or ["Review the formatting changes"],
+            risk_level="LOW",
+            estimated_effort_hours=2 + len(matched),
+            dependencies=[number - 1],
+        )
+
+
+def plan_with_rules(report: AnalysisReport) -> Optional[MigrationPlan]:
+    """Return a rule-based plan when it is confident enough to skip the LLM, else None."""
+    if not settings.RULE_PLANNER_ENABLED:
+        return None
+    plan, confidence = RuleBasedPlanner().plan(report)
+    if plan is None:
+        logger.info(f"Java {report.from_version} to {report.to_version} is not covered by the rule-based "
+                    f"planner, deferring to Claude")
+        return None
+    if confidence < settings.RULE_PLANNER_MIN_CONFIDENCE:
+        logger.info(f"Rule-based plan confidence {confidence:.2f} too low, deferring to Claude")
+        return None
+    logger.info(f"Using rule-based plan (confidence {confidence:.2f})")
+    return plan
@@ -0,0 +1,276 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+
+from utils.config import settings
+from utils.metrics import get_metrics
+from models.analysis import AnalysisReport, EMT4JIssue
+from models.migration_plan import MigrationPlan, MigrationPhase, PlanStreamEvent
+from .ai_planner import (AIMigrationPlanner, PLAN_RESPONSE_FORMAT, RECIPE_CONTEXT, SYSTEM_PROMPT,
+                         extract_plan_json, plan_events, record_token_usage)
+from .llm_client import PRIORITY_INTERACTIVE, get_llm_client
+from .plan_cache import PlanCache, get_plan_cache, plan_digest
+from .rule_engine import plan_with_rules
+
+# Ordering of well-known recipes; phases are merged and chained by this rank.
+RECIPE_RANK = {
+    "org.openrewrite.java.migrate.Java8toJava11": 10,
+    "org.openrewrite.java.migrate.UpgradeToJava17": 20,
+    "org.openrewrite.java.migrate.UpgradeToJava21": 30,
+}
+UNKNOWN_RECIPE_RANK = 40  # framework / library recipes after the JDK upgrades
+MANUAL_ONLY_RANK = 50     # module specific manual work
+CLEANUP_RANK = 60         # formatting and static analysis last
+CLEANUP_PREFIXES = (
+    "org.openrewrite.java.format.",
+    "org.openrewrite.staticanalysis.",
+    "org.openrewrite.java.cleanup.",
+    "org.openrewrite.java.RemoveUnusedImports",
+)
+RISK_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+MAX_MERGED_NOTES = 3      # distinct shard texts kept per plan-level field
+
+
+def module_of(file_path: str) -> str:
+    """Module directory of a project-relative source path ("." for the root module).
+
+    Reports carry no project tree, so unlike analyzer.incremental.find_module_root
+    this goes by layout: the module is whatever precedes the first ``src`` segment.
+    """
+    parts = file_path.split("/")
+    if "src" not in parts[:-1]:
+        return "."
+    return "/".join(parts[:parts.index("src")]) or "."
+
+
+def phase_rank(phase: MigrationPhase) -> int:
+    if not phase.openrewrite_recipes:
+        return MANUAL_ONLY_RANK
+    ranks = []
+    for recipe in phase.openrewrite_recipes:
+        if recipe in RECIPE_RANK:
+            ranks.append(RECIPE_RANK[recipe])
+        elif recipe.startswith(CLEANUP_PREFIXES):
+            ranks.append(CLEANUP_RANK)
+        else:
+            ranks.append(UNKNOWN_RECIPE_RANK)
+    return min(ranks)
+
+
+@dataclass
+class ReportShard:
+    name: str
+    issues: List[EMT4JIssue] = field(default_factory=list)
+
+    def summarize(self, max_examples: int = 3) -> List[Dict[str, Any]]:
+        """Collapse issues to one row per issue code so prompt size tracks distinct rules, not hits."""
+        rows: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for issue in self.issues:
+            row = rows.get(issue.issue_code)
+            if row is None:
+                row = rows[issue.issue_code] = {
+                    "issue_code": issue.issue_code,
+                    "category": issue.category,
+                    "priority": issue.priority,
+                    "count": 0,
+                    "description": issue.description[:200],
+                    "suggestion": issue.suggestion[:200],
+                    "example_files": [],
+                }
+            row["count"] += 1
+            if len(row["example_files"]) < max_examples and issue.file_path not in row["example_files"]:
+                row["example_files"].append(issue.file_path)
+        return list(rows.values())
+
+
+class ShardedMigrationPlanner:
+    """Map-reduce planner: plan each module/category shard concurrently, then merge the phases."""
+
+    def __init__(self, max_concurrency: Optional[int] = None, shard_max_codes: Optional[int] = None,
+                 cache: Optional[PlanCache] = None, priority: int = PRIORITY_INTERACTIVE,
+                 use_cache: Optional[bool] = None):
+        self.priority = priority
+        self.max_concurrency = max_concurrency or settings.PLANNER_MAX_CONCURRENCY
+        self.shard_max_codes = shard_max_codes or settings.PLANNER_SHARD_MAX_CODES
+        self.model = settings.AI_MODEL
+        if use_cache is None:
+            use_cache = cache is not None or settings.PLAN_CACHE_ENABLED
+        self.cache = (cache or get_plan_cache()) if use_cache else None
+
+    @staticmethod
+    def should_shard(report: AnalysisReport) -> bool:
+        threshold: int = settings.PLANNER_SHARD_THRESHOLD
+        return report.total_issues >= threshold
+
+    def shard_report(self, report: AnalysisReport) -> List[ReportShard]:
+        """Split issues by module, falling back to category for single-module projects.
+
+        Shards holding more distinct issue codes than shard_max_codes are split further.
+        """
+        unique = {id(i): i for issues in report.issues_by_category.values() for i in issues}
+        issues = list(unique.values())
+
+        groups: Dict[str, List[EMT4JIssue]] = {}
+        for issue in issues:
+            groups.setdefault(module_of(issue.file_path), []).append(issue)
+        if len(groups) <= 1:
+            groups = {}
+            for issue in issues:
+                groups.setdefault(issue.category, []).append(issue)
+
+        shards: List[ReportShard] = []
+        for name, group in sorted(groups.items()):
+            codes: "OrderedDict[str, List[EMT4JIssue]]" = OrderedDict()
+            for issue in group:
+                codes.setdefault(issue.issue_code, []).append(issue)
+            code_lists = list(codes.values())
+            chunks = [code_lists[i:i + self.shard_max_codes]
+                      for i in range(0, len(code_lists), self.shard_max_codes)]
+            for n, chunk in enumerate(chunks):
+                shard_name = name if len(chunks) == 1 else f"{name}#{n + 1}"
+                shards.append(ReportShard(shard_name, [i for code in chunk for i in code]))
+        return shards
+
+    def create_migration_plan(self, report: AnalysisReport) -> MigrationPlan:
+        """Synchronous entry point; plans shards concurrently on an event loop."""
+        rule_plan = plan_with_rules(report)
+        if rule_plan is not None:
+            return rule_plan
+        if self.cache is None:
+            return asyncio.run(self._create(report))[0]
+        plan, _ = self.cache.get_or_create(self._cache_key(report), lambda: asyncio.run(self._create(report)))
+        return plan.model_copy(update={"project_name": report.project_name}, deep=True)
+
+    def stream_migration_plan(self, report: AnalysisReport) -> Iterator[PlanStreamEvent]:
+        """Shard plans are only final after the merge renumbers them, so phases follow the full plan."""
+        yield from plan_events(self.create_migration_plan(report))
+
+    async def acreate_migration_plan(self, report: AnalysisReport) -> MigrationPlan:
+        rule_plan = plan_with_rules(report)
+        if rule_plan is not None:
+            return rule_plan
+        if self.cache is None:
+            return (await self._create(report))[0]
+        plan, _ = await self.cache.aget_or_create(self._cache_key(report), lambda: self._create(report))
+        return plan.model_copy(update={"project_name": report.project_name}, deep=True)
+
+    def _cache_key(self, report: AnalysisReport) -> str:
+        return plan_digest(report, f"{self.model}:sharded")
+
+    async def _create(self, report: AnalysisReport) -> Tuple[MigrationPlan, bool]:
+        shards = self.shard_report(report)
+        logger.info(f"Planning {len(shards)} shards with concurrency {self.max_concurrency}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._plan_shard(semaphore, report, shard) for shard in shards))
+
+        shard_plans = [r for r in results if r is not None]
+        if not shard_plans:
+            logger.error("All shard plans failed, using fallback plan")
+            return AIMigrationPlanner(use_cache=False)._create_fallback_plan(report), False
+        if len(shard_plans) < len(shards):
+            logger.warning(f"{len(shards) - len(shard_plans)} of {len(shards)} shards failed to plan")
+        return self.merge(report, shard_plans), len(shard_plans) == len(shards)
+
+    async def _plan_shard(self, semaphore: asyncio.Semaphore, report: AnalysisReport,
+                          shard: ReportShard) -> Optional[Dict[str, Any]]:
+        prompt = self._build_shard_prompt(report, shard)
+        async with semaphore:
+            try:
+                with get_metrics().timer("llm_request_duration_seconds", planner="sharded") as labels:
+                    labels["status"] = "error"
+                    message = await get_llm_client().acreate(
+                        priority=self.priority,
+                        model=self.model,
+                        max_tokens=settings.AI_MAX_TOKENS,
+                        temperature=0,
+                        system=SYSTEM_PROMPT,
+                        messages=[{"role": "user", "content": prompt}],
+                    )
+                    labels["status"] = "ok"
+                record_token_usage(message, "sharded")
+                data = extract_plan_json(message.content[0].text)
+                data["phases"] = [MigrationPhase(**p) for p in data.get("phases", [])]
+                return data
+            except Exception as e:
+                logger.error(f"Failed to plan shard {shard.name}: {e}")
+                return None
+
+    def _build_shard_prompt(self, report: AnalysisReport, shard: ReportShard) -> str:
+        rows = "\n".join(
+            f"        - {r['issue_code']} [{r['category']}/{r['priority']}] x{r['count']}: "
+            f"{r['description']} (fix: {r['suggestion']}; e.g. {', '.join(r['example_files'])})"
+            for r in shard.summarize()
+        )
+        return f"""
+        Analyze this slice of a Java project report and create a migration plan from Java {report.from_version} to {report.to_version}.
+        The slice will be merged with plans for the rest of the project, so only cover these issues.
+
+        Project: {report.project_name}
+        Slice: {shard.name} ({len(shard.issues)} of {report.total_issues} issues)
+        Issues in this slice (code [category/priority] xcount: description):
+{rows}
+        {PLAN_RESPONSE_FORMAT}
+        {RECIPE_CONTEXT}
+        """
+
+    def merge(self, report: AnalysisReport, shard_plans: List[Dict[str, Any]]) -> MigrationPlan:
+        """Reduce shard phases into one plan: phases sharing a primary recipe merge, ranks form the dependency chain.
+
+        The primary recipe is a phase's first; the other recipes of merged phases
+        are unioned. Plan-level texts keep the first few distinct shard answers.
+        """
+        merged: "OrderedDict[tuple, MigrationPhase]" = OrderedDict()
+        for data in shard_plans:
+            for phase in data["phases"]:
+                key = tuple(phase.openrewrite_recipes[:1]) or ("manual", phase.name.lower())
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = phase.model_copy(deep=True)
+                    continue
+                existing.openrewrite_recipes.extend(
+                    r for r in phase.openrewrite_recipes if r not in existing.openrewrite_recipes)
+                existing.manual_steps.extend(s for s in phase.manual_steps if s not in existing.manual_steps)
+                existing.estimated_effort_hours += phase.estimated_effort_hours
+                if RISK_ORDER.get(phase.risk_level, 1) > RISK_ORDER.get(existing.risk_level, 1):
+                    existing.risk_level = phase.risk_level
+
+        ordered = sorted(merged.values(), key=phase_rank)
+        phases: List[MigrationPhase] = []
+        previous_level: List[int] = []
+        current_level: List[int] = []
+        current_rank = None
+        for number, phase in enumerate(ordered, start=1):
+            rank = phase_rank(phase)
+            if rank != current_rank:
+                previous_level, current_level, current_rank = current_level or previous_level, [], rank
+            phases.append(phase.model_copy(update={"phase_number": number,
+                                                   "dependencies": list(previous_level)}))
+            current_level.append(number)
+
+        def distinct(key: str, default: str) -> str:
+            values = list(dict.fromkeys(str(d[key]) for d in shard_plans if d.get(key)))
+            if len(values) > MAX_MERGED_NOTES:
+                values = values[:MAX_MERGED_NOTES] + [f"(and {len(values) - MAX_MERGED_NOTES} more from other shards)"]
+            return " ".join(values) if values else default
+
+        return MigrationPlan(
+            project_name=report.project_name,
+            from_version=str(report.from_version),
+            to_version=str(report.to_version),
+            total_phases=len(phases),
+            total_estimated_hours=sum(p.estimated_effort_hours for p in phases),
+            phases=phases,
+            testing_strategy=distinct("testing_strategy", "Standard unit testing"),
+            rollback_plan=distinct("rollback_plan", "Git revert"),
+            risk_summary=distinct("risk_summary", "Standard migration risks"),
+        )
+
+
+def select_planner(report: AnalysisReport, sharded: Optional[bool] = None,
+                   priority: int = PRIORITY_INTERACTIVE):
+    """Pick the sharded planner for large reports (or when forced), the single-call planner otherwise."""
+    use_shards = sharded if sharded is not None else ShardedMigrationPlanner.should_shard(report)
+    return ShardedMigrationPlanner(priority=priority) if use_shards else AIMigrationPlanner(priority=priority)
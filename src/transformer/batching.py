@@ -0,0 +1,91 @@
+from typing import Dict, Iterable, List, Set
+import yaml
+from models.migration_plan import MigrationPhase
+
+COMPOSITE_RECIPE_PREFIX = "com.javamodernize.batch"
+
+
+def parse_phase_range(spec: str) -> List[int]:
+    """Parse a phase selection such as "1-3" or "1,3-4" into sorted phase numbers."""
+    numbers: Set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start)
+            last = int(end) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid phase range: {spec!r}")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid phase range: {spec!r}")
+        numbers.update(range(first, last + 1))
+    if not numbers:
+        raise ValueError(f"Invalid phase range: {spec!r}")
+    return sorted(numbers)
+
+
+def unmet_dependencies(phases: Iterable[MigrationPhase], applied: Iterable[int] = ()) -> Dict[int, List[int]]:
+    """Map each phase that cannot run to the dependencies it is missing.
+
+    A dependency is met when it is applied or selected itself; a phase that
+    depends on a phase with unmet dependencies cannot run either.
+    """
+    phases = sorted(phases, key=lambda p: p.phase_number)
+    available = set(applied) | {p.phase_number for p in phases}
+    unmet: Dict[int, List[int]] = {}
+    for phase in phases:
+        missing = sorted(d for d in phase.dependencies if d not in available or d in unmet)
+        if missing:
+            unmet[phase.phase_number] = missing
+    return unmet
+
+
+def batch_phases(phases: Iterable[MigrationPhase], applied: Iterable[int] = ()) -> List[List[MigrationPhase]]:
+    """Group phases into runs that can share one rewrite invocation.
+
+    A phase joins the current batch when every dependency is already applied or
+    earlier in that batch; otherwise the batch is closed and a new one started.
+    Phases without recipes are left out and treated as applied.
+    """
+    done = set(applied)
+    batches: List[List[MigrationPhase]] = []
+    current: List[MigrationPhase] = []
+    in_batch: Set[int] = set()
+    for phase in sorted(phases, key=lambda p: p.phase_number):
+        if not phase.openrewrite_recipes:
+            done.add(phase.phase_number)
+            continue
+        if current and not set(phase.dependencies) <= done | in_batch:
+            batches.append(current)
+            done |= in_batch
+            current, in_batch = [], set()
+        current.append(phase)
+        in_batch.add(phase.phase_number)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def batch_recipes(batch: List[MigrationPhase]) -> List[str]:
+    """Recipes of a batch in phase order, each listed once."""
+    return list(dict.fromkeys(r for phase in batch for r in phase.openrewrite_recipes))
+
+
+def composite_recipe_name(batch: List[MigrationPhase]) -> str:
+    numbers = [p.phase_number for p in batch]
+    return f"{COMPOSITE_RECIPE_PREFIX}.Phases{numbers[0]}to{numbers[-1]}"
+
+
+def composite_recipe_yaml(batch: List[MigrationPhase]) -> str:
+    """Declarative rewrite.yml recipe running every recipe of the batch over one parsed LST."""
+    numbers = ", ".join(str(p.phase_number) for p in batch)
+    document: str = yaml.safe_dump({
+        "type": "specs.openrewrite.org/v1beta/recipe",
+        "name": composite_recipe_name(batch),
+        "displayName": f"Migration phases {numbers}",
+        "description": f"Composite of migration phases {numbers}.",
+        "recipeList": batch_recipes(batch),
+    }, sort_keys=False)
+    return document
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+
+import git
+
+from utils.config import settings
+from utils.file_utils import ensure_directory
+from utils.git_utils import EXCLUDE_PATHSPECS, open_repo
+from models.transformation import DiffPage, FileDiff
+
+# Identity for the unreferenced commits created to check snapshots out into worktrees.
+SNAPSHOT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "java-modernize",
+    "GIT_AUTHOR_EMAIL": "java-modernize@localhost",
+    "GIT_COMMITTER_NAME": "java-modernize",
+    "GIT_COMMITTER_EMAIL": "java-modernize@localhost",
+}
+
+
+class ChangeCapture:
+    """Content-addressed snapshots of a project tree, diffed on demand.
+
+    A snapshot is a git tree object written from a private index file, so only
+    files whose stat changed since the previous snapshot are re-hashed and only
+    new content is stored. Projects under git share the repository's object
+    database; other projects get a bare shadow repository in the cache dir.
+    Neither the working tree, the real index nor any ref is touched, and
+    gitignored files (.env, logs, local binaries) are never stored.
+    """
+
+    def __init__(self, project_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None):
+        self.project_path = Path(project_path).resolve()
+        cache = ensure_directory(Path(os.path.expanduser(str(cache_dir or settings.CHANGE_CAPTURE_DIR))))
+        self._cache = cache
+        key = self._key(self.project_path)
+
+        repo = open_repo(self.project_path)
+        if repo is not None and repo.working_tree_dir is not None:
+            git_dir = repo.git_dir
+            work_tree = Path(repo.working_tree_dir).resolve()
+        else:
+            git_dir = str(cache / f"{key}.git")
+            if not os.path.isdir(git_dir):
+                git.Repo.init(git_dir, bare=True)
+            work_tree = self.project_path
+        self.prefix = self.project_path.relative_to(work_tree).as_posix()
+        self._git = git.Git(str(work_tree))
+        self._env = {
+            "GIT_DIR": git_dir,
+            "GIT_WORK_TREE": str(work_tree),
+            "GIT_INDEX_FILE": str(cache / f"{key}.index"),
+        }
+
+    def snapshot(self) -> str:
+        """Record the current tree and return its id (usable as a baseline or result ref)."""
+        pathspec = [self.prefix] if self.prefix != "." else ["."]
+        self._run("add", "--all", "--", *pathspec, *EXCLUDE_PATHSPECS)
+        return self._run("write-tree").strip()
+
+    def changed_files(self, base: str, head: str) -> List[Tuple[str, str]]:
+        """Return (status, path) for every file differing between two snapshots, paths project-relative."""
+        output = self._run("diff-tree", "-r", "--name-status", "--no-renames", *self._relative(), base, head)
+        changes = []
+        for line in output.splitlines():
+            status, _, path = line.partition("\t")
+            if path:
+                changes.append((status, path))
+        return changes
+
+    def iter_file_diffs(self, base: str, head: str, paths: Optional[List[str]] = None,
+                        batch_size: int = 100) -> Iterator[FileDiff]:
+        """Yield unified diffs file by file, asking git for batch_size files at a time."""
+        changes = self.changed_files(base, head)
+        if paths is not None:
+            wanted = set(paths)
+            changes = [c for c in changes if c[1] in wanted]
+        for start in range(0, len(changes), batch_size):
+            chunk = changes[start:start + batch_size]
+            patches = self._patches(base, head, [path for _, path in chunk])
+            for status, path in chunk:
+                yield FileDiff(path=path, status=status, diff=patches.get(path, ""))
+
+    def diff_page(self, base: str, head: str, offset: int = 0, limit: int = 50) -> DiffPage:
+        """One page of per-file diffs; only the files on the page are diffed."""
+        changes = self.changed_files(base, head)
+        page = changes[offset:offset + limit]
+        patches = self._patches(base, head, [path for _, path in page])
+        return DiffPage(
+            baseline_ref=base,
+            result_ref=head,
+            total=len(changes),
+            offset=offset,
+            files=[FileDiff(path=path, status=status, diff=patches.get(path, "")) for status, path in page],
+        )
+
+    def unified_diff(self, base: str, head: str) -> str:
+        return self._run("diff", "--no-renames", *self._relative(), base, head)
+
+    def apply(self, base: str, head: str) -> None:
+        """Apply the changes between two snapshots to the working tree (not the index).
+
+        Raises git.GitCommandError if the patch does not apply cleanly.
+        """
+        patch = self._run("diff", "--binary", "--no-renames", base, head)
+        if not patch:
+            return
+        with tempfile.NamedTemporaryFile("w", suffix=".patch", delete=False) as f:
+            f.write(patch)
+        try:
+            self._run("apply", "--whitespace=nowarn", f.name)
+        finally:
+            os.unlink(f.name)
+
+    @contextmanager
+    def worktree(self, tree: str) -> Iterator[Path]:
+        """Check a snapshot out into a temporary worktree; yields the project directory inside it."""
+        commit = self._run_with(SNAPSHOT_IDENTITY, "commit-tree", tree, "-m", "java-modernize snapshot").strip()
+        path = Path(tempfile.mkdtemp(prefix="java-modernize-wt-"))
+        worktree_env = {"GIT_DIR": self._env["GIT_DIR"]}
+        self._git.execute(["git", "worktree", "add", "--detach", "--force", str(path), commit], env=worktree_env)
+        try:
+            yield path / self.prefix if self.prefix != "." else path
+        finally:
+            try:
+                self._git.execute(["git", "worktree", "remove", "--force", str(path)], env=worktree_env)
+            except git.GitCommandError as e:
+                logger.debug(f"Could not remove worktree {path}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            self._git.execute(["git", "worktree", "prune"], env=worktree_env)
+            project = (path / self.prefix if self.prefix != "." else path).resolve()
+            (self._cache / f"{self._key(project)}.index").unlink(missing_ok=True)
+
+    def _patches(self, base: str, head: str, paths: List[str]) -> dict:
+        if not paths:
+            return {}
+        scoped = [p if self.prefix == "." else f"{self.prefix}/{p}" for p in paths]
+        output = self._run("diff", "--no-renames", *self._relative(), base, head, "--", *scoped)
+        patches: Dict[str, str] = {}
+        current: Optional[str] = None
+        lines: List[str] = []
+        for line in output.splitlines(keepends=True):
+            if line.startswith("diff --git "):
+                if current is not None:
+                    patches[current] = "".join(lines)
+                current = line.rstrip("\n").split(" b/", 1)[-1]
+                lines = []
+            lines.append(line)
+        if current is not None:
+            patches[current] = "".join(lines)
+        return patches
+
+    @staticmethod
+    def _key(project_path: Path) -> str:
+        return hashlib.sha1(str(project_path).encode()).hexdigest()[:16]
+
+    def _relative(self) -> List[str]:
+        return [f"--relative={self.prefix}/"] if self.prefix != "." else []
+
+    def _run(self, *args: str) -> str:
+        return self._git.execute(["git", *args], env=self._env, strip_newline_in_stdout=False)
+
+    def _run_with(self, env: dict, *args: str) -> str:
+        return self._git.execute(["git", *args], env={**self._env, **env}, strip_newline_in_stdout=False)
+
+
+def capture_for(project_path: Union[str, Path]) -> Optional[ChangeCapture]:
+    """ChangeCapture for a project, or None when capture is disabled or git is unavailable."""
+    if not settings.CHANGE_CAPTURE_ENABLED:
+        return None
+    try:
+        return ChangeCapture(project_path)
+    except (git.GitCommandError, git.GitCommandNotFound, OSError) as e:
+        logger.warning(f"Change capture unavailable for {project_path}: {e}")
+        return None
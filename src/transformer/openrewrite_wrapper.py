@@ -1,28 +1,81 @@
 import subprocess
 import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set
 from loguru import logger
+from git import GitCommandError
 from utils.config import settings
 from utils.file_utils import detect_build_tool
+from utils.jvm_pool import get_worker_pool
+from utils.build_modules import BuildModule, dependency_waves, discover_modules
 from models.transformation import TransformationResult
+from models.migration_plan import MigrationPhase
+from .change_capture import ChangeCapture, capture_for
+from .batching import batch_phases, batch_recipes, composite_recipe_name, composite_recipe_yaml, unmet_dependencies
+
+# Maven's message when a -pl module needs a sibling artifact that is not in the local repository.
+UNRESOLVED_DEPENDENCIES = "Could not resolve dependencies"
 
 class OpenRewriteTransformer:
     def __init__(self):
         self.maven_plugin_version = settings.OPENREWRITE_MAVEN_PLUGIN_VERSION
+        self.pool = get_worker_pool()
+
+    def run_recipes(self, project_path: str, recipes: List[str], dry_run: bool = False,
+                    config_location: Optional[str] = None) -> TransformationResult:
+        """Run OpenRewrite recipes on the project and record which files they changed."""
+        capture = capture_for(project_path) if not dry_run else None
+        baseline = self._snapshot(capture)
+        result = self._execute_recipes(project_path, recipes, dry_run, config_location)
+        if baseline is None:
+            return result
+
+        head = self._snapshot(capture)
+        if capture is None or head is None:
+            return result
+        changes = capture.changed_files(baseline, head)
+        result.changed_files = [path for _, path in changes]
+        result.baseline_ref, result.result_ref = baseline, head
+        if len(changes) <= settings.TRANSFORM_INLINE_DIFF_MAX_FILES:
+            result.diff = capture.unified_diff(baseline, head)
+        logger.info(f"{len(changes)} files changed (baseline {baseline[:12]}, result {head[:12]})")
+        return result
+
+    def _snapshot(self, capture: Optional[ChangeCapture]) -> Optional[str]:
+        if capture is None:
+            return None
+        try:
+            return capture.snapshot()
+        except GitCommandError as e:
+            logger.warning(f"Could not snapshot project tree: {e}")
+            return None
 
-    def run_recipes(self, project_path: str, recipes: List[str], dry_run: bool = False) -> TransformationResult:
-        """Run OpenRewrite recipes on the project."""
+    def _execute_recipes(self, project_path: str, recipes: List[str], dry_run: bool,
+                         config_location: Optional[str]) -> TransformationResult:
         build_tool = detect_build_tool(project_path)
         
         logger.info(f"Detected build tool: {build_tool}")
         logger.info(f"Applying recipes: {recipes}")
         
         recipes_arg = ",".join(recipes)
+
+        # Gradle builds share lock files under the root project, so only Maven reactors are split.
+        if build_tool == "maven" and settings.TRANSFORM_PARALLEL_MODULES:
+            modules = [m for m in discover_modules(project_path, build_tool)
+                       if not m.is_root or (Path(project_path) / "src").exists()]
+            if len(modules) > 1:
+                result = self._run_modules(project_path, modules, recipes_arg, dry_run, config_location)
+                if result is not None:
+                    return result
+                logger.warning("Sibling modules are not installed in the local repository, "
+                               "falling back to a whole-reactor run")
         
         try:
             if build_tool == "maven":
-                self._run_maven(project_path, recipes_arg, dry_run)
+                self._run_maven(project_path, recipes_arg, dry_run, config_location)
             elif build_tool == "gradle":
                 self._run_gradle(project_path, recipes_arg, dry_run)
             else:
@@ -52,22 +105,133 @@ class OpenRewriteTransformer:
                 compilation_success=False
             )
 
-    def _run_maven(self, project_path: str, recipes: str, dry_run: bool):
-        cmd = [
-            "./mvnw" if (Path(project_path) / "mvnw").exists() else "mvn",
+    def run_phases(self, project_path: str, phases: Iterable[MigrationPhase], dry_run: bool = False,
+                   applied: Optional[Iterable[int]] = None) -> Dict[int, TransformationResult]:
+        """Run several plan phases, batching dependency-compatible runs into one rewrite invocation.
+
+        Every phase of a batch gets the batch result; phases after a failed batch are skipped.
+        When ``applied`` is given, phases whose dependencies are neither selected
+        nor applied are not run and get a failed result naming the missing phases;
+        ``None`` leaves dependency ordering to the caller (the pipeline runners).
+        """
+        phases = list(phases)
+        results: Dict[int, TransformationResult] = {}
+        if applied is not None:
+            applied = list(applied)
+            unmet = unmet_dependencies(phases, applied)
+            for number, missing in unmet.items():
+                logger.error(f"Phase {number} depends on phases {missing}, which are neither selected nor applied")
+                results[number] = TransformationResult(
+                    success=False, changed_files=[], diff="", compilation_success=False,
+                    errors=[f"Skipped: depends on phases {missing}, which are neither selected nor applied"],
+                )
+            phases = [p for p in phases if p.phase_number not in unmet]
+        for phase in phases:
+            if not phase.openrewrite_recipes:
+                logger.warning(f"Phase {phase.phase_number} has no recipes; manual steps: {phase.manual_steps}")
+                results[phase.phase_number] = TransformationResult(
+                    success=True, changed_files=[], diff="", errors=[], compilation_success=True
+                )
+
+        failed = False
+        for batch in batch_phases(phases, applied or ()):
+            numbers = [p.phase_number for p in batch]
+            if failed:
+                result = TransformationResult(success=False, changed_files=[], diff="",
+                                              errors=["Skipped: an earlier phase failed"],
+                                              compilation_success=False)
+            else:
+                logger.info(f"Running phases {numbers} in a single rewrite invocation")
+                result = self._run_batch(project_path, batch, dry_run)
+                failed = not result.success
+            for number in numbers:
+                results[number] = result.model_copy(deep=True)
+        return dict(sorted(results.items()))
+
+    def _run_batch(self, project_path: str, batch: List[MigrationPhase], dry_run: bool) -> TransformationResult:
+        if len(batch) == 1 or detect_build_tool(project_path) != "maven":
+            return self.run_recipes(project_path, batch_recipes(batch), dry_run)
+
+        # Keep the project's own declarative recipes visible next to the composite one.
+        existing = Path(project_path) / "rewrite.yml"
+        documents = [existing.read_text()] if existing.exists() else []
+        documents.append(composite_recipe_yaml(batch))
+        with tempfile.TemporaryDirectory(prefix="rewrite-batch-") as tmp:
+            config = Path(tmp) / "rewrite.yml"
+            config.write_text("\n---\n".join(documents))
+            return self.run_recipes(project_path, [composite_recipe_name(batch)], dry_run,
+                                    config_location=str(config))
+
+    def _run_modules(self, project_path: str, modules: List[BuildModule], recipes: str,
+                     dry_run: bool, config_location: Optional[str]) -> Optional[TransformationResult]:
+        """Run the recipes per Maven module, in parallel within each wave of the module dependency graph.
+
+        A module whose upstream module failed is skipped. Without ``-am`` Maven
+        resolves sibling modules from the local repository; if they were never
+        installed, None is returned so the caller can run the whole reactor.
+        """
+        waves = dependency_waves(modules)
+        workers = settings.TRANSFORM_MAX_PARALLEL_MODULES or self.pool.size
+        logger.info(f"Transforming {len(modules)} modules in {len(waves)} waves with {workers} workers")
+
+        unresolved = threading.Event()
+
+        def run_module(module: BuildModule) -> Optional[str]:
+            if unresolved.is_set():
+                return f"{module.name}: skipped"
+            try:
+                self._run_maven(project_path, recipes, dry_run, config_location, module)
+                return None
+            except subprocess.CalledProcessError as e:
+                if UNRESOLVED_DEPENDENCIES in f"{e.output or ''}{e.stderr or ''}":
+                    unresolved.set()
+                logger.error(f"Transformation of module {module.name} failed: {e.output}")
+                return f"{module.name}: {e}"
+
+        errors: List[str] = []
+        failed: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rewrite-module") as executor:
+            for wave in waves:
+                runnable = []
+                for module in wave:
+                    if failed.intersection(module.dependencies):
+                        failed.add(module.name)
+                        errors.append(f"{module.name}: skipped, an upstream module failed")
+                    else:
+                        runnable.append(module)
+                for module, error in zip(runnable, executor.map(run_module, runnable), strict=True):
+                    if error:
+                        failed.add(module.name)
+                        errors.append(error)
+                if unresolved.is_set():
+                    return None
+
+        return TransformationResult(
+            success=not errors,
+            changed_files=[],
+            diff="",
+            errors=errors,
+            compilation_success=not errors
+        )
+
+    def _run_maven(self, project_path: str, recipes: str, dry_run: bool, config_location: Optional[str] = None,
+                   module: Optional[BuildModule] = None):
+        args = [
             "rewrite:run" if not dry_run else "rewrite:dryRun",
             f"-Drewrite.activeRecipes={recipes}"
         ]
+        if config_location:
+            args.append(f"-Drewrite.configLocation={config_location}")
+        if module is not None:
+            args.extend(["-N"] if module.is_root else ["-pl", module.path])
         
-        logger.info(f"Running: {' '.join(cmd)}")
-        subprocess.run(cmd, cwd=project_path, check=True, capture_output=True, text=True)
+        self.pool.run_maven(project_path, args, check=True, capture_output=True, text=True)
 
     def _run_gradle(self, project_path: str, recipes: str, dry_run: bool):
-        cmd = [
-            "./gradlew" if (Path(project_path) / "gradlew").exists() else "gradle",
-            "rewriteRun" if not dry_run else "rewriteDryRun",
+        task = "rewriteRun" if not dry_run else "rewriteDryRun"
+        args = [
+            task,
             f"-Drewrite.activeRecipes={recipes}"
         ]
         
-        logger.info(f"Running: {' '.join(cmd)}")
-        subprocess.run(cmd, cwd=project_path, check=True, capture_output=True, text=True)
+        self.pool.run_gradle(project_path, args, check=True, capture_output=True, text=True)
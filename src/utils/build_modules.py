@@ -0,0 +1,125 @@
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from loguru import logger
+from lxml import etree
+
+from .file_utils import detect_build_tool
+
+GRADLE_SETTINGS = ("settings.gradle", "settings.gradle.kts")
+GRADLE_BUILD_FILES = ("build.gradle", "build.gradle.kts")
+_GRADLE_INCLUDE = re.compile(r"^\s*include\s*\(?([^)\n]*)\)?", re.MULTILINE)
+_QUOTED = re.compile(r"""["']([^"']+)["']""")
+_GRADLE_PROJECT_DEP = re.compile(r"""project\s*\(\s*(?:path\s*[:=]\s*)?["']([^"']+)["']""")
+
+
+@dataclass
+class BuildModule:
+    name: str   # artifactId for Maven, project path (":a:b") for Gradle
+    path: str   # directory relative to the build root, "." for the root project
+    dependencies: List[str] = field(default_factory=list)  # names of other modules in the build
+
+    @property
+    def is_root(self) -> bool:
+        return self.path == "."
+
+
+def discover_modules(project_path: Union[str, Path], build_tool: Optional[str] = None) -> List[BuildModule]:
+    """List the modules of a multi-module build with their intra-build dependencies.
+
+    Returns a single root module for single-module builds, and an empty list when
+    the build files cannot be read.
+    """
+    root = Path(project_path)
+    build_tool = build_tool or detect_build_tool(root)
+    try:
+        if build_tool == "maven":
+            return _maven_modules(root)
+        if build_tool == "gradle":
+            return _gradle_modules(root)
+    except (OSError, etree.XMLSyntaxError) as e:
+        logger.warning(f"Could not read module structure of {root}: {e}")
+    return []
+
+
+def dependency_waves(modules: List[BuildModule]) -> List[List[BuildModule]]:
+    """Topologically layer modules: each wave only depends on modules of earlier waves."""
+    by_name = {m.name: m for m in modules}
+    remaining = {m.name: {d for d in m.dependencies if d in by_name and d != m.name} for m in modules}
+    waves: List[List[BuildModule]] = []
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            logger.warning(f"Dependency cycle between modules {sorted(remaining)}; running them together")
+            ready = list(remaining)
+        waves.append([by_name[name] for name in ready])
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return waves
+
+
+def _child(element, tag: str) -> Optional[str]:
+    node = element.find(f"{{*}}{tag}")
+    if node is None:
+        node = element.find(tag)
+    return node.text.strip() if node is not None and node.text else None
+
+
+def _children(element, path: str) -> List[str]:
+    nodes = element.findall("/".join(f"{{*}}{p}" for p in path.split("/"))) or element.findall(path)
+    return [n.text.strip() for n in nodes if n.text]
+
+
+def _maven_modules(root: Path) -> List[BuildModule]:
+    poms: Dict[str, etree._Element] = {}
+    pending = ["."]
+    while pending:
+        rel = pending.pop()
+        if rel in poms:
+            continue
+        pom = root / rel / "pom.xml"
+        if not pom.exists():
+            logger.warning(f"Module {rel} listed without a pom.xml")
+            continue
+        tree = etree.parse(str(pom)).getroot()
+        poms[rel] = tree
+        for module in _children(tree, "modules/module"):
+            pending.append(posixpath.normpath(posixpath.join(rel, module.strip())))
+
+    artifacts = {rel: _child(tree, "artifactId") or rel for rel, tree in poms.items()}
+    known = set(artifacts.values())
+    modules = []
+    for rel, tree in poms.items():
+        deps = [d for d in _children(tree, "dependencies/dependency/artifactId") if d in known]
+        parent = tree.find("{*}parent")
+        if parent is None:
+            parent = tree.find("parent")
+        parent_id = _child(parent, "artifactId") if parent is not None else None
+        if parent_id is not None and parent_id in known:
+            deps.append(parent_id)
+        modules.append(BuildModule(artifacts[rel], rel, list(dict.fromkeys(deps))))
+    return sorted(modules, key=lambda m: m.path)
+
+
+def _gradle_modules(root: Path) -> List[BuildModule]:
+    settings_file = next((root / f for f in GRADLE_SETTINGS if (root / f).exists()), None)
+    names = [":"]
+    if settings_file is not None:
+        for match in _GRADLE_INCLUDE.finditer(settings_file.read_text()):
+            for project in _QUOTED.findall(match.group(1)):
+                names.append(project if project.startswith(":") else f":{project}")
+
+    modules = []
+    for name in dict.fromkeys(names):
+        rel = name.strip(":").replace(":", "/") or "."
+        build_file = next((root / rel / f for f in GRADLE_BUILD_FILES if (root / rel / f).exists()), None)
+        deps = []
+        if build_file is not None:
+            deps = [d if d.startswith(":") else f":{d}"
+                    for d in _GRADLE_PROJECT_DEP.findall(build_file.read_text())]
+        modules.append(BuildModule(name, rel, list(dict.fromkeys(deps))))
+    return sorted(modules, key=lambda m: m.path)
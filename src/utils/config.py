@@ -1,3 +1,4 @@
+import threading
 from typing import List, Dict, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -6,6 +7,7 @@ class Settings(BaseSettings):
     # App Config
     APP_ENV: str = "development"
     LOG_LEVEL: str = "INFO"
+    METRICS_ENABLED: bool = True  # in-process timings exported at /metrics and by --profile
     LOG_FORMAT: str = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 
     # AI Config
@@ -13,19 +15,106 @@ class Settings(BaseSettings):
     ANTHROPIC_API_KEE: Optional[str] = None
     AI_MODEL: str = "claude-3-haiku-20240307"
     AI_MAX_TOKENS: int = 4096
+    PLAN_STREAM_MAX_ATTEMPTS: int = 2  # streamed plans that diverge from the schema are requested again
+
+    # Shared LLM Client
+    LLM_MAX_CONCURRENCY: int = 8  # in-flight Claude requests per process
+    LLM_REQUESTS_PER_MINUTE: int = 50  # 0 = unlimited
+    LLM_TOKENS_PER_MINUTE: int = 80000  # input + output tokens, 0 = unlimited
+    LLM_MAX_RETRIES: int = 4  # on 429/529/5xx and connection errors
+    LLM_RETRY_BASE_SECONDS: float = 1.0
+    LLM_RETRY_MAX_SECONDS: float = 30.0
+
+    # Sharded Planning
+    PLANNER_SHARD_THRESHOLD: int = 500  # issues; larger reports are planned in shards
+    PLANNER_SHARD_MAX_CODES: int = 40   # distinct issue codes per shard prompt
+    PLANNER_MAX_CONCURRENCY: int = 4
+
+    # Planner Cache
+    PLAN_CACHE_ENABLED: bool = True
+    PLAN_CACHE_MAX_ENTRIES: int = 256
+    PLAN_CACHE_TTL_SECONDS: int = 86400
+    RULE_PLANNER_ENABLED: bool = True
+    RULE_PLANNER_MIN_CONFIDENCE: float = 0.8
 
     # Tool Config
     EMT4J_PATH: str = "~/.emt4j/emt4j-0.8.0"
     EMT4J_VERSION: str = "0.8.0"
+
+    # Analysis Cache
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_DIR: str = "~/.cache/java-modernize/analysis"
+    ANALYSIS_CACHE_MAX_MB: int = 512
+    ANALYSIS_TRIAGE_ENABLED: bool = False  # regex pre-scan decides which modules need EMT4J
+    TRIAGE_MAX_WORKERS: int = 0  # 0 = CPU count
+    TRIAGE_BATCH_SIZE: int = 500  # files per process pool task
     
     OPENREWRITE_MAVEN_PLUGIN_VERSION: str = "5.40.0"
+    TRANSFORM_PARALLEL_MODULES: bool = False  # Maven only; siblings must be installed in ~/.m2
+    TRANSFORM_MAX_PARALLEL_MODULES: int = 0  # 0 = JVM pool size
+    CHANGE_CAPTURE_ENABLED: bool = True
+    CHANGE_CAPTURE_DIR: str = "~/.cache/java-modernize/changes"
+    TRANSFORM_INLINE_DIFF_MAX_FILES: int = 50  # larger diffs are paged via baseline_ref/result_ref
+    VALIDATION_MAX_SELECTED_TESTS: int = 200  # beyond this, run all tests of the affected modules
+    VALIDATION_TEST_FORKS: int = 0  # parallel test JVMs, 0 = half the CPU count
+    VALIDATION_COVERAGE_ENABLED: bool = True
+    JACOCO_VERSION: str = "0.8.12"
+    VALIDATION_COVERAGE_HISTORY: str = "~/.cache/java-modernize/coverage.json"
+    VALIDATION_GRADLE_INIT_DIR: str = "~/.cache/java-modernize/gradle"
+    VALIDATION_BUILD_LOG_DIR: str = "logs/build"
+    VALIDATION_BUILD_LOG_KEEP: int = 20
+
+    # JVM Worker Pool
+    JVM_POOL_SIZE: int = 0  # concurrent jobs per tool, 0 = CPU count
+    JVM_POOL_USE_MVND: bool = True
+    JVM_POOL_CDS_ARCHIVE: bool = False  # requires JDK 19+
+    JVM_POOL_CDS_DIR: str = "~/.cache/java-modernize/cds"
+    JVM_POOL_WARMUP_TIMEOUT_SECONDS: int = 300
+    JVM_POOL_DAEMON_PROJECTS_FILE: str = "~/.cache/java-modernize/gradle-daemons.json"  # read by stop-daemons
+    EMT4J_JVM_OPTS: str = "-Xshare:auto -XX:+UseSerialGC"
     
+    # API Job Queue
+    JOBS_DB_PATH: str = "~/.cache/java-modernize/jobs.sqlite3"
+    JOBS_MAX_WORKERS: int = 4
+    JOBS_MAX_PENDING: int = 500
+    JOBS_EVENT_POLL_SECONDS: float = 0.5
+
+    # Migration Pipeline
+    PIPELINE_CHECKPOINT_DIR: str = "~/.cache/java-modernize/pipelines"
+    PIPELINE_SPECULATE: bool = True  # run phase N+1 in a worktree while phase N validates
+    PIPELINE_PARALLEL_PHASES: bool = False  # run independent phases side by side in worktrees
+    PIPELINE_MAX_PARALLEL_PHASES: int = 0  # 0 = half the JVM pool size
+
     # Migration Defaults
     DEFAULT_FROM_VERSION: int = 8
     DEFAULT_TO_VERSION: int = 21
 
+    # Fleet Analysis
+    FLEET_MAX_WORKERS: int = 0  # 0 = derive from CPU count and available memory
+    FLEET_MEMORY_PER_JOB_MB: int = 1024
+    FLEET_PROJECT_TIMEOUT_SECONDS: int = 1800
+    FLEET_REPORT_SUFFIX: str = ".json"  # e.g. ".jsonl.gz" for compact per-project reports
+    PORTFOLIO_DB_PATH: str = "~/.cache/java-modernize/portfolio.sqlite3"
+
     class Config:
         env_file = ".env"
         extra = "ignore"
 
-settings = Settings()
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment and .env on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings()
+        return _settings
+
+
+def __getattr__(name: str):
+    # `settings` is created on first access rather than at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
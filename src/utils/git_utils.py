@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+from loguru import logger
+
+import git
+
+from .manifest import SKIP_DIRS
+
+# Build output and IDE state never belong in a snapshot.
+EXCLUDE_PATHSPECS = [f":(exclude,glob)**/{d}/**" for d in sorted(SKIP_DIRS)]
+
+
+def open_repo(path: Union[str, Path]) -> Optional[git.Repo]:
+    """Return the git repository containing path, or None if it is not under git."""
+    try:
+        return git.Repo(path, search_parent_directories=True)
+    except (git.InvalidGitRepositoryError, git.NoSuchPathError):
+        return None
+
+
+def write_worktree_tree(repo: git.Repo) -> str:
+    """Write a tree object of repo's working tree, untracked (non-ignored) files included.
+
+    Files are staged into a private copy of the index, so only files whose stat
+    changed are re-hashed and neither the real index nor any ref is touched.
+    """
+    with tempfile.TemporaryDirectory(prefix="java-modernize-index-") as tmp:
+        index = os.path.join(tmp, "index")
+        real_index = os.path.join(repo.git_dir, "index")
+        if os.path.exists(real_index):
+            shutil.copyfile(real_index, index)
+        env = {"GIT_INDEX_FILE": index}
+        repo.git.add("--all", "--", ".", *EXCLUDE_PATHSPECS, env=env)
+        tree: str = repo.git.write_tree(env=env)
+        return tree.strip()
+
+
+def snapshot_revision(path: Union[str, Path]) -> Optional[str]:
+    """Return an id capturing the current working tree state of path's repo.
+
+    This is HEAD's commit id when the tree is clean, otherwise the id of a tree
+    object written by write_worktree_tree, which also covers untracked files.
+    """
+    repo = open_repo(path)
+    if repo is None or repo.working_tree_dir is None:
+        return None
+    try:
+        tree = write_worktree_tree(repo)
+        head = repo.head.commit if repo.head.is_valid() else None
+        return head.hexsha if head is not None and head.tree.hexsha == tree else tree
+    except (git.GitCommandError, ValueError) as e:
+        logger.debug(f"Could not snapshot {path}: {e}")
+        return None
+
+
+def changed_paths_since(path: Union[str, Path], revision: str) -> Optional[List[str]]:
+    """List files under path that differ from revision, relative to path.
+
+    The current tree, untracked (non-ignored) files included, is compared with
+    revision, so files left untracked since the snapshot are not reported
+    again. Returns None if path is not under git or the revision is unknown.
+    """
+    repo = open_repo(path)
+    if repo is None or repo.working_tree_dir is None:
+        return None
+
+    root = Path(repo.working_tree_dir).resolve()
+    prefix = Path(path).resolve().relative_to(root).as_posix()
+    pathspec = [prefix] if prefix != "." else []
+    try:
+        current = write_worktree_tree(repo)
+        diffed = repo.git.diff_tree("-r", "--name-only", "--no-renames", revision, current,
+                                    "--", *pathspec).splitlines()
+    except git.GitCommandError as e:
+        logger.debug(f"git diff against {revision} failed: {e}")
+        return None
+
+    changed = []
+    for rel in diffed:
+        if not rel:
+            continue
+        if prefix == ".":
+            changed.append(rel)
+        elif rel.startswith(prefix + "/"):
+            changed.append(rel[len(prefix) + 1:])
+    return changed
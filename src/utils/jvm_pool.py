@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+from loguru import logger
+
+from .config import settings
+from .file_utils import ensure_directory
+from .metrics import children_peak_rss_bytes, get_metrics
+
+
+class JvmWorkerPool:
+    """Process-wide gateway for every JVM-backed tool invocation.
+
+    Startup cost is amortized by routing builds through long-lived daemons
+    (``mvnd`` when installed, the Gradle daemon otherwise) and by bounding
+    concurrency per tool so jobs queue for an already warm daemon instead of
+    forcing a fresh one to spawn. EMT4J has no resident server mode, so its
+    launches get class-data-sharing and fast-startup JVM flags instead.
+    """
+
+    TOOLS = ("maven", "gradle", "emt4j")
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or settings.JVM_POOL_SIZE or os.cpu_count() or 1
+        self._slots = {tool: threading.BoundedSemaphore(self.size) for tool in self.TOOLS}
+        self._mvnd = shutil.which("mvnd") if settings.JVM_POOL_USE_MVND else None
+        self._daemon_projects: Dict[str, set] = {"maven": set(), "gradle": set()}
+        self._lock = threading.Lock()
+
+    def maven_command(self, project_path: str) -> List[str]:
+        if self._mvnd:
+            return [self._mvnd]
+        return ["./mvnw" if (Path(project_path) / "mvnw").exists() else "mvn"]
+
+    def gradle_command(self, project_path: str) -> List[str]:
+        launcher = "./gradlew" if (Path(project_path) / "gradlew").exists() else "gradle"
+        return [launcher, "--daemon"]
+
+    def run(self, tool: str, cmd: List[str], cwd: Optional[str] = None,
+            env: Optional[Dict[str, str]] = None, **kwargs) -> subprocess.CompletedProcess:
+        """Run cmd once a slot for tool is free; kwargs are passed to subprocess.run.
+
+        Slot wait, run time (labelled with the outcome) and the children's peak
+        RSS are recorded in the metrics registry.
+        """
+        kwargs.setdefault("capture_output", "stdout" not in kwargs and "stderr" not in kwargs)
+        metrics = get_metrics()
+        queued = time.perf_counter()
+        with self._slots[tool]:
+            metrics.observe("subprocess_queue_wait_seconds", time.perf_counter() - queued, tool=tool)
+            logger.info(f"Running: {' '.join(cmd)}")
+            with metrics.timer("subprocess_duration_seconds", tool=tool) as labels:
+                labels["status"] = "error"
+                result = subprocess.run(cmd, cwd=cwd, env=env, **kwargs)
+                labels["status"] = "ok" if result.returncode == 0 else "failed"
+            peak = children_peak_rss_bytes()
+            if peak is not None:
+                metrics.set_max("subprocess_peak_rss_bytes", peak)
+            return result
+
+    def run_maven(self, project_path: str, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        self._track("maven", project_path)
+        return self.run("maven", self.maven_command(project_path) + args, cwd=project_path, **kwargs)
+
+    def run_gradle(self, project_path: str, args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        self._track("gradle", project_path)
+        return self.run("gradle", self.gradle_command(project_path) + args, cwd=project_path, **kwargs)
+
+    def run_build(self, build_tool: str, project_path: str, maven_args: List[str],
+                  gradle_args: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """Dispatch to Maven or Gradle with the matching arguments."""
+        if build_tool == "maven":
+            return self.run_maven(project_path, maven_args, **kwargs)
+        if build_tool == "gradle":
+            return self.run_gradle(project_path, gradle_args, **kwargs)
+        raise ValueError(f"Unsupported build tool: {build_tool}")
+
+    def run_emt4j(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        env = dict(os.environ)
+        opts = self._emt4j_jvm_options()
+        if opts:
+            env["JAVA_TOOL_OPTIONS"] = f"{env.get('JAVA_TOOL_OPTIONS', '')} {opts}".strip()
+        return self.run("emt4j", cmd, env=env, **kwargs)
+
+    def warm_up(self, project_path: str, build_tool: str) -> None:
+        """Start (or touch) the build daemon for a project so the next real build skips JVM boot."""
+        try:
+            self.run_build(build_tool, project_path, ["-q", "validate"], ["-q", "help"],
+                           check=False, timeout=settings.JVM_POOL_WARMUP_TIMEOUT_SECONDS)
+            logger.info(f"Warmed {build_tool} daemon for {project_path}")
+        except (subprocess.TimeoutExpired, OSError, ValueError) as e:
+            logger.warning(f"Daemon warm-up failed for {project_path}: {e}")
+
+    def shutdown(self, gradle_projects: Iterable[str] = ()) -> None:
+        """Stop the build daemons: mvnd, plus the Gradle daemons of every project seen (or on PATH).
+
+        Gradle projects are also recorded in JVM_POOL_DAEMON_PROJECTS_FILE, so a
+        later process (``stop-daemons``) can stop daemons started through
+        project ``./gradlew`` wrappers by another one.
+        """
+        if self._mvnd:
+            subprocess.run([self._mvnd, "--stop"], capture_output=True, check=False)
+        with self._lock:
+            projects = self._daemon_projects["gradle"] | self._load_daemon_projects() | set(gradle_projects)
+            launchers = {(self.gradle_command(p)[0], p) for p in projects if Path(p).is_dir()}
+            if not launchers and shutil.which("gradle"):
+                launchers.add(("gradle", None))
+            for launcher, cwd in launchers:
+                subprocess.run([launcher, "--stop"], cwd=cwd, capture_output=True, check=False)
+            self._daemon_projects = {"maven": set(), "gradle": set()}
+            self._daemon_projects_file().unlink(missing_ok=True)
+
+    def _track(self, tool: str, project_path: str) -> None:
+        with self._lock:
+            if str(project_path) in self._daemon_projects[tool]:
+                return
+            self._daemon_projects[tool].add(str(project_path))
+            if tool == "gradle":
+                recorded = self._load_daemon_projects() | {str(project_path)}
+                try:
+                    path = self._daemon_projects_file()
+                    ensure_directory(path.parent)
+                    path.write_text(json.dumps(sorted(recorded)))
+                except OSError as e:
+                    logger.warning(f"Could not record Gradle daemon project {project_path}: {e}")
+
+    @staticmethod
+    def _daemon_projects_file() -> Path:
+        return Path(os.path.expanduser(settings.JVM_POOL_DAEMON_PROJECTS_FILE))
+
+    def _load_daemon_projects(self) -> Set[str]:
+        try:
+            return set(json.loads(self._daemon_projects_file().read_text()))
+        except (OSError, ValueError):
+            return set()
+
+    def _emt4j_jvm_options(self) -> str:
+        opts: str = settings.EMT4J_JVM_OPTS
+        if settings.JVM_POOL_CDS_ARCHIVE:
+            archive_dir = ensure_directory(os.path.expanduser(settings.JVM_POOL_CDS_DIR))
+            # JDK 19+: dump the archive on first run, map it on every later run.
+            opts += f" -XX:+AutoCreateSharedArchive -XX:SharedArchiveFile={archive_dir / 'emt4j.jsa'}"
+        return opts.strip()
+
+
+_pool: Optional[JvmWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> JvmWorkerPool:
+    """Return the process-wide JVM worker pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JvmWorkerPool()
+        return _pool
@@ -0,0 +1,109 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Files whose content determines the result of an analysis or transformation.
+BUILD_FILES = {
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "settings.gradle",
+    "settings.gradle.kts",
+    "gradle.properties",
+}
+SOURCE_SUFFIXES = (".java",)
+SKIP_DIRS = {".git", ".gradle", ".idea", ".mvn", "target", "build", "out", "node_modules"}
+
+
+def is_tracked_path(rel_path: str) -> bool:
+    """True for a project-relative .java or build file path outside VCS and build output dirs."""
+    *dirs, name = rel_path.split("/")
+    return (name.endswith(SOURCE_SUFFIXES) or name in BUILD_FILES) and not SKIP_DIRS.intersection(dirs)
+
+
+def iter_tracked_files(root_dir: Union[str, Path]) -> Iterator[Path]:
+    """Yield .java and build files below root_dir, skipping VCS and build output dirs."""
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.endswith(SOURCE_SUFFIXES) or name in BUILD_FILES:
+                yield Path(dirpath) / name
+
+
+def hash_file(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileManifest:
+    """Snapshot of (mtime_ns, size) per tracked file, with lazily computed content hashes.
+
+    Stat entries give a cheap "anything changed?" check; content hashes are only
+    computed for files whose stat entry differs from a previous manifest.
+    """
+
+    def __init__(self, root: Union[str, Path], stats: Dict[str, Tuple[int, int]],
+                 hashes: Optional[Dict[str, str]] = None):
+        self.root = Path(root)
+        self.stats = stats
+        self.hashes: Dict[str, str] = hashes or {}
+
+    @classmethod
+    def scan(cls, root: Union[str, Path]) -> "FileManifest":
+        stats: Dict[str, Tuple[int, int]] = {}
+        for path in iter_tracked_files(root):
+            st = path.stat()
+            stats[path.relative_to(root).as_posix()] = (st.st_mtime_ns, st.st_size)
+        return cls(root, stats)
+
+    def same_stats(self, other: "FileManifest") -> bool:
+        return self.stats == other.stats
+
+    def changed_since(self, previous: "FileManifest") -> Tuple[List[str], List[str], List[str]]:
+        """Return (added, modified, removed) relative paths compared to a previous manifest.
+
+        Files whose stat changed but whose content hash is identical are not
+        reported as modified.
+        """
+        added = sorted(set(self.stats) - set(previous.stats))
+        removed = sorted(set(previous.stats) - set(self.stats))
+        modified = []
+        for rel in sorted(set(self.stats) & set(previous.stats)):
+            if self.stats[rel] == previous.stats[rel]:
+                continue
+            old_hash = previous.hashes.get(rel)
+            if old_hash is None or self.file_hash(rel) != old_hash:
+                modified.append(rel)
+        return added, modified, removed
+
+    def file_hash(self, rel_path: str) -> str:
+        if rel_path not in self.hashes:
+            self.hashes[rel_path] = hash_file(self.root / rel_path)
+        return self.hashes[rel_path]
+
+    def tree_hash(self, previous: Optional["FileManifest"] = None) -> str:
+        """Content hash of the whole tree, reusing hashes of unchanged files from previous."""
+        if previous is not None:
+            for rel, stat in self.stats.items():
+                if rel not in self.hashes and previous.stats.get(rel) == stat and rel in previous.hashes:
+                    self.hashes[rel] = previous.hashes[rel]
+        digest = hashlib.sha256()
+        for rel in sorted(self.stats):
+            digest.update(f"{rel}\0{self.file_hash(rel)}\n".encode())
+        return digest.hexdigest()
+
+    def to_dict(self) -> Dict:
+        return {
+            "stats": {rel: list(stat) for rel, stat in self.stats.items()},
+            "hashes": self.hashes,
+        }
+
+    @classmethod
+    def from_dict(cls, root: Union[str, Path], data: Dict) -> "FileManifest":
+        stats = {rel: (int(s[0]), int(s[1])) for rel, s in data.get("stats", {}).items()}
+        return cls(root, stats, dict(data.get("hashes", {})))
@@ -0,0 +1,180 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from .config import settings
+
+PREFIX = "java_modernize_"
+
+# Latency buckets in seconds, from sub-millisecond handlers to hour-long builds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+# name -> (type, help) for every metric the application records.
+METRICS = {
+    "subprocess_duration_seconds": ("histogram", "Wall time of JVM tool subprocesses (Maven, Gradle, EMT4J)"),
+    "subprocess_queue_wait_seconds": ("histogram", "Time spent waiting for a JVM pool slot before launching"),
+    "subprocess_peak_rss_bytes": ("gauge", "Largest resident set size reached by any finished subprocess"),
+    "llm_request_duration_seconds": ("histogram", "Latency of Claude API calls by outcome"),
+    "llm_tokens_total": ("counter", "Tokens sent to and received from Claude"),
+    "llm_queue_wait_seconds": ("histogram", "Time Claude requests waited for a client slot and rate limit budget"),
+    "llm_retries_total": ("counter", "Claude requests retried after throttling, overload or connection errors"),
+    "cache_requests_total": ("counter", "Analysis and plan cache lookups by result"),
+    "job_queue_wait_seconds": ("histogram", "Time API jobs spent queued before a worker picked them up"),
+    "job_duration_seconds": ("histogram", "Run time of API jobs"),
+    "http_request_duration_seconds": ("histogram", "Latency of API requests"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters, gauges and histograms with Prometheus text export."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_max(self, name: str, value: float, **labels: str) -> None:
+        """Raise a gauge to value if it is higher than the current reading."""
+        if not settings.METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = max(series.get(key, value), value)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(len(self.buckets) + 1)
+            hist.counts[bisect_left(self.buckets, value)] += 1
+            hist.sum += value
+            hist.count += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[Dict[str, str]]:
+        """Observe the duration of the block; labels added to the yielded dict are recorded too."""
+        extra: Dict[str, str] = {}
+        started = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels, **extra)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(set(self._values) | set(self._histograms)):
+                kind, help_text = METRICS.get(name, ("untyped", name))
+                full = PREFIX + name
+                lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+                for key, value in sorted(self._values.get(name, {}).items()):
+                    lines.append(f"{full}{self._format(key)} {value:g}")
+                for key, hist in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), hist.counts, strict=True):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{full}_bucket{self._format(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{full}_sum{self._format(key)} {hist.sum:g}")
+                    lines.append(f"{full}_count{self._format(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        """All series as plain data: counters and gauges with their value, histograms with count and sum."""
+        data: Dict[str, List[dict]] = {}
+        with self._lock:
+            for name, values in self._values.items():
+                data[name] = [{"labels": dict(key), "value": value} for key, value in values.items()]
+            for name, histograms in self._histograms.items():
+                data[name] = [{"labels": dict(key), "count": hist.count, "sum": hist.sum}
+                              for key, hist in histograms.items()]
+        return data
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _format(key: LabelKey) -> str:
+        if not key:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def children_peak_rss_bytes() -> Optional[int]:
+    """Peak RSS over all waited-for child processes, or None where getrusage is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+def write_profile(path: Union[str, Path], wall_seconds: float, command: Optional[List[str]] = None) -> Path:
+    """Dump the current metrics of this process as a JSON run profile."""
+    path = Path(path)
+    profile = {
+        "command": command if command is not None else sys.argv,
+        "wall_seconds": wall_seconds,
+        "peak_child_rss_bytes": children_peak_rss_bytes(),
+        "metrics": get_metrics().snapshot(),
+    }
+    path.write_text(json.dumps(profile, indent=2))
+    return path
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry, creating it on first use."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
@@ -1,47 +1,200 @@
+import os
 import subprocess
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
-from utils.file_utils import detect_build_tool
+from utils.config import settings
+from utils.file_utils import detect_build_tool, ensure_directory
+from utils.jvm_pool import get_worker_pool
+from utils.build_modules import BuildModule, discover_modules
 from models.transformation import ValidationResult
+from .test_impact import ClassDependencyIndex
+from .test_reports import (CoverageHistory, find_coverage_files, find_report_files, iter_test_cases,
+                           line_coverage, summarize)
+
+GRADLE_INIT_SCRIPT = """
+allprojects {{
+    tasks.withType(Test).configureEach {{
+        maxParallelForks = {forks}
+    }}
+    if ({coverage}) {{
+        plugins.withId('java') {{
+            apply plugin: 'jacoco'
+            tasks.named('test') {{ finalizedBy tasks.named('jacocoTestReport') }}
+            tasks.named('jacocoTestReport') {{ reports {{ xml.required = true }} }}
+        }}
+    }}
+}}
+"""
 
 class CompilationValidator:
-    def validate_project(self, project_path: str) -> ValidationResult:
-        """Run compilation and tests to validate the project."""
+    def __init__(self):
+        self.pool = get_worker_pool()
+
+    def validate_project(self, project_path: str, changed_files: Optional[List[str]] = None) -> ValidationResult:
+        """Run compilation and tests to validate the project.
+
+        With changed_files (project-relative), validation is incremental: no clean,
+        only affected modules are built and only impacted tests run.
+        """
+        if changed_files is not None:
+            return self.validate_changes(project_path, changed_files)
+
         build_tool = detect_build_tool(project_path)
         logger.info(f"Validating project using {build_tool}")
-        
+        return self._run(project_path, build_tool,
+                         compile_args=(["clean", "compile"], ["classes"]),
+                         test_args=(["test"], ["test"]),
+                         selected_tests=None, record_coverage=True)
+
+    def validate_changes(self, project_path: str, changed_files: List[str]) -> ValidationResult:
+        """Incremental validation scoped to the modules and tests a change can affect."""
+        build_tool = detect_build_tool(project_path)
+        if not changed_files:
+            logger.info("No changed files, nothing to validate")
+            return ValidationResult(compilation_passed=True, unit_tests_passed=True, failed_tests=[],
+                                    code_coverage_delta=0.0, new_issues_found=[], selected_tests=[])
+
+        deleted = [p for p in changed_files if p.endswith(".java") and not (Path(project_path) / p).exists()]
+        index = ClassDependencyIndex.build(project_path, deleted)
+        tests = index.impacted_tests(changed_files)
+        modules: List[BuildModule] = []
+        if tests is None:
+            logger.info("Change touches non-source files, validating the whole build")
+        else:
+            modules = [m for m in discover_modules(project_path, build_tool) if not m.is_root]
+            if len(tests) > settings.VALIDATION_MAX_SELECTED_TESTS:
+                logger.info(f"{len(tests)} impacted tests exceed the selection limit, running affected modules fully")
+                tests = None
+        affected_paths = set(changed_files) | {index.paths[c] for c in index.impacted_classes(changed_files)}
+        compile_modules = self._modules_for(modules, affected_paths)
+        test_modules = compile_modules if tests is None else \
+            self._modules_for(modules, {index.paths[t] for t in tests})
+        logger.info(f"Incremental validation: modules {[m.name for m in compile_modules] or ['<all>']}, "
+                    f"tests {'<all in modules>' if tests is None else len(tests)}")
+
+        if tests == []:
+            test_args = None
+        else:
+            maven_test = self._maven_scope(test_modules) + ["test"]
+            gradle_test = self._gradle_tasks(test_modules, "test")
+            if tests:
+                maven_test += [f"-Dtest={','.join(tests)}", "-Dsurefire.failIfNoSpecifiedTests=false",
+                               "-DfailIfNoTests=false"]
+                for test in tests:
+                    gradle_test += ["--tests", test]
+            test_args = (maven_test, gradle_test)
+
+        return self._run(project_path, build_tool,
+                         compile_args=(self._maven_scope(compile_modules) + ["compile"],
+                                       self._gradle_tasks(compile_modules, "classes")),
+                         test_args=test_args,
+                         selected_tests=tests, record_coverage=False)
+
+    def _run(self, project_path: str, build_tool: str, compile_args: Tuple[List[str], List[str]],
+             test_args: Optional[Tuple[List[str], List[str]]], selected_tests: Optional[List[str]],
+             record_coverage: bool) -> ValidationResult:
+        """Compile, then run tests in parallel forks; build output goes to a log file, results come from reports."""
+        started = time.time()
+        log_path = self._new_build_log(project_path)
         compilation_passed = False
         tests_passed = False
-        failed_tests = []
-        
-        try:
-            if build_tool == "maven":
-                # Compile
-                subprocess.run(["mvn", "clean", "compile"], cwd=project_path, check=True, capture_output=True)
-                compilation_passed = True
-                
-                # Test
-                subprocess.run(["mvn", "test"], cwd=project_path, check=True, capture_output=True)
-                tests_passed = True
-                
-            elif build_tool == "gradle":
-                # Compile
-                subprocess.run(["./gradlew", "classes"], cwd=project_path, check=True, capture_output=True)
+        failed_tests: List[str] = []
+
+        with open(log_path, "a") as log:
+            try:
+                self._build(build_tool, project_path, *compile_args, log)
                 compilation_passed = True
-                
-                # Test
-                subprocess.run(["./gradlew", "test"], cwd=project_path, check=True, capture_output=True)
+                if test_args is not None:
+                    self._build(build_tool, project_path, *self._test_options(build_tool, *test_args), log)
                 tests_passed = True
-                
-        except subprocess.CalledProcessError as e:
-            logger.error("Validation failed")
-            # In a real impl, parse output to get failed tests
-            failed_tests = ["Simulation: Test failed"]
-            
+            except (subprocess.CalledProcessError, ValueError) as e:
+                logger.error(f"Validation failed: {e}; build output in {log_path}")
+                logger.debug(self._tail(log_path))
+
+        test_cases, failed_tests = summarize(iter_test_cases(find_report_files(project_path, since=started)))
+        if compilation_passed and not tests_passed and not failed_tests:
+            failed_tests = [f"Test run failed, see {log_path}"]
+
+        coverage = line_coverage(find_coverage_files(project_path, since=started))
+        coverage_delta = 0.0
+        if coverage is not None and record_coverage and tests_passed:
+            coverage_delta = CoverageHistory(settings.VALIDATION_COVERAGE_HISTORY).record(project_path, coverage)
+
         return ValidationResult(
             compilation_passed=compilation_passed,
             unit_tests_passed=tests_passed,
             failed_tests=failed_tests if not tests_passed else [],
-            code_coverage_delta=0.0,
-            new_issues_found=[]
+            code_coverage_delta=coverage_delta,
+            new_issues_found=[],
+            selected_tests=selected_tests,
+            tests_run=sum(1 for c in test_cases if c.status != "skipped"),
+            test_cases=test_cases,
+            line_coverage=coverage,
+            build_log=str(log_path)
         )
+
+    def _build(self, build_tool: str, project_path: str, maven_args: List[str], gradle_args: List[str], log) -> None:
+        log.write(f"\n=== {build_tool}: {' '.join(maven_args if build_tool == 'maven' else gradle_args)}\n")
+        log.flush()
+        self.pool.run_build(build_tool, project_path, maven_args, gradle_args,
+                            check=True, stdout=log, stderr=subprocess.STDOUT)
+
+    def _test_options(self, build_tool: str, maven_args: List[str],
+                      gradle_args: List[str]) -> Tuple[List[str], List[str]]:
+        """Add parallel fork and coverage options to the test invocation."""
+        forks = settings.VALIDATION_TEST_FORKS or max(1, (os.cpu_count() or 2) // 2)
+        coverage = settings.VALIDATION_COVERAGE_ENABLED
+        if build_tool == "maven":
+            args = maven_args + [f"-DforkCount={forks}", "-DreuseForks=true"]
+            if coverage and "test" in args:
+                jacoco = f"org.jacoco:jacoco-maven-plugin:{settings.JACOCO_VERSION}"
+                at = args.index("test")
+                args[at:at + 1] = [f"{jacoco}:prepare-agent", "test", f"{jacoco}:report"]
+            return args, gradle_args
+        init_script = self._gradle_init_script(forks, coverage)
+        return maven_args, ["--init-script", str(init_script)] + gradle_args
+
+    def _gradle_init_script(self, forks: int, coverage: bool) -> Path:
+        script_dir = ensure_directory(os.path.expanduser(settings.VALIDATION_GRADLE_INIT_DIR))
+        path = script_dir / f"validation-forks{forks}{'-jacoco' if coverage else ''}.gradle"
+        if not path.exists():
+            path.write_text(GRADLE_INIT_SCRIPT.format(forks=forks, coverage=str(coverage).lower()))
+        return path
+
+    def _new_build_log(self, project_path: str) -> Path:
+        """Create a fresh build log file, keeping only the newest VALIDATION_BUILD_LOG_KEEP logs."""
+        log_dir = ensure_directory(settings.VALIDATION_BUILD_LOG_DIR)
+        name = f"{Path(project_path).resolve().name}-{datetime.now():%Y%m%d-%H%M%S-%f}.log"
+        logs = sorted(log_dir.glob("*.log"), key=lambda p: p.stat().st_mtime)
+        for old in logs[:max(0, len(logs) - settings.VALIDATION_BUILD_LOG_KEEP + 1)]:
+            old.unlink(missing_ok=True)
+        return log_dir / name
+
+    def _tail(self, path: Path, max_bytes: int = 4096) -> str:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - max_bytes))
+            return f.read().decode(errors="replace")
+
+    def _modules_for(self, modules: List[BuildModule], paths) -> List[BuildModule]:
+        """Modules containing any of paths (deepest module wins); empty for single-module builds."""
+        selected: Dict[str, BuildModule] = {}
+        for path in paths:
+            owners = [m for m in modules if path.startswith(m.path.rstrip("/") + "/")]
+            if owners:
+                owner = max(owners, key=lambda m: len(m.path))
+                selected[owner.name] = owner
+        return sorted(selected.values(), key=lambda m: m.path)
+
+    def _maven_scope(self, modules: List[BuildModule]) -> List[str]:
+        if not modules:
+            return []
+        return ["-pl", ",".join(m.path for m in modules), "-am"]
+
+    def _gradle_tasks(self, modules: List[BuildModule], task: str) -> List[str]:
+        if not modules:
+            return [task]
+        return [f"{m.name}:{task}" for m in modules]
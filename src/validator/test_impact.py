@@ -0,0 +1,169 @@
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from loguru import logger
+
+from utils.manifest import SKIP_DIRS
+
+_PACKAGE = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.MULTILINE)
+_IMPORT = re.compile(r"^\s*import\s+(static\s+)?([\w.]+?)(\.\*)?\s*;", re.MULTILINE)
+_IDENTIFIER = re.compile(r"\b[A-Z]\w*\b")
+_QUALIFIED = re.compile(r"\b([a-z_]\w*(?:\.[a-z_]\w*)*)\.([A-Z]\w*(?:\.[A-Z]\w*)*)")
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_SOURCE_ROOT = re.compile(r"(?:^|/)src/[^/]+/java/(?:(.+)/)?([^/]+)\.java$")
+TEST_SOURCE_DIR = "/src/test/java/"
+TEST_SUFFIXES = ("Test", "Tests", "IT", "TestCase")
+
+
+class ClassDependencyIndex:
+    """Source-level class dependency graph used to select the tests affected by a change.
+
+    Edges come from explicit, wildcard and static imports, fully qualified
+    references and references to classes of the same package. Names of nested
+    classes resolve to the source file of their outermost class. It may select
+    a few tests too many (unused imports). A reference into a project package
+    that resolves to no known source (generated code, for instance) selects all
+    tests of the referring class's module once that package changes.
+    Reflection and resource lookups are not tracked.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.paths: Dict[str, str] = {}          # fqcn -> project-relative path
+        self.classes_by_path: Dict[str, str] = {}
+        self.dependents: Dict[str, Set[str]] = {}  # fqcn -> classes that depend on it
+        self.tests: Set[str] = set()
+        self.unresolved: Dict[str, Set[str]] = {}  # fqcn -> project packages it references but can't resolve
+
+    @classmethod
+    def build(cls, root: Union[str, Path], deleted: Iterable[str] = ()) -> "ClassDependencyIndex":
+        """Index the sources under root.
+
+        ``deleted`` are project-relative paths of removed sources. They are
+        indexed by the class their path implies (``src/*/java/<package>/<Class>.java``),
+        so classes still referring to them count as their dependents.
+        """
+        index = cls(root)
+        sources: Dict[str, str] = {}
+        packages: Dict[str, Set[str]] = {}
+        for rel in deleted:
+            match = _SOURCE_ROOT.search(rel)
+            if match is None:
+                continue
+            package = (match.group(1) or "").replace("/", ".")
+            fqcn = f"{package}.{match.group(2)}" if package else match.group(2)
+            index.paths.setdefault(fqcn, rel)
+            index.classes_by_path[rel] = fqcn
+            packages.setdefault(package, set()).add(match.group(2))
+        for path in index._java_files():
+            rel = path.relative_to(index.root).as_posix()
+            try:
+                text = _COMMENT.sub(" ", path.read_text(errors="replace"))
+            except OSError as e:
+                logger.debug(f"Skipping unreadable source {rel}: {e}")
+                continue
+            match = _PACKAGE.search(text)
+            package = match.group(1) if match else ""
+            fqcn = f"{package}.{path.stem}" if package else path.stem
+            index.paths[fqcn] = rel
+            index.classes_by_path[rel] = fqcn
+            packages.setdefault(package, set()).add(path.stem)
+            sources[fqcn] = text
+            if TEST_SOURCE_DIR in f"/{rel}" and (path.stem.endswith(TEST_SUFFIXES) or path.stem.startswith("Test")):
+                index.tests.add(fqcn)
+
+        for fqcn, text in sources.items():
+            package = fqcn.rpartition(".")[0]
+            dependencies, unresolved = index._dependencies(text, package, packages)
+            for dependency in dependencies:
+                if dependency != fqcn:
+                    index.dependents.setdefault(dependency, set()).add(fqcn)
+            if unresolved:
+                index.unresolved[fqcn] = unresolved
+        logger.debug(f"Indexed {len(index.paths)} classes ({len(index.tests)} tests) under {root}")
+        return index
+
+    def impacted_classes(self, changed_paths: Iterable[str]) -> Set[str]:
+        """All classes that (transitively) depend on a class in changed_paths, including those classes."""
+        start = [self.classes_by_path[p] for p in changed_paths if p in self.classes_by_path]
+        seen = set(start)
+        queue = deque(start)
+        while queue:
+            for dependent in self.dependents.get(queue.popleft(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return seen
+
+    def impacted_tests(self, changed_paths: Iterable[str]) -> Optional[List[str]]:
+        """Test classes to run for a change, or None when the change cannot be scoped (build files etc.)."""
+        changed_paths = list(changed_paths)
+        if any(not p.endswith(".java") for p in changed_paths):
+            return None
+        tests = self.impacted_classes(changed_paths) & self.tests
+        changed_packages = {self.classes_by_path[p].rpartition(".")[0]
+                            for p in changed_paths if p in self.classes_by_path}
+        for fqcn, packages in self.unresolved.items():
+            if packages & changed_packages:
+                module = _module_prefix(self.paths[fqcn])
+                tests.update(t for t in self.tests if self.paths[t].startswith(module))
+        return sorted(tests)
+
+    def _java_files(self):
+        for path in self.root.rglob("*.java"):
+            if not SKIP_DIRS.intersection(path.relative_to(self.root).parts):
+                yield path
+
+    def _dependencies(self, text: str, package: str,
+                      packages: Dict[str, Set[str]]) -> Tuple[Set[str], Set[str]]:
+        """Classes of the index referenced by text, and project packages of references that don't resolve."""
+        deps: Set[str] = set()
+        unresolved: Set[str] = set()
+
+        def reference(name: str) -> None:
+            resolved = self._resolve(name)
+            if resolved is not None:
+                deps.add(resolved)
+            else:
+                owner = self._package_of(name, packages)
+                if owner is not None:
+                    unresolved.add(owner)
+
+        wildcard_packages = [package]
+        for static, name, wildcard in _IMPORT.findall(text):
+            if wildcard and not static and name in packages:
+                wildcard_packages.append(name)
+            else:
+                # import static a.b.C.member, import a.b.C.*, import a.b.Outer.Inner
+                reference(name)
+        for qualifier, name in _QUALIFIED.findall(text):
+            if qualifier in packages:
+                reference(f"{qualifier}.{name}")
+        identifiers = set(_IDENTIFIER.findall(text))
+        for pkg in wildcard_packages:
+            for name in packages.get(pkg, set()) & identifiers:
+                deps.add(f"{pkg}.{name}" if pkg else name)
+        return deps, unresolved
+
+    def _resolve(self, name: str) -> Optional[str]:
+        """The indexed class name refers to, dropping trailing nested-class and member segments."""
+        while name not in self.paths:
+            name, dot, _ = name.rpartition(".")
+            if not dot:
+                return None
+        return name
+
+    def _package_of(self, name: str, packages: Dict[str, Set[str]]) -> Optional[str]:
+        """The longest project package name starts with, if any."""
+        while "." in name:
+            name = name.rpartition(".")[0]
+            if name in packages:
+                return name
+        return None
+
+
+def _module_prefix(path: str) -> str:
+    """Project-relative directory of the module owning a source path ("" for the root module)."""
+    parts = path.split("/")
+    return "/".join(parts[:parts.index("src") + 1]) + "/" if "src" in parts else ""
@@ -0,0 +1,135 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+from lxml import etree
+
+from utils.manifest import SKIP_DIRS
+from models.transformation import TestCaseResult
+
+# JUnit XML written by Surefire/Failsafe (Maven) and the Gradle Test task.
+REPORT_DIRS = ("target/surefire-reports", "target/failsafe-reports", "build/test-results")
+COVERAGE_FILES = ("target/site/jacoco/jacoco.xml", "build/reports/jacoco/test/jacocoTestReport.xml")
+
+
+def _module_dirs(project_path: Union[str, Path]) -> Iterator[Path]:
+    """Project root and every nested directory that is not build output or VCS state."""
+    for dirpath, dirnames, _ in os.walk(project_path):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and d != "src"]
+        yield Path(dirpath)
+
+
+def find_report_files(project_path: Union[str, Path], since: float = 0.0) -> List[Path]:
+    """JUnit XML reports below project_path modified at or after since (epoch seconds)."""
+    reports: List[Path] = []
+    for module in _module_dirs(project_path):
+        for rel in REPORT_DIRS:
+            report_dir = module / rel
+            if report_dir.is_dir():
+                reports.extend(p for p in report_dir.rglob("*.xml")
+                               if p.name.startswith("TEST-") and p.stat().st_mtime >= since)
+    return sorted(reports)
+
+
+def iter_test_cases(report_files: Iterable[Union[str, Path]]) -> Iterator[TestCaseResult]:
+    """Stream test cases out of JUnit XML reports without building whole documents.
+
+    Each <testcase> is released once read, so memory stays flat for suites with
+    tens of thousands of tests and multi-megabyte captured output.
+    """
+    for path in report_files:
+        try:
+            for _, case in etree.iterparse(str(path), events=("end",), tag="testcase", huge_tree=True):
+                yield _to_result(case)
+                case.clear()
+                while case.getprevious() is not None:
+                    del case.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"Skipping unreadable test report {path}: {e}")
+
+
+def _to_result(case) -> TestCaseResult:
+    status, message = "passed", None
+    for child in case:
+        if child.tag in ("failure", "error"):
+            status = "failed" if child.tag == "failure" else "error"
+            message = (child.get("message") or child.get("type") or "").strip()[:500] or None
+            break
+        if child.tag == "skipped":
+            status = "skipped"
+    try:
+        duration = float(case.get("time") or 0.0)
+    except ValueError:
+        duration = 0.0
+    return TestCaseResult(class_name=case.get("classname") or "", name=case.get("name") or "",
+                          time_seconds=duration, status=status, message=message)
+
+
+def find_coverage_files(project_path: Union[str, Path], since: float = 0.0) -> List[Path]:
+    files = []
+    for module in _module_dirs(project_path):
+        for rel in COVERAGE_FILES:
+            path = module / rel
+            if path.exists() and path.stat().st_mtime >= since:
+                files.append(path)
+    return sorted(files)
+
+
+def line_coverage(coverage_files: Iterable[Union[str, Path]]) -> Optional[float]:
+    """Overall line coverage (0-100) from JaCoCo XML reports, or None without data.
+
+    Only the report-level LINE counters are read; package and class elements
+    are discarded as soon as they are parsed.
+    """
+    covered = missed = 0
+    found = False
+    for path in coverage_files:
+        try:
+            for _, elem in etree.iterparse(str(path), events=("end",), tag=("counter", "package"),
+                                           load_dtd=False, no_network=True, huge_tree=True):
+                if elem.tag == "package":
+                    elem.clear()
+                    continue
+                if elem.get("type") == "LINE" and elem.getparent().tag == "report":
+                    covered += int(elem.get("covered", 0))
+                    missed += int(elem.get("missed", 0))
+                    found = True
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"Skipping unreadable coverage report {path}: {e}")
+    if not found or covered + missed == 0:
+        return None
+    return 100.0 * covered / (covered + missed)
+
+
+class CoverageHistory:
+    """Last measured line coverage per project, used to report coverage deltas between validations."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(os.path.expanduser(str(path)))
+
+    def record(self, project_path: Union[str, Path], coverage: float) -> float:
+        """Store coverage for the project and return the change since the previous measurement."""
+        key = str(Path(project_path).resolve())
+        history = self._load()
+        previous = history.get(key)
+        history[key] = coverage
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(history, indent=2))
+        tmp.replace(self.path)
+        return coverage - previous if previous is not None else 0.0
+
+    def _load(self) -> dict:
+        try:
+            history: dict = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return history
+
+
+def summarize(cases: Iterable[TestCaseResult]) -> Tuple[List[TestCaseResult], List[str]]:
+    """Materialize cases and list failing ones as "Class#method"."""
+    results = list(cases)
+    failed = [f"{c.class_name}#{c.name}" for c in results if c.status in ("failed", "error")]
+    return results, failed
@@ -0,0 +1,171 @@
+"""Minimal local stand-in for the Anthropic Messages API.
+
+Point ``ANTHROPIC_BASE_URL`` at it to exercise the planner offline and count
+how many LLM calls a workload really makes:
+
+    python -m tests.stub_anthropic --port 8089
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8089 ANTHROPIC_API_KEE=stub ./scripts/run.sh plan ...
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PLAN = {
+    "phases": [
+        {
+            "phase_number": 1,
+            "name": "Upgrade to Java 11",
+            "description": "Apply the Java 8 to 11 migration recipes",
+            "openrewrite_recipes": ["org.openrewrite.java.migrate.Java8toJava11"],
+            "manual_steps": ["Review removed JDK APIs"],
+            "risk_level": "MEDIUM",
+            "estimated_effort_hours": 8,
+        },
+        {
+            "phase_number": 2,
+            "name": "Upgrade to Java 17",
+            "description": "Apply the Java 17 migration recipes",
+            "openrewrite_recipes": ["org.openrewrite.java.migrate.UpgradeToJava17"],
+            "manual_steps": ["Run the full test suite"],
+            "risk_level": "LOW",
+            "estimated_effort_hours": 4,
+            "dependencies": [1],
+        },
+    ],
+    "testing_strategy": "Run unit and integration tests after each phase",
+    "rollback_plan": "Git revert",
+    "risk_summary": "Moderate",
+}
+
+
+class StubAnthropicServer:
+    """Threaded HTTP server answering POST /v1/messages with a canned plan, streamed when asked."""
+
+    def __init__(self, port: int = 0, plan: Optional[Dict[str, Any]] = None, latency: float = 0.0,
+                 fail_with: Optional[int] = None, fail_times: Optional[int] = None, chunk_delay: float = 0.0):
+        self.plan = plan or DEFAULT_PLAN
+        self.latency = latency
+        self.fail_with = fail_with
+        self.fail_times = fail_times  # fail only the first n requests; None = all of them
+        self.chunk_delay = chunk_delay  # seconds between streamed events
+        self.aborted = 0
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return len(self.requests)
+
+    def response_text(self, body: Dict[str, Any]) -> str:
+        return json.dumps(self.plan)
+
+    def start(self) -> "StubAnthropicServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubAnthropicServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append(body)
+                    attempt = len(stub.requests)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.fail_with and (stub.fail_times is None or attempt <= stub.fail_times):
+                    self._send(stub.fail_with, {"type": "error",
+                                                "error": {"type": "overloaded_error", "message": "stub"}})
+                    return
+                text = stub.response_text(body)
+                message = {
+                    "id": f"msg_stub_{attempt}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body.get("model", "stub"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": len(text) // 4},
+                }
+                if body.get("stream"):
+                    self._stream(message, text)
+                else:
+                    self._send(200, message)
+
+            def _stream(self, message: Dict[str, Any], text: str):
+                """Server-sent events in the order the Messages API emits them, text in small deltas."""
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.end_headers()
+                start = dict(message, content=[], stop_reason=None,
+                             usage=dict(message["usage"], output_tokens=0))
+                events = [("message_start", {"message": start}),
+                          ("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})]
+                events += [("content_block_delta",
+                            {"index": 0, "delta": {"type": "text_delta", "text": text[i:i + 16]}})
+                           for i in range(0, len(text), 16)]
+                events += [("content_block_stop", {"index": 0}),
+                           ("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                              "usage": {"output_tokens": message["usage"]["output_tokens"]}}),
+                           ("message_stop", {})]
+                try:
+                    for name, data in events:
+                        payload = json.dumps(dict(data, type=name))
+                        self.wfile.write(f"event: {name}\ndata: {payload}\n\n".encode())
+                        self.wfile.flush()
+                        if stub.chunk_delay:
+                            time.sleep(stub.chunk_delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    stub.aborted += 1  # client closed the stream early
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep per request")
+    args = parser.parse_args()
+    server = StubAnthropicServer(port=args.port, latency=args.latency).start()
+    print(f"Stub Anthropic API listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"requests served: {server.request_count}")
+    except KeyboardInterrupt:
+        server.stop()
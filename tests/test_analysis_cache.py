@@ -0,0 +1,61 @@
+import os
+import shutil
+import pytest
+from unittest.mock import MagicMock, patch
+from src.analyzer.cache import AnalysisCache
+from src.analyzer.emt4j_wrapper import EMT4JAnalyzer
+
+@pytest.fixture
+def java_project(tmp_path):
+    project_dir = tmp_path / "cached-project"
+    (project_dir / "src").mkdir(parents=True)
+    (project_dir / "pom.xml").write_text("<project/>")
+    (project_dir / "src" / "App.java").write_text("class App {}")
+    return project_dir
+
+def test_key_tracks_content_not_mtime(java_project, tmp_path):
+    cache = AnalysisCache(cache_dir=str(tmp_path / "cache"))
+    key, manifest = cache.key_for(str(java_project), 8, 17, "0.8.0")
+
+    os.utime(java_project / "src" / "App.java")
+    assert cache.key_for(str(java_project), 8, 17, "0.8.0")[0] == key
+    assert cache.key_for(str(java_project), 8, 21, "0.8.0")[0] != key
+
+    (java_project / "src" / "App.java").write_text("class App { int x; }")
+    assert cache.key_for(str(java_project), 8, 17, "0.8.0")[0] != key
+
+def test_put_get_and_evict(java_project, tmp_path, sample_analysis_report):
+    cache = AnalysisCache(cache_dir=str(tmp_path / "cache"))
+    key, manifest = cache.key_for(str(java_project), 8, 21, "0.8.0")
+    cache.put(key, sample_analysis_report, str(java_project), manifest)
+
+    assert cache.get(key).project_name == "Test Project"
+    assert cache.get("missing") is None
+
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.get(key) is None
+
+def test_analyzer_reuses_cached_report(java_project, tmp_path):
+    with patch("src.analyzer.emt4j_wrapper.settings.ANALYSIS_CACHE_DIR", str(tmp_path / "cache")), \
+         patch("src.analyzer.emt4j_wrapper.subprocess.run",
+               return_value=MagicMock(returncode=0, stderr="")) as mock_run:
+        analyzer = EMT4JAnalyzer(use_cache=True)
+        first = analyzer.analyze_project(str(java_project), 8, 21)
+        second = analyzer.analyze_project(str(java_project), 8, 21)
+
+    assert mock_run.call_count == 1
+    assert second.total_issues == first.total_issues
+
+def test_cache_hit_from_identical_tree_keeps_project_name(java_project, tmp_path):
+    clone = tmp_path / "clone"
+    shutil.copytree(java_project, clone)
+    with patch("src.analyzer.emt4j_wrapper.settings.ANALYSIS_CACHE_DIR", str(tmp_path / "cache")), \
+         patch("src.analyzer.emt4j_wrapper.subprocess.run",
+               return_value=MagicMock(returncode=0, stderr="")) as mock_run:
+        analyzer = EMT4JAnalyzer(use_cache=True)
+        first = analyzer.analyze_project(str(java_project), 8, 21)
+        second = analyzer.analyze_project(str(clone), 8, 21)
+
+    assert mock_run.call_count == 1
+    assert (first.project_name, second.project_name) == ("cached-project", "clone")
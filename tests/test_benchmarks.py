@@ -0,0 +1,28 @@
+import json
+from benchmarks.generator import generate_project
+from benchmarks.run import compare, main
+
+def test_generator_is_deterministic_and_seeds_findings(tmp_path):
+    first = generate_project(tmp_path / "a", files=40, modules=3, deprecated_ratio=0.5, seed=7)
+    second = generate_project(tmp_path / "b", files=40, modules=3, deprecated_ratio=0.5, seed=7)
+
+    assert first.findings == second.findings and first.findings
+    assert (tmp_path / "a" / "pom.xml").read_text().count("<module>") == 3
+    finding = first.findings[0]
+    source = (tmp_path / "a" / finding["filePath"]).read_text()
+    assert source.splitlines()[finding["lineNumber"] - 1].strip().endswith(";")
+
+def test_gradle_project_layout(tmp_path):
+    generate_project(tmp_path, files=4, modules=2, build_tool="gradle")
+    assert (tmp_path / "settings.gradle").read_text() == "include 'module-0'\ninclude 'module-1'\n"
+    assert len(list(tmp_path.rglob("*.java"))) == 4
+
+def test_suite_runs_offline_and_flags_regressions(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["--files", "30", "--modules", "2", "--repeat", "1", "--output", str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    assert {"list_java_files", "parse_emt4j_report", "create_migration_plan"} <= set(results["results"])
+    slower = {"results": {k: dict(v, median=v["median"] * 2 + 1) for k, v in results["results"].items()}}
+    assert compare(results, slower, 0.2) == list(results["results"])
+    assert compare(results, results, 0.2) == []
@@ -0,0 +1,83 @@
+import git
+import pytest
+from click.testing import CliRunner
+from src.transformer.change_capture import ChangeCapture
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "app"
+    (root / "src").mkdir(parents=True)
+    (root / "target").mkdir()
+    for n in range(3):
+        (root / "src" / f"C{n}.java").write_text(f"class C{n} {{}}\n")
+    (root / "target" / "C0.class").write_bytes(b"\0")
+    return root
+
+def _edit(root):
+    (root / "src" / "C1.java").write_text("class C1 { int x; }\n")
+    (root / "src" / "C2.java").unlink()
+    (root / "src" / "C3.java").write_text("class C3 {}\n")
+    (root / "target" / "C1.class").write_bytes(b"\1")
+
+def test_snapshot_without_git(project, tmp_path):
+    capture = ChangeCapture(project, cache_dir=tmp_path / "cache")
+    base = capture.snapshot()
+    _edit(project)
+    head = capture.snapshot()
+
+    assert capture.changed_files(base, head) == [("M", "src/C1.java"), ("D", "src/C2.java"), ("A", "src/C3.java")]
+    page = capture.diff_page(base, head, offset=1, limit=1)
+    assert page.total == 3 and [f.path for f in page.files] == ["src/C2.java"]
+    assert "-class C2 {}" in page.files[0].diff
+    diffs = list(capture.iter_file_diffs(base, head, batch_size=2))
+    assert "+class C1 { int x; }" in diffs[0].diff and diffs[2].diff.startswith("diff --git a/src/C3.java")
+
+def test_snapshot_in_git_subdirectory_leaves_repo_untouched(project, tmp_path):
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    repo.git.add("app/src")
+    repo.git.commit(m="init")
+
+    capture = ChangeCapture(project, cache_dir=tmp_path / "cache")
+    base = capture.snapshot()
+    _edit(project)
+    head = capture.snapshot()
+
+    assert [p for _, p in capture.changed_files(base, head)] == ["src/C1.java", "src/C2.java", "src/C3.java"]
+    assert repo.git.diff("--cached", "--name-only") == ""
+    assert "app/src/C3.java" in repo.untracked_files
+
+def test_cli_diff_name_only(project, tmp_path, monkeypatch):
+    from src.cli.commands import cli
+    monkeypatch.setattr("src.transformer.change_capture.settings.CHANGE_CAPTURE_DIR", str(tmp_path / "cache"))
+    base = ChangeCapture(project).snapshot()
+    _edit(project)
+
+    result = CliRunner().invoke(cli, ["diff", str(project), "--base", base, "--name-only", "--limit", "2"])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[-2:] == ["M\tsrc/C1.java", "D\tsrc/C2.java"]
+
+def test_snapshot_respects_gitignore(project, tmp_path):
+    repo = git.Repo.init(project)
+    (project / ".gitignore").write_text(".env\n*.log\n")
+    (project / ".env").write_text("SECRET=1\n")
+    (project / "build.log").write_text("log\n")
+
+    tree = ChangeCapture(project, cache_dir=tmp_path / "cache").snapshot()
+    files = repo.git.ls_tree("-r", "--name-only", tree).splitlines()
+    assert sorted(files) == [".gitignore", "src/C0.java", "src/C1.java", "src/C2.java"]
+
+def test_diff_api_needs_explicit_refs(project, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.api import main
+    monkeypatch.setattr("src.transformer.change_capture.settings.CHANGE_CAPTURE_DIR", str(tmp_path / "cache"))
+    client = TestClient(main.app)
+    base = client.post("/api/snapshot", json={"project_path": str(project)}).json()["ref"]
+    _edit(project)
+    head = client.post("/api/snapshot", json={"project_path": str(project)}).json()["ref"]
+
+    assert client.get("/api/diff", params={"project_path": str(project), "base": base}).status_code == 422
+    page = client.get("/api/diff", params={"project_path": str(project), "base": base, "head": head}).json()
+    assert page["total"] == 3
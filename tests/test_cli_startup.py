@@ -0,0 +1,35 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative `-X importtime` budget for the CLI module; override on slow CI hosts.
+IMPORT_BUDGET_US = int(os.environ.get("CLI_IMPORT_BUDGET_MS", "500")) * 1000
+
+HEAVY_MODULES = ("anthropic", "httpx", "pandas", "pydantic_settings", "fastapi", "lxml", "git")
+
+def _python(*args):
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+def _loaded_heavy_modules(code):
+    probe = f"{code}\nimport sys\nprint(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY_MODULES!r})))"
+    return _python("-c", probe).stdout.strip().splitlines()[-1]
+
+def test_cli_import_stays_within_budget():
+    stderr = _python("-X", "importtime", "-c", "import cli.commands").stderr
+    cumulative = [int(m.group(1)) for m in re.finditer(r"\|\s*(\d+) \| cli\.commands$", stderr, re.M)]
+    assert cumulative and cumulative[0] < IMPORT_BUDGET_US, f"cli.commands took {cumulative}us to import"
+
+def test_help_does_not_load_heavy_dependencies():
+    assert _loaded_heavy_modules("import cli.commands") == "[]"
+    help_run = "from cli.commands import cli\ntry:\n    cli(['--help'])\nexcept SystemExit:\n    pass"
+    assert _loaded_heavy_modules(help_run) == "[]"
+
+def test_settings_are_created_on_first_access():
+    code = ("import utils.config as config\nassert config._settings is None\n"
+            "assert config.settings is config.get_settings()\nprint(config.settings.LOG_LEVEL)")
+    assert _python("-c", code).stdout.strip()
@@ -0,0 +1,49 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from src.analyzer.fleet import FleetAnalyzer, resolve_max_workers
+from src.models.analysis import FleetAnalysisResult
+
+def test_analyze_fleet_writes_report_per_project(tmp_path):
+    projects = []
+    for name in ["svc-a", "svc-b", "svc-c"]:
+        project_dir = tmp_path / name
+        project_dir.mkdir()
+        (project_dir / "pom.xml").touch()
+        projects.append(str(project_dir))
+
+    output_dir = tmp_path / "reports"
+    results = FleetAnalyzer(max_workers=2).analyze_fleet(projects, 8, 17, str(output_dir))
+
+    assert sorted(r.status for r in results) == ["completed"] * 3
+    for name in ["svc-a", "svc-b", "svc-c"]:
+        report = json.loads((output_dir / f"{name}.json").read_text())
+        assert report["project_name"] == name
+    index_lines = (output_dir / "fleet-index.jsonl").read_text().splitlines()
+    assert len(index_lines) == 3
+
+def test_resolve_max_workers_capped_by_memory():
+    with patch("src.analyzer.fleet.available_memory_mb", return_value=2048), \
+         patch("src.analyzer.fleet.os.cpu_count", return_value=16):
+        assert resolve_max_workers(8) == 2
+
+def test_cancelling_a_fleet_skips_projects_not_started(tmp_path):
+    started = []
+
+    def slow_analysis(self, project_path, from_version, to_version, report_file):
+        started.append(project_path)
+        time.sleep(0.2)
+        return FleetAnalysisResult(project_path=project_path, status="completed")
+
+    def check_cancelled():
+        if started:
+            raise RuntimeError("cancelled")
+
+    projects = [str(tmp_path / f"svc-{n}") for n in range(6)]
+    with patch.object(FleetAnalyzer, "_analyze_one", slow_analysis), \
+         patch("src.analyzer.fleet.CANCEL_POLL_SECONDS", 0.01):
+        with pytest.raises(RuntimeError):
+            FleetAnalyzer(max_workers=2).analyze_fleet(projects, 8, 17, str(tmp_path / "out"),
+                                                       check_cancelled=check_cancelled)
+    assert len(started) < len(projects)
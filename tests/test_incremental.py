@@ -0,0 +1,113 @@
+import git
+import pytest
+from unittest.mock import MagicMock
+from src.analyzer.incremental import IncrementalAnalyzer, find_module_root
+from src.utils.git_utils import snapshot_revision
+from src.models.analysis import AnalysisReport, EMT4JIssue
+
+def _issue(path, code):
+    return EMT4JIssue(file_path=path, issue_code=code, priority="P1", description="d",
+                      suggestion="s", category="removed_api")
+
+@pytest.fixture
+def multi_module_repo(tmp_path):
+    root = tmp_path / "monorepo"
+    for module in ["core", "web"]:
+        src = root / module / "src"
+        src.mkdir(parents=True)
+        (root / module / "pom.xml").write_text("<project/>")
+        (src / "Main.java").write_text(f"class {module.title()} {{}}")
+    (root / "pom.xml").write_text("<project/>")
+    repo = git.Repo.init(root)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    repo.git.add(A=True)
+    repo.git.commit(m="init")
+    return root, repo
+
+def test_find_module_root(multi_module_repo):
+    root, _ = multi_module_repo
+    assert find_module_root(str(root), "web/src/Main.java") == "web"
+    assert find_module_root(str(root), "README.md") == "."
+
+def test_reanalyze_only_rescans_changed_module(multi_module_repo):
+    root, repo = multi_module_repo
+    core_issue = _issue("core/src/Main.java", "old.core")
+    web_issue = _issue("web/src/Main.java", "old.web")
+    previous = AnalysisReport(
+        project_name="monorepo", from_version=8, to_version=17, timestamp="t",
+        total_issues=2, auto_fixable_count=0,
+        issues_by_category={"removed_api": [core_issue, web_issue]},
+        issues_by_priority={"P1": [core_issue, web_issue]},
+        source_revision=repo.head.commit.hexsha,
+    )
+    category_list = previous.issues_by_category["removed_api"]
+
+    (root / "web" / "src" / "Main.java").write_text("class Web { sun.misc.Unsafe u; }")
+
+    analyzer = MagicMock()
+    analyzer.analyze_project.return_value = AnalysisReport(
+        project_name="web", from_version=8, to_version=17, timestamp="t",
+        total_issues=1, auto_fixable_count=0,
+        issues_by_category={"removed_api": [_issue("src/Main.java", "new.web")]},
+        issues_by_priority={},
+    )
+
+    report = IncrementalAnalyzer(analyzer).reanalyze(str(root), previous)
+
+    analyzer.analyze_project.assert_called_once_with(str(root / "web"), 8, 17, fallback=False)
+    assert report.issues_by_category["removed_api"] is category_list
+    codes = sorted((i.file_path, i.issue_code) for i in category_list)
+    assert codes == [("core/src/Main.java", "old.core"), ("web/src/Main.java", "new.web")]
+    assert report.total_issues == 2
+
+def test_module_report_loaded_from_json_is_counted_once(multi_module_repo):
+    root, _ = multi_module_repo
+    issue = _issue("src/Main.java", "new.web")
+    module_report = AnalysisReport(
+        project_name="web", from_version=8, to_version=17, timestamp="t", total_issues=1, auto_fixable_count=0,
+        issues_by_category={"removed_api": [issue]}, issues_by_priority={"P1": [issue]},
+    )
+    analyzer = MagicMock()
+    # A cache hit is a fresh model_validate_json, so the groupings no longer share objects.
+    analyzer.analyze_project.return_value = AnalysisReport.model_validate_json(module_report.model_dump_json())
+    previous = AnalysisReport(project_name="monorepo", from_version=8, to_version=17, timestamp="t",
+                              total_issues=0, auto_fixable_count=0, issues_by_category={}, issues_by_priority={})
+
+    report = IncrementalAnalyzer(analyzer).analyze_modules(str(root), previous, {"web"})
+
+    assert report.total_issues == 1
+    assert [i.file_path for i in report.issues_by_priority["P1"]] == ["web/src/Main.java"]
+
+def test_failed_module_keeps_previous_issues(multi_module_repo):
+    root, repo = multi_module_repo
+    web_issue = _issue("web/src/Main.java", "old.web")
+    previous = AnalysisReport(project_name="monorepo", from_version=8, to_version=17, timestamp="t",
+                              total_issues=1, auto_fixable_count=0, issues_by_category={"removed_api": [web_issue]},
+                              issues_by_priority={"P1": [web_issue]}, source_revision=repo.head.commit.hexsha)
+    analyzer = MagicMock()
+    analyzer.analyze_project.side_effect = RuntimeError("EMT4J analysis failed")
+
+    report = IncrementalAnalyzer(analyzer).analyze_modules(str(root), previous, {"web"})
+
+    assert [i.issue_code for i in report.issues_by_category["removed_api"]] == ["old.web"]
+    assert report.total_issues == 1
+    assert report.source_revision == repo.head.commit.hexsha
+
+def test_changed_files_ignores_non_source_and_unchanged_untracked_files(multi_module_repo):
+    root, _ = multi_module_repo
+    (root / "web" / "src" / "Extra.java").write_text("class Extra {}")
+    previous = AnalysisReport(project_name="monorepo", from_version=8, to_version=17, timestamp="t",
+                              total_issues=0, auto_fixable_count=0, issues_by_category={}, issues_by_priority={},
+                              source_revision=snapshot_revision(root))
+    incremental = IncrementalAnalyzer(MagicMock())
+    assert incremental.changed_files(str(root), previous) == []
+
+    (root / "README.md").write_text("docs")
+    (root / ".github").mkdir()
+    (root / ".github" / "ci.yml").write_text("on: push")
+    assert incremental.changed_files(str(root), previous) == []
+
+    (root / "web" / "src" / "Extra.java").write_text("class Extra { int x; }")
+    assert incremental.changed_files(str(root), previous) == ["web/src/Extra.java"]
@@ -0,0 +1,46 @@
+import pytest
+from src.models.analysis import AnalysisReport, EMT4JIssue
+from src.models.issue_table import IssueTable
+
+def _issue(path, code, priority, category, fixable=False):
+    return EMT4JIssue(file_path=path, issue_code=code, priority=priority, description=f"{code} used",
+                      suggestion="fix", category=category, auto_fixable=fixable)
+
+@pytest.fixture
+def table():
+    return IssueTable.from_issues([
+        _issue("core/A.java", "sun.misc.BASE64Encoder", "P1", "removed_api", True),
+        _issue("core/B.java", "sun.misc.BASE64Encoder", "P1", "removed_api", True),
+        _issue("web/C.java", "javax.xml.bind", "P2", "removed_module"),
+        _issue("web/C.java", "sun.misc.Unsafe", "P1", "internal_api"),
+    ])
+
+def test_filter_and_count(table):
+    assert table.count_by("category") == {"removed_api": 2, "internal_api": 1, "removed_module": 1}
+    assert len(table.filter(priority="P1")) == 3
+    assert len(table.filter(file_prefix="web/", category=["internal_api", "removed_module"])) == 2
+    assert len(table.filter(auto_fixable=True, issue_code="sun.misc.Unsafe")) == 0
+    assert table.top("issue_code", 1) == [("sun.misc.BASE64Encoder", 2)]
+    assert table.count_by("file_path", "priority")[("web/C.java", "P2")] == 1
+
+def test_round_trip_report(table, sample_analysis_report):
+    report = table.to_report("proj", 8, 17, "now")
+    assert report.total_issues == 4
+    assert report.auto_fixable_count == 2
+    assert report.issues_by_priority["P1"][0] is report.issues_by_category["removed_api"][0]
+
+    again = IssueTable.from_report(report)
+    assert again.count_by("priority") == table.count_by("priority")
+    assert len(IssueTable.from_report(sample_analysis_report)) == 1
+
+def test_report_loaded_from_json_counts_each_issue_once(table):
+    report = table.to_report("proj", 8, 17, "now")
+    loaded = AnalysisReport.model_validate_json(report.model_dump_json())
+    assert loaded.issues_by_priority["P1"][0] is not loaded.issues_by_category["removed_api"][0]
+    assert len(IssueTable.from_report(loaded)) == 4
+
+def test_round_trip_keeps_raw_report_and_source_revision(table):
+    report = table.to_report("proj", 8, 17, "now", raw_report={"version": "0.8"}, source_revision="abc123")
+    again = IssueTable.from_report(report).filter(priority="P1").to_report("proj", 8, 17, "later")
+    assert again.raw_report == {"version": "0.8"}
+    assert again.source_revision == "abc123"
@@ -0,0 +1,92 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from models.job import JobInfo
+from src.api.jobs import JobManager
+
+def _wait_for(manager, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.status == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(db_path=str(tmp_path / "jobs.sqlite3"), max_workers=1, max_pending=10)
+    yield manager
+    manager.shutdown()
+
+def test_job_lifecycle_persists_result_and_events(manager):
+    def work(reporter):
+        reporter.progress(0.5, "halfway")
+        reporter.partial({"step": 1})
+        return {"answer": 42}
+
+    job = manager.submit("analyze", {"project_path": "/tmp/x"}, work)
+    done = _wait_for(manager, job.id, "completed")
+
+    assert done.result == {"answer": 42}
+    assert done.progress == 1.0
+    types = [e.type for e in manager.events_since(job.id, 0)]
+    assert types == ["status", "status", "progress", "partial", "result", "status"]
+
+def test_cancel_queued_and_running_jobs(manager):
+    release = threading.Event()
+
+    def blocking(reporter):
+        release.wait(5)
+        reporter.check_cancelled()
+        return "finished"
+
+    running = manager.submit("plan", {}, blocking)
+    queued = manager.submit("plan", {}, lambda reporter: "never")
+    _wait_for(manager, running.id, "running")
+
+    assert manager.cancel(queued.id).status == "cancelled"
+    manager.cancel(running.id)
+    release.set()
+    assert _wait_for(manager, running.id, "cancelled").result is None
+
+def test_restart_marks_unfinished_jobs_failed(tmp_path):
+    db = str(tmp_path / "jobs.sqlite3")
+    first = JobManager(db_path=db, max_workers=1)
+    block = threading.Event()
+    job = first.submit("plan", {}, lambda reporter: block.wait(5))
+    _wait_for(first, job.id, "running")
+
+    second = JobManager(db_path=db, max_workers=1)
+    assert second.get(job.id).status == "failed"
+    block.set()
+    first.shutdown()
+    second.shutdown()
+
+def test_final_events_are_logged_before_the_terminal_status(manager):
+    seen_at_finish = []
+    update = manager._store.update
+
+    def recording_update(job_id, **fields):
+        if fields.get("status") == "completed":
+            seen_at_finish.extend(e.type for e in manager.events_since(job_id, 0))
+        update(job_id, **fields)
+
+    manager._store.update = recording_update
+    job = manager.submit("plan", {}, lambda reporter: {"answer": 42})
+    _wait_for(manager, job.id, "completed")
+    assert seen_at_finish[-2:] == ["result", "status"]
+
+def test_event_stream_ends_when_the_job_disappears(monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.api import main
+    manager = MagicMock()
+    manager.get.side_effect = [JobInfo(id="j", kind="analyze", status="running", created_at=0.0), None]
+    manager.events_since.return_value = []
+    monkeypatch.setattr("src.api.main.get_job_manager", lambda: manager)
+
+    response = TestClient(main.app).get("/api/jobs/j/events")
+
+    assert response.status_code == 200 and response.text == ""
+    assert manager.get.call_count == 2
@@ -0,0 +1,56 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from src.utils.jvm_pool import JvmWorkerPool
+
+def test_maven_command_prefers_daemon(tmp_path):
+    with patch("src.utils.jvm_pool.shutil.which", return_value="/usr/bin/mvnd"):
+        assert JvmWorkerPool(size=1).maven_command(str(tmp_path)) == ["/usr/bin/mvnd"]
+
+    with patch("src.utils.jvm_pool.shutil.which", return_value=None):
+        pool = JvmWorkerPool(size=1)
+        assert pool.maven_command(str(tmp_path)) == ["mvn"]
+        (tmp_path / "mvnw").touch()
+        assert pool.maven_command(str(tmp_path)) == ["./mvnw"]
+        assert pool.gradle_command(str(tmp_path)) == ["gradle", "--daemon"]
+
+def test_run_bounds_concurrency_per_tool():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def fake_run(cmd, **kwargs):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return MagicMock(returncode=0)
+
+    pool = JvmWorkerPool(size=2)
+    with patch("src.utils.jvm_pool.subprocess.run", side_effect=fake_run):
+        threads = [threading.Thread(target=pool.run_emt4j, args=(["analysis.sh"],)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert peak == 2
+
+def test_stop_daemons_in_a_new_process_finds_wrapper_projects(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.utils.jvm_pool.settings.JVM_POOL_DAEMON_PROJECTS_FILE", str(tmp_path / "daemons.json"))
+    project, extra = tmp_path / "svc", tmp_path / "other"
+    for path in (project, extra):
+        path.mkdir()
+        (path / "gradlew").touch()
+
+    with patch("src.utils.jvm_pool.subprocess.run", return_value=MagicMock(returncode=0)):
+        JvmWorkerPool(size=1).run_gradle(str(project), ["help"])
+    with patch("src.utils.jvm_pool.shutil.which", return_value=None), \
+         patch("src.utils.jvm_pool.subprocess.run", return_value=MagicMock(returncode=0)) as stop:
+        JvmWorkerPool(size=1).shutdown([str(extra)])  # a fresh pool, as in `stop-daemons`
+
+    stopped = sorted((c.args[0], c.kwargs["cwd"]) for c in stop.call_args_list)
+    assert stopped == [(["./gradlew", "--stop"], str(extra)), (["./gradlew", "--stop"], str(project))]
+    assert not (tmp_path / "daemons.json").exists()
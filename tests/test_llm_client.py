@@ -0,0 +1,126 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from src.planner import llm_client
+from src.planner.llm_client import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LLMClient, TokenBucket
+from tests.stub_anthropic import StubAnthropicServer
+
+def _request(text):
+    return {"model": "stub", "max_tokens": 16, "messages": [{"role": "user", "content": text}]}
+
+@pytest.fixture
+def make_client():
+    clients = []
+    def make(server, **kwargs):
+        kwargs.setdefault("requests_per_minute", 0)
+        kwargs.setdefault("tokens_per_minute", 0)
+        clients.append(LLMClient("stub-key", server.base_url, **kwargs))
+        return clients[-1]
+    yield make
+    for client in clients:
+        client.close()
+
+def test_token_bucket_delay_and_debt():
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])
+    assert bucket.delay(2) == 0
+    bucket.take(2)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    bucket.take(3)  # actual usage larger than estimated
+    assert bucket.delay(1) == pytest.approx(4.0)
+    now[0] = 4.0
+    assert bucket.delay(1) == 0
+    assert bucket.delay(100) == pytest.approx(1.0)  # capped at capacity
+
+def test_token_bucket_acquire_waits_for_refill():
+    bucket = TokenBucket(6000, capacity=1)  # 100 per second
+    async def acquire_three():
+        for _ in range(3):
+            await bucket.acquire()
+    started = time.perf_counter()
+    asyncio.run(acquire_three())
+    assert time.perf_counter() - started >= 0.015
+
+def test_interactive_requests_jump_the_batch_queue(make_client):
+    with StubAnthropicServer(latency=0.3) as server:
+        client = make_client(server, max_concurrency=1)
+        first = client.submit(PRIORITY_BATCH, **_request("batch-0"))
+        while server.request_count == 0:
+            time.sleep(0.01)
+        futures = [client.submit(PRIORITY_BATCH, **_request("batch-1")),
+                   client.submit(PRIORITY_BATCH, **_request("batch-2")),
+                   client.submit(PRIORITY_INTERACTIVE, **_request("interactive"))]
+        for future in [first] + futures:
+            future.result(timeout=10)
+
+    order = [r["messages"][0]["content"] for r in server.requests]
+    assert order == ["batch-0", "interactive", "batch-1", "batch-2"]
+
+def test_overloaded_requests_are_retried(make_client, monkeypatch):
+    monkeypatch.setattr("src.planner.llm_client.settings.LLM_RETRY_BASE_SECONDS", 0.01)
+    with StubAnthropicServer(fail_with=529, fail_times=2) as server:
+        message = make_client(server, max_retries=3).create(**_request("hello"))
+    assert server.request_count == 3
+    assert message.content[0].text.startswith("{")
+
+def test_retries_give_up_after_max_retries(make_client, monkeypatch):
+    monkeypatch.setattr("src.planner.llm_client.settings.LLM_RETRY_BASE_SECONDS", 0.01)
+    with StubAnthropicServer(fail_with=429) as server:
+        with pytest.raises(llm_client.anthropic.RateLimitError):
+            make_client(server, max_retries=1).create(**_request("hello"))
+        with pytest.raises(llm_client.anthropic.BadRequestError):
+            server.fail_with = 400
+            make_client(server, max_retries=3).create(**_request("hello"))
+    assert server.request_count == 3
+
+def test_shared_client_follows_settings(monkeypatch):
+    monkeypatch.setattr("src.planner.llm_client.settings.ANTHROPIC_API_KEE", "stub-key")
+    with StubAnthropicServer() as first, StubAnthropicServer() as second:
+        with patch("src.planner.llm_client.settings.ANTHROPIC_BASE_URL", first.base_url):
+            client = llm_client.get_llm_client()
+            assert llm_client.get_llm_client() is client
+            client.create(**_request("one"))
+        with patch("src.planner.llm_client.settings.ANTHROPIC_BASE_URL", second.base_url):
+            llm_client.get_llm_client().create(**_request("two"))
+            assert llm_client.get_llm_client() is not client
+    assert first.request_count == second.request_count == 1
+
+def test_close_fails_requests_waiting_to_be_retried(make_client, monkeypatch):
+    monkeypatch.setattr("src.planner.llm_client.retry_delay", lambda *args: 60)
+    with StubAnthropicServer(fail_with=529) as server:
+        client = make_client(server, max_retries=3)
+        future = client.submit(**_request("hello"))
+        while server.request_count == 0 or not client._retrying:
+            time.sleep(0.01)
+        client.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        future.result(timeout=5)
+    with pytest.raises(RuntimeError, match="closed"):
+        client.submit(**_request("again"))
+
+def test_replaced_shared_client_finishes_requests_in_flight(monkeypatch):
+    monkeypatch.setattr("src.planner.llm_client.settings.ANTHROPIC_API_KEE", "stub-key")
+    with StubAnthropicServer(latency=0.3) as first, StubAnthropicServer() as second:
+        with patch("src.planner.llm_client.settings.ANTHROPIC_BASE_URL", first.base_url):
+            client = llm_client.get_llm_client()
+            future = client.submit(**_request("slow"))
+        with patch("src.planner.llm_client.settings.ANTHROPIC_BASE_URL", second.base_url):
+            llm_client.get_llm_client().create(**_request("fast"))
+            assert future.result(timeout=10).content[0].text.startswith("{")
+            client._thread.join(timeout=10)
+            assert not client._thread.is_alive()
+
+def test_rate_limited_batch_calls_do_not_hold_workers(make_client):
+    with StubAnthropicServer() as server:
+        client = make_client(server, max_concurrency=2, requests_per_minute=600)
+        client.request_bucket.take(600)  # empty: the next request is admitted after 0.1s
+        futures = [client.submit(PRIORITY_BATCH, **_request("batch-0")),
+                   client.submit(PRIORITY_BATCH, **_request("batch-1"))]
+        time.sleep(0.02)
+        futures.append(client.submit(PRIORITY_INTERACTIVE, **_request("interactive")))
+        for future in futures:
+            future.result(timeout=10)
+
+    order = [r["messages"][0]["content"] for r in server.requests]
+    assert order == ["interactive", "batch-0", "batch-1"]
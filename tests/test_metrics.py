@@ -0,0 +1,61 @@
+import json
+import pytest
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+from src.utils.jvm_pool import JvmWorkerPool
+from src.utils.metrics import MetricsRegistry
+from src.utils import jvm_pool
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc("llm_tokens_total", 120, direction="input")
+    registry.observe("subprocess_duration_seconds", 0.5, tool="maven")
+    registry.observe("subprocess_duration_seconds", 2.0, tool="maven")
+    with registry.timer("http_request_duration_seconds", route='/a"b') as labels:
+        labels["status"] = "200"
+
+    text = registry.render()
+    assert "# TYPE java_modernize_llm_tokens_total counter" in text
+    assert 'java_modernize_llm_tokens_total{direction="input"} 120' in text
+    assert 'java_modernize_subprocess_duration_seconds_bucket{tool="maven",le="0.1"} 0' in text
+    assert 'java_modernize_subprocess_duration_seconds_bucket{tool="maven",le="1"} 1' in text
+    assert 'java_modernize_subprocess_duration_seconds_bucket{tool="maven",le="+Inf"} 2' in text
+    assert 'java_modernize_subprocess_duration_seconds_sum{tool="maven"} 2.5' in text
+    assert 'route="/a\\"b",status="200"' in text
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr("src.utils.metrics.settings.METRICS_ENABLED", False)
+    registry = MetricsRegistry()
+    registry.inc("cache_requests_total", cache="plan", result="hit")
+    assert registry.snapshot() == {}
+
+def test_pool_run_records_duration_wait_and_rss():
+    registry = MetricsRegistry()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(jvm_pool, "get_metrics", lambda: registry)
+        JvmWorkerPool(size=1).run("maven", ["true"])
+        JvmWorkerPool(size=1).run("maven", ["false"])
+
+    snapshot = registry.snapshot()
+    statuses = {s["labels"]["status"]: s["count"] for s in snapshot["subprocess_duration_seconds"]}
+    assert statuses == {"ok": 1, "failed": 1}
+    assert snapshot["subprocess_queue_wait_seconds"][0]["count"] == 2
+    assert snapshot["subprocess_peak_rss_bytes"][0]["value"] > 0
+
+def test_metrics_endpoint_reports_requests():
+    from src.api import main
+    client = TestClient(main.app)
+    assert client.get("/api/health").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/health",status="200"' in response.text
+
+def test_cli_profile_written(tmp_path):
+    from src.cli.commands import cli
+    profile = tmp_path / "profile.json"
+    result = CliRunner().invoke(cli, ["--profile", str(profile), "diff", str(tmp_path), "--base", "nope"])
+
+    data = json.loads(profile.read_text())
+    assert data["wall_seconds"] >= 0 and "metrics" in data, result.output
@@ -0,0 +1,111 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from git import GitCommandError
+from models.migration_plan import MigrationPhase
+from models.transformation import TransformationResult, ValidationResult
+from src.pipeline import parallel_phases as pp
+from src.pipeline.parallel_phases import ParallelPhaseRunner
+
+def _phase(n, dependencies=()):
+    return MigrationPhase(phase_number=n, name=f"Phase {n}", description="", risk_level="LOW",
+                          openrewrite_recipes=[f"recipe.{n}"], manual_steps=[], estimated_effort_hours=1,
+                          dependencies=list(dependencies))
+
+def _recipes_writing(target):
+    def fake(self, project_path, recipes, dry_run, config_location):
+        """Stand-in for OpenRewrite: each recipe appends a marker line to target(recipe)."""
+        for recipe in recipes:
+            with open(f"{project_path}/src/{target(recipe)}", "a") as f:
+                f.write(f"// {recipe}\n")
+        return TransformationResult(success=True, changed_files=[], diff="", errors=[], compilation_success=True)
+    return fake
+
+def _validation(passed):
+    return ValidationResult(compilation_passed=passed, unit_tests_passed=passed, failed_tests=[],
+                            code_coverage_delta=0.0, new_issues_found=[])
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "app"
+    (root / "src").mkdir(parents=True)
+    (root / "pom.xml").write_text("<project/>")
+    (root / "src" / "App.java").write_text("class App {}\n")
+    monkeypatch.setattr("src.pipeline.parallel_phases.settings.CHANGE_CAPTURE_DIR", str(tmp_path / "changes"))
+    return root
+
+def _runner(project, validator):
+    return ParallelPhaseRunner(str(project), max_parallel=2, validator=validator)
+
+def test_independent_phases_run_in_parallel_and_merge_in_order(project):
+    validator = MagicMock()
+    validator.validate_project.return_value = _validation(True)
+    phases = [_phase(1), _phase(2), _phase(3, [1, 2])]
+
+    with patch("src.pipeline.parallel_phases.OpenRewriteTransformer._execute_recipes",
+               _recipes_writing(lambda recipe: f"Phase{recipe[-1]}.java")):
+        outcomes = _runner(project, validator).run(phases)
+
+    assert [o.phase_number for o in outcomes] == [1, 2, 3]
+    assert all(o.speculative for o in outcomes)
+    for n in (1, 2, 3):
+        assert (project / "src" / f"Phase{n}.java").read_text() == f"// recipe.{n}\n"
+    assert outcomes[1].transformation.changed_files == ["src/Phase2.java"]
+    # Phases 1 and 2 are validated in their worktrees, then once more together in the project.
+    assert validator.validate_project.call_args_list[2][0] == (str(project), ["src/Phase1.java", "src/Phase2.java"])
+
+def test_conflicting_phase_is_rerun_in_place(project):
+    validator = MagicMock()
+    validator.validate_project.return_value = _validation(True)
+
+    with patch("src.pipeline.parallel_phases.OpenRewriteTransformer._execute_recipes",
+               _recipes_writing(lambda recipe: "App.java")):
+        outcomes = _runner(project, validator).run([_phase(1), _phase(2)])
+
+    assert [o.speculative for o in outcomes] == [True, False]
+    assert (project / "src" / "App.java").read_text() == "class App {}\n// recipe.1\n// recipe.2\n"
+
+def test_dependents_of_failed_phase_are_skipped(project):
+    validator = MagicMock()
+    validator.validate_project.side_effect = lambda path, changed: _validation("Phase1.java" not in changed[0])
+    phases = [_phase(1), _phase(2), _phase(3, [1])]
+
+    with patch("src.pipeline.parallel_phases.OpenRewriteTransformer._execute_recipes",
+               _recipes_writing(lambda recipe: f"Phase{recipe[-1]}.java")):
+        outcomes = _runner(project, validator).run(phases)
+
+    assert [(o.phase_number, pp._passed(o)) for o in outcomes] == [(1, False), (2, True), (3, False)]
+    assert "Skipped" in outcomes[2].transformation.errors[0]
+    assert not (project / "src" / "Phase1.java").exists()
+    assert (project / "src" / "Phase2.java").exists()
+
+def test_phases_with_unselected_dependencies_are_skipped(project):
+    validator = MagicMock()
+    validator.validate_project.return_value = _validation(True)
+
+    with patch("src.pipeline.parallel_phases.OpenRewriteTransformer._execute_recipes",
+               _recipes_writing(lambda recipe: f"Phase{recipe[-1]}.java")):
+        outcomes = _runner(project, validator).run([_phase(2, [1]), _phase(3, [2]), _phase(4)], applied=[])
+
+    assert [(o.phase_number, pp._passed(o)) for o in outcomes] == [(2, False), (3, False), (4, True)]
+    assert outcomes[0].transformation.errors == ["Skipped: depends on phases [1], which are neither selected nor applied"]
+    assert not (project / "src" / "Phase2.java").exists()
+
+def test_failed_rollback_marks_the_wave_failed_and_raises(project):
+    validator = MagicMock()
+    validator.validate_project.side_effect = lambda path, changed: _validation(changed is None or len(changed) < 2)
+    apply = pp.ChangeCapture.apply
+    calls = []
+
+    def apply_then_fail(self, base, head):
+        calls.append((base, head))
+        if len(calls) > 2:
+            raise GitCommandError("apply", 1)
+        return apply(self, base, head)
+
+    recorded = []
+    with patch("src.pipeline.parallel_phases.OpenRewriteTransformer._execute_recipes",
+               _recipes_writing(lambda recipe: f"Phase{recipe[-1]}.java")), \
+            patch.object(pp.ChangeCapture, "apply", apply_then_fail), pytest.raises(GitCommandError):
+        _runner(project, validator).run([_phase(1), _phase(2)], on_outcome=recorded.append)
+
+    assert [(o.phase_number, pp._passed(o)) for o in recorded] == [(1, False), (2, False)]
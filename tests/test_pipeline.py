@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch
+from models.analysis import AnalysisReport
+from models.migration_plan import MigrationPhase, MigrationPlan
+from models.transformation import TransformationResult, ValidationResult
+from src.pipeline.migration_pipeline import MigrationPipeline
+
+def _plan():
+    phases = [MigrationPhase(phase_number=n, name=f"Phase {n}", description="", risk_level="LOW",
+                             openrewrite_recipes=[f"recipe.{n}"], manual_steps=[], estimated_effort_hours=1,
+                             dependencies=[n - 1] if n > 1 else [])
+              for n in (1, 2, 3)]
+    return MigrationPlan(project_name="app", from_version="8", to_version="17", total_phases=3,
+                         total_estimated_hours=3, phases=phases, testing_strategy="", rollback_plan="",
+                         risk_summary="")
+
+def _fake_recipes(self, project_path, recipes, dry_run, config_location):
+    """Stand-in for OpenRewrite: each recipe appends a marker line to App.java."""
+    app = f"{project_path}/src/App.java"
+    with open(app, "a") as f:
+        f.write(f"// {','.join(recipes)}\n")
+    return TransformationResult(success=True, changed_files=[], diff="", errors=[], compilation_success=True)
+
+def _validation(passed):
+    return ValidationResult(compilation_passed=passed, unit_tests_passed=passed, failed_tests=[],
+                            code_coverage_delta=0.0, new_issues_found=[])
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    root = tmp_path / "app"
+    (root / "src").mkdir(parents=True)
+    (root / "pom.xml").write_text("<project/>")
+    (root / "src" / "App.java").write_text("class App {}\n")
+    monkeypatch.setattr("src.pipeline.migration_pipeline.settings.CHANGE_CAPTURE_DIR", str(tmp_path / "changes"))
+    monkeypatch.setattr("src.pipeline.migration_pipeline.settings.PIPELINE_CHECKPOINT_DIR", str(tmp_path / "cp"))
+    return root
+
+@pytest.fixture
+def stages():
+    report = AnalysisReport(project_name="app", from_version=8, to_version=17, timestamp="t", total_issues=0,
+                            auto_fixable_count=0, issues_by_category={}, issues_by_priority={})
+    with patch("src.pipeline.migration_pipeline.EMT4JAnalyzer") as analyzer, \
+         patch("src.pipeline.migration_pipeline.select_planner") as planner, \
+         patch("src.pipeline.migration_pipeline.OpenRewriteTransformer._execute_recipes", _fake_recipes), \
+         patch("src.pipeline.migration_pipeline.CompilationValidator.validate_project") as validate, \
+         patch("src.pipeline.migration_pipeline.MigrationPipeline._warm_build"):
+        analyzer.return_value.analyze_project.return_value = report
+        planner.return_value.create_migration_plan.return_value = _plan()
+        yield analyzer, validate
+
+def test_pipeline_speculates_next_phase_and_applies_it(project, stages):
+    analyzer, validate = stages
+    validate.return_value = _validation(True)
+
+    state = MigrationPipeline(str(project), 8, 17).run()
+
+    assert state.status == "completed" and state.completed_phases == [1, 2, 3]
+    assert [p.speculative for p in state.phases] == [False, True, True]
+    assert (project / "src" / "App.java").read_text() == "class App {}\n// recipe.1\n// recipe.2\n// recipe.3\n"
+    assert state.phases[1].transformation.changed_files == ["src/App.java"]
+    assert validate.call_args[0][1] == ["src/App.java"]
+
+def test_failed_validation_resumes_from_checkpoint(project, stages):
+    analyzer, validate = stages
+    validate.side_effect = [_validation(True), _validation(False)]
+
+    state = MigrationPipeline(str(project), 8, 17, speculate=False).run()
+    assert state.status == "failed" and state.completed_phases == [1]
+
+    validate.side_effect = None
+    validate.return_value = _validation(True)
+    state = MigrationPipeline(str(project), 8, 17, speculate=False).run()
+
+    assert state.status == "completed" and state.completed_phases == [1, 2, 3]
+    assert analyzer.return_value.analyze_project.call_count == 1
+
+def test_parallel_mode_delegates_to_phase_runner(project, stages):
+    analyzer, validate = stages
+    validate.return_value = _validation(True)
+
+    state = MigrationPipeline(str(project), 8, 17, parallel=True).run()
+
+    # The plan is a dependency chain, so each wave holds one phase and no extra validation runs.
+    assert state.status == "completed" and state.completed_phases == [1, 2, 3]
+    assert all(p.speculative for p in state.phases)
+    assert validate.call_count == 3
+    assert (project / "src" / "App.java").read_text() == "class App {}\n// recipe.1\n// recipe.2\n// recipe.3\n"
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_selected_phase_with_unmet_dependency_is_not_run(project, stages, parallel):
+    analyzer, validate = stages
+    validate.return_value = _validation(True)
+
+    state = MigrationPipeline(str(project), 8, 17, phases=[1, 3], parallel=parallel).run()
+
+    assert state.status == "failed" and state.completed_phases == [1]
+    assert "neither selected nor applied" in state.phases[0].transformation.errors[0]
+    assert (project / "src" / "App.java").read_text() == "class App {}\n// recipe.1\n"
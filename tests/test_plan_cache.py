@@ -0,0 +1,86 @@
+import threading
+import pytest
+from unittest.mock import patch
+from src.planner.ai_planner import AIMigrationPlanner
+from src.planner.plan_cache import PlanCache, plan_digest
+from tests.stub_anthropic import StubAnthropicServer
+
+@pytest.fixture
+def stub_server():
+    with StubAnthropicServer(latency=0.2) as server, \
+         patch("src.planner.ai_planner.settings.ANTHROPIC_BASE_URL", server.base_url), \
+         patch("src.planner.ai_planner.settings.ANTHROPIC_API_KEE", "stub-key"):
+        yield server
+
+def test_digest_ignores_project_name(sample_analysis_report):
+    renamed = sample_analysis_report.model_copy(update={"project_name": "Other"})
+    retargeted = sample_analysis_report.model_copy(update={"to_version": 17})
+    assert plan_digest(renamed, "m") == plan_digest(sample_analysis_report, "m")
+    assert plan_digest(retargeted, "m") != plan_digest(sample_analysis_report, "m")
+    assert plan_digest(sample_analysis_report, "other-model") != plan_digest(sample_analysis_report, "m")
+
+def test_identical_profiles_share_one_llm_call(stub_server, sample_analysis_report):
+    cache = PlanCache(max_entries=8, ttl_seconds=60)
+    results = []
+
+    def plan():
+        results.append(AIMigrationPlanner(cache=cache).create_migration_plan(sample_analysis_report))
+
+    threads = [threading.Thread(target=plan) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    renamed = sample_analysis_report.model_copy(update={"project_name": "Another Service"})
+    again = AIMigrationPlanner(cache=cache).create_migration_plan(renamed)
+
+    assert stub_server.request_count == 1
+    assert all(p.phases[0].name == "Upgrade to Java 11" for p in results)
+    assert again.project_name == "Another Service"
+    assert cache.stats()["misses"] == 1
+
+def test_fallback_plans_are_not_cached(sample_analysis_report):
+    cache = PlanCache(max_entries=8, ttl_seconds=60)
+    with StubAnthropicServer(fail_with=400) as server, \
+         patch("src.planner.ai_planner.settings.ANTHROPIC_BASE_URL", server.base_url), \
+         patch("src.planner.ai_planner.settings.ANTHROPIC_API_KEE", "stub-key"):
+        for _ in range(2):
+            plan = AIMigrationPlanner(cache=cache).create_migration_plan(sample_analysis_report)
+            assert plan.phases[0].name == "Automated Update"
+        assert server.request_count == 2
+
+def test_ttl_and_size_eviction(sample_analysis_report):
+    cache = PlanCache(max_entries=1, ttl_seconds=60)
+    plan = AIMigrationPlanner(use_cache=False)._create_fallback_plan(sample_analysis_report)
+    cache.put("a", plan)
+    cache.put("b", plan)
+    assert cache.get("a") is None and cache.get("b") is not None
+
+    expired = PlanCache(max_entries=4, ttl_seconds=0)
+    expired.put("a", plan)
+    assert expired.get("a") is None
+
+def test_llm_tokens_and_cache_hits_are_metered(stub_server, sample_analysis_report):
+    from src.utils.metrics import MetricsRegistry
+    registry = MetricsRegistry()
+    cache = PlanCache(max_entries=8, ttl_seconds=60)
+    with patch("src.planner.ai_planner.get_metrics", return_value=registry), \
+         patch("src.planner.plan_cache.get_metrics", return_value=registry):
+        for _ in range(2):
+            AIMigrationPlanner(cache=cache).create_migration_plan(sample_analysis_report)
+
+    snapshot = registry.snapshot()
+    tokens = {s["labels"]["direction"]: s["value"] for s in snapshot["llm_tokens_total"]}
+    assert tokens["input"] > 0 and tokens["output"] > 0
+    assert snapshot["llm_request_duration_seconds"][0]["labels"] == {"planner": "single", "status": "ok"}
+    assert sorted(s["labels"]["result"] for s in snapshot["cache_requests_total"]) == ["hit", "miss"]
+
+def test_use_cache_false_opts_out_of_the_shared_cache(monkeypatch):
+    from src.planner.sharded_planner import ShardedMigrationPlanner
+    monkeypatch.setattr("src.planner.ai_planner.settings.PLAN_CACHE_ENABLED", True)
+    assert AIMigrationPlanner().cache is not None
+    assert AIMigrationPlanner(use_cache=False).cache is None
+    assert ShardedMigrationPlanner(use_cache=False).cache is None
+    monkeypatch.setattr("src.planner.ai_planner.settings.PLAN_CACHE_ENABLED", False)
+    cache = PlanCache(max_entries=1, ttl_seconds=60)
+    assert AIMigrationPlanner(cache=cache).cache is cache
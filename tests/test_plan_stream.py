@@ -0,0 +1,95 @@
+import json
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.planner.ai_planner import AIMigrationPlanner, extract_plan_json
+from src.planner.plan_stream import PlanStreamError, PlanStreamParser
+from tests.stub_anthropic import DEFAULT_PLAN, StubAnthropicServer
+
+PLAN_TEXT = json.dumps(DEFAULT_PLAN)
+
+class DivergingStub(StubAnthropicServer):
+    """Answers the first request with a phase that breaks the schema."""
+
+    def response_text(self, body):
+        if self.request_count > 1:
+            return super().response_text(body)
+        broken = json.loads(PLAN_TEXT)
+        broken["phases"][1]["estimated_effort_hours"] = "a while"
+        return json.dumps(broken)
+
+@pytest.fixture
+def planner_settings(monkeypatch):
+    monkeypatch.setattr("src.planner.ai_planner.settings.RULE_PLANNER_ENABLED", False)
+    monkeypatch.setattr("src.planner.ai_planner.settings.PLAN_CACHE_ENABLED", False)
+    monkeypatch.setattr("src.planner.ai_planner.settings.ANTHROPIC_API_KEE", "stub-key")
+
+def _stream(server, report):
+    with patch("src.planner.ai_planner.settings.ANTHROPIC_BASE_URL", server.base_url):
+        return list(AIMigrationPlanner(use_cache=False).stream_migration_plan(report))
+
+def test_parser_yields_each_phase_when_it_closes():
+    parser = PlanStreamParser()
+    text = "Here is the plan:\n" + PLAN_TEXT + "\nLet me know if {anything} is unclear }"
+    completed_at = []
+    for i in range(0, len(text), 5):
+        completed_at += [(i, p.name) for p in parser.feed(text[i:i + 5])]
+
+    first_phase_end = text.index('"phase_number": 2')
+    assert [name for _, name in completed_at] == ["Upgrade to Java 11", "Upgrade to Java 17"]
+    assert completed_at[0][0] < first_phase_end
+    assert parser.finish()["risk_summary"] == "Moderate"
+
+@pytest.mark.parametrize("text, error", [
+    ('{"phases": [{"phase_number": 1}', "Phase 1 does not match"),
+    ('{"summary": "x", "phases": []}', "Unexpected key 'summary'"),
+    ('{"phases": {"phase_number": 1}}', "Unexpected value for 'phases'"),
+    ('{"phases": ["Upgrade"]}', "Phase entries must be objects"),
+    ("I cannot help with that. " * 100, "No plan object"),
+])
+def test_parser_rejects_divergence_early(text, error):
+    parser = PlanStreamParser(max_preamble=500)
+    with pytest.raises(PlanStreamError, match=error):
+        parser.feed(text)
+
+def test_parser_requires_a_complete_object():
+    parser = PlanStreamParser()
+    parser.feed(PLAN_TEXT[:-1])
+    with pytest.raises(PlanStreamError, match="ended before"):
+        parser.finish()
+
+def test_extract_plan_json_ignores_stray_braces():
+    response = "Note {braces} first.\n" + PLAN_TEXT + "\n} trailing"
+    assert extract_plan_json(response)["risk_summary"] == "Moderate"
+
+def test_stream_migration_plan_yields_phases_then_plan(planner_settings, sample_analysis_report):
+    with StubAnthropicServer() as server:
+        events = _stream(server, sample_analysis_report)
+    assert [e.type for e in events] == ["phase", "phase", "plan"]
+    assert events[-1].plan.phases == [events[0].phase, events[1].phase]
+    assert server.requests[0]["stream"] is True
+
+def test_diverging_stream_is_retried(planner_settings, sample_analysis_report):
+    with DivergingStub() as server:
+        events = _stream(server, sample_analysis_report)
+    assert [e.type for e in events] == ["phase", "reset", "phase", "phase", "plan"]
+    assert events[-1].plan.total_estimated_hours == 12
+    assert server.request_count == 2
+
+def test_fallback_after_repeated_divergence(planner_settings, monkeypatch, sample_analysis_report):
+    monkeypatch.setattr("src.planner.ai_planner.settings.PLAN_STREAM_MAX_ATTEMPTS", 1)
+    with DivergingStub() as server:
+        events = _stream(server, sample_analysis_report)
+    assert [e.type for e in events] == ["phase", "reset", "phase", "plan"]
+    assert events[-1].plan.phases[0].name == "Automated Update"
+
+def test_plan_stream_endpoint(planner_settings, sample_analysis_report):
+    from src.api import main
+    with StubAnthropicServer() as server, \
+         patch("src.planner.ai_planner.settings.ANTHROPIC_BASE_URL", server.base_url):
+        response = TestClient(main.app).post(
+            "/api/plan/stream", json={"analysis_report": sample_analysis_report.model_dump(mode="json")}
+        )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    names = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event:")]
+    assert names == ["phase", "phase", "plan"]
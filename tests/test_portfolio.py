@@ -0,0 +1,102 @@
+import json
+import pytest
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+from src.analyzer.portfolio import PortfolioIndex
+from src.models.analysis import AnalysisReport, EMT4JIssue
+from tests.stub_anthropic import DEFAULT_PLAN
+
+def _report(name, specs):
+    issues = [EMT4JIssue(file_path=path, line_number=line, issue_code=code, priority=priority,
+                         description=f"{code} is unsupported", suggestion="fix", category="internal_api")
+              for path, line, code, priority in specs]
+    return AnalysisReport(project_name=name, from_version=8, to_version=17, timestamp="t", total_issues=len(issues),
+                          auto_fixable_count=0, issues_by_category={"internal_api": issues},
+                          issues_by_priority={"P1": [i for i in issues if i.priority == "P1"]})
+
+@pytest.fixture
+def reports(tmp_path):
+    root = tmp_path / "fleet-reports"
+    root.mkdir()
+    (root / "billing.json").write_text(_report("billing", [
+        ("core/src/main/java/Codec.java", 3, "sun.misc.BASE64Encoder", "P1"),
+        ("core/src/main/java/Xml.java", 9, "javax.xml.bind", "P1"),
+        ("web/src/main/java/Page.java", 12, "sun.misc.BASE64Encoder", "P1"),
+    ]).model_dump_json())
+    (root / "orders.json").write_text(_report("orders", [
+        ("src/main/java/Order.java", 5, "javax.xml.bind", "P2"),
+    ]).model_dump_json())
+    plan = dict(DEFAULT_PLAN, project_name="billing", from_version="8", to_version="17", total_phases=2,
+                total_estimated_hours=12)
+    (root / "plans").mkdir()
+    (root / "plans" / "billing-plan.json").write_text(json.dumps(plan))
+    (root / "fleet-summary.json").write_text("[]")
+    return root
+
+@pytest.fixture
+def index(tmp_path):
+    return PortfolioIndex(str(tmp_path / "portfolio.sqlite3"))
+
+def test_ingest_is_incremental(index, reports):
+    first = index.ingest([reports])
+    assert (first.reports, first.plans, first.unchanged) == (2, 1, 0)
+    assert first.skipped == [str(reports / "fleet-summary.json")]
+
+    (reports / "orders.json").write_text(_report("orders", []).model_dump_json())
+    (reports / "billing.json").unlink()
+    second = index.ingest([reports])
+    assert (second.reports, second.unchanged, second.removed) == (1, 1, 1)
+    assert index.stats() == {"reports": 1, "plans": 1, "issues": 0, "phases": 2}
+    assert index.issues(text="BASE64Encoder").total == 0
+
+def test_query_issues_and_projects(index, reports):
+    index.ingest([reports])
+
+    users = index.projects(issue_code="sun.misc.BASE64Encoder")
+    assert [(p.project_name, p.issue_count, p.file_count) for p in users.projects] == [("billing", 2, 2)]
+    assert index.projects(issue_code="javax.xml.bind").total == 2
+
+    page = index.issues(file_path="core/", offset=1, limit=1)
+    assert page.total == 2 and [i.file_path for i in page.issues] == ["core/src/main/java/Xml.java"]
+    assert index.issues(priority="P2").issues[0].project_name == "orders"
+    assert index.issues(text="sun.misc unsupported").total == 2
+
+def test_query_phases_by_recipe(index, reports):
+    index.ingest([reports])
+    page = index.phases(recipe="org.openrewrite.java.migrate.UpgradeToJava17")
+    assert [(p.project_name, p.phase_number) for p in page.phases] == [("billing", 2)]
+    assert index.phases(risk_level="MEDIUM").phases[0].name == "Upgrade to Java 11"
+
+def test_portfolio_cli(tmp_path, reports):
+    from src.cli.commands import cli
+    db = str(tmp_path / "cli.sqlite3")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["portfolio", "--db", db, "ingest", str(reports)])
+    assert "2 reports, 1 plans indexed" in result.output, result.output
+
+    result = runner.invoke(cli, ["portfolio", "--db", db, "projects", "--code", "sun.misc.BASE64Encoder"])
+    assert "billing\t2 issues in 2 files" in result.output and "-- 1-1 of 1" in result.output
+
+def test_portfolio_api(tmp_path, reports, monkeypatch):
+    from src.api import main
+    monkeypatch.setattr(main, "get_portfolio_index", lambda: PortfolioIndex(str(tmp_path / "api.sqlite3")))
+    client = TestClient(main.app)
+
+    assert client.post("/api/portfolio/ingest", json={"paths": [str(reports)]}).json()["reports"] == 2
+    assert client.post("/api/portfolio/ingest", json={"paths": [str(tmp_path / "nope")]}).status_code == 404
+
+    page = client.get("/api/portfolio/issues", params={"issue_code": "javax.xml.bind", "limit": 1}).json()
+    assert page["total"] == 2 and len(page["issues"]) == 1
+    assert client.get("/api/portfolio/issues", params={"limit": 0}).status_code == 400
+    phases = client.get("/api/portfolio/phases", params={"project_name": "billing"}).json()
+    assert phases["total"] == 2
+
+def test_file_prefix_filter_uses_the_file_index(index, reports):
+    index.ingest([reports])
+    where, params = PortfolioIndex._issue_filters(None, "core/", None, None, None, None)
+    plan = index._conn().execute(f"EXPLAIN QUERY PLAN SELECT * FROM issues {where}", params).fetchall()
+
+    assert any(row[-1].startswith("SEARCH issues USING INDEX issues_file") for row in plan)
+    assert index.issues(file_path="core/src/main/java/X").total == 1
+    assert index.issues(file_path="core/src/main/java/Xml.java").total == 1
+    assert index.issues(file_path="core/src/main/java/Xml.javb").total == 0
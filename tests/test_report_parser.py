@@ -0,0 +1,50 @@
+import io
+import json
+from src.analyzer.report_parser import _JsonStream, parse_emt4j_report
+
+RECORDS = [
+    {"file": "/proj/src/A.java", "line": 3, "ruleCode": "REMOVED_API", "level": "p1",
+     "desc": "sun.misc.BASE64Encoder {removed}", "howToFix": "Use java.util.Base64"},
+    {"filePath": "src/B.java", "lineNumber": 12, "code": "JAXB", "priority": 2,
+     "category": "removed_module", "message": "javax.xml.bind", "solution": "Add jakarta.xml.bind"},
+    {"file": "/proj/src/A.java", "line": 99, "ruleCode": "REMOVED_API", "level": "P1",
+     "desc": "sun.misc.Unsafe", "howToFix": "Use VarHandle", "autoFixable": True},
+]
+
+def test_stream_decodes_array_across_tiny_chunks():
+    text = json.dumps({"version": "0.8.0", "issues": RECORDS, "count": 123456})
+    stream = _JsonStream(io.StringIO(text), chunk_size=7)
+    stream.expect("{")
+    assert stream.value() == "version"
+    stream.expect(":")
+    assert stream.value() == "0.8.0"
+    stream.expect(",")
+    assert stream.value() == "issues"
+    stream.expect(":")
+    assert list(stream.array_items()) == RECORDS
+    stream.expect(",")
+    assert stream.value() == "count"
+    stream.expect(":")
+    assert stream.value() == 123456
+
+def test_parse_report_builds_shared_indexes(tmp_path):
+    report_file = tmp_path / "report.json"
+    report_file.write_text(json.dumps({"version": "0.8.0", "results": RECORDS}))
+
+    index, header = parse_emt4j_report(report_file, project_path="/proj")
+    report = index.to_report("proj", 8, 17, "now", raw_report=header)
+
+    assert header == {"version": "0.8.0"}
+    assert report.total_issues == 3
+    assert report.auto_fixable_count == 1
+    assert sorted(report.issues_by_category) == ["REMOVED_API", "removed_module"]
+    assert sorted(report.issues_by_priority) == ["P1", "P2"]
+    assert [i.line_number for i in index.for_file("src/A.java")] == [3, 99]
+    # Each issue is stored once and shared by both groupings
+    assert report.issues_by_category["REMOVED_API"][0] is report.issues_by_priority["P1"][0]
+
+def test_parse_top_level_array(tmp_path):
+    report_file = tmp_path / "report.json"
+    report_file.write_text(json.dumps(RECORDS))
+    index, _ = parse_emt4j_report(report_file)
+    assert len(index) == 3
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+from loguru import logger
+from src.models.analysis import AnalysisReport, EMT4JIssue
+from src.planner.ai_planner import AIMigrationPlanner
+from src.planner.rule_engine import RuleBasedPlanner, lookup_rule, plan_with_rules
+
+def _report(codes, from_version=8, to_version=17):
+    issues = [EMT4JIssue(file_path=f"src/main/java/C{n}.java", issue_code=code, priority="P2",
+                         description=code, suggestion="fix", category=category)
+              for n, (code, category) in enumerate(codes)]
+    by_category = {}
+    for issue in issues:
+        by_category.setdefault(issue.category, []).append(issue)
+    return AnalysisReport(project_name="svc", from_version=from_version, to_version=to_version, timestamp="t",
+                          total_issues=len(issues), auto_fixable_count=0,
+                          issues_by_category=by_category, issues_by_priority={"P2": issues})
+
+def test_lookup_walks_dotted_prefixes():
+    issue = EMT4JIssue(file_path="A.java", issue_code="javax.xml.bind.JAXBContext", priority="P1",
+                       description="", suggestion="", category="removed_module")
+    assert lookup_rule(issue).recipes == ("org.openrewrite.java.migrate.javax.AddJaxbDependencies",)
+    assert lookup_rule(issue.model_copy(update={"issue_code": "unknown.code"})).confidence == 0.5
+
+def test_known_codes_build_chained_plan():
+    report = _report([("sun.misc.BASE64Encoder", "internal_api"),
+                      ("javax.xml.bind.JAXBContext", "removed_module"),
+                      ("java.lang.SecurityManager", "deprecated_api")])
+    plan, confidence = RuleBasedPlanner().plan(report)
+
+    assert confidence > 0.9
+    assert [p.name for p in plan.phases] == ["Upgrade to Java 11", "Upgrade to Java 17", "Cleanup"]
+    assert "org.openrewrite.java.migrate.UseJavaUtilBase64" in plan.phases[0].openrewrite_recipes
+    assert plan.phases[1].dependencies == [1] and plan.phases[2].dependencies == [2]
+    assert plan.total_estimated_hours == sum(p.estimated_effort_hours for p in plan.phases)
+
+def test_unknown_version_pair_has_no_plan():
+    assert RuleBasedPlanner().plan(_report([], from_version=11, to_version=15)) == (None, 0.0)
+
+def test_confident_rules_skip_claude():
+    report = _report([("sun.misc.BASE64Encoder", "internal_api")], to_version=21)
+    with patch("src.planner.ai_planner.AIMigrationPlanner._generate_plan") as generate:
+        plan = AIMigrationPlanner(use_cache=False).create_migration_plan(report)
+    generate.assert_not_called()
+    assert plan.phases[-2].openrewrite_recipes == ["org.openrewrite.java.migrate.UpgradeToJava21"]
+
+def test_report_without_issues_defers_to_claude():
+    plan, confidence = RuleBasedPlanner().plan(_report([]))
+    assert plan is not None and confidence == 0.0
+    assert plan_with_rules(_report([])) is None
+
+def test_uncovered_version_pair_is_logged_as_such():
+    messages = []
+    handler = logger.add(messages.append, format="{message}")
+    try:
+        assert plan_with_rules(_report([], from_version=11, to_version=15)) is None
+    finally:
+        logger.remove(handler)
+    assert [m.strip() for m in messages] == [
+        "Java 11 to 15 is not covered by the rule-based planner, deferring to Claude"]
+
+def test_rules_for_later_jdks_are_left_out_of_the_plan():
+    report = _report([("java.lang.Thread.stop", "deprecated_api")], to_version=17)
+    plan, confidence = RuleBasedPlanner().plan(report)
+    assert confidence == 0.8
+    assert all("Thread.stop" not in " ".join(p.manual_steps) for p in plan.phases)
@@ -0,0 +1,82 @@
+import gzip
+import json
+import pytest
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+from src.models import serialization
+from src.models.analysis import AnalysisReport, EMT4JIssue
+from src.models.serialization import load_plan, load_report, save_plan, save_report
+from src.models.migration_plan import MigrationPlan
+from tests.stub_anthropic import DEFAULT_PLAN
+
+def _report():
+    issues = [EMT4JIssue(file_path=f"src/main/java/C{n}.java", line_number=n, issue_code="sun.misc.Unsafe",
+                         priority="P1" if n % 2 else "P2", description="internal", suggestion="fix",
+                         category="internal_api") for n in range(4)]
+    orphan = EMT4JIssue(file_path="pom.xml", issue_code="jdk.removed", priority="P3", description="d",
+                        suggestion="s", category="build")
+    return AnalysisReport(project_name="svc", from_version=8, to_version=21, timestamp="t", total_issues=5,
+                          auto_fixable_count=0, issues_by_category={"internal_api": issues, "empty": []},
+                          issues_by_priority={"P1": issues[1::2], "P2": issues[0::2], "P3": [orphan]})
+
+@pytest.mark.parametrize("name", ["report.json", "report.json.gz", "report.jsonl", "report.jsonl.gz"])
+def test_report_round_trip(tmp_path, name):
+    report = _report()
+    save_report(report, tmp_path / name)
+    loaded = load_report(tmp_path / name)
+    assert loaded.model_dump() == report.model_dump()
+
+def test_jsonl_writes_shared_issues_once_and_shares_them_on_load(tmp_path):
+    path = tmp_path / "report.jsonl"
+    save_report(_report(), path)
+    lines = path.read_bytes().splitlines()
+    assert json.loads(lines[0])["categories"] == ["internal_api", "empty"]
+    assert len(lines) == 1 + 5
+
+    loaded = load_report(path)
+    assert loaded.issues_by_priority["P1"][0] is loaded.issues_by_category["internal_api"][1]
+
+def test_jsonl_pairs_equal_issues_from_plain_json(tmp_path):
+    save_report(_report(), tmp_path / "report.json")
+    copied = load_report(tmp_path / "report.json")  # groupings hold separate, equal objects
+    assert len(list(serialization.iter_report_lines(copied))) == 1 + 5
+
+def test_plan_round_trip_compressed(tmp_path):
+    plan = MigrationPlan(**dict(DEFAULT_PLAN, project_name="svc", from_version="8", to_version="21",
+                                total_phases=2, total_estimated_hours=12))
+    save_plan(plan, tmp_path / "plan.json.gz")
+    assert json.loads(gzip.decompress((tmp_path / "plan.json.gz").read_bytes()))["total_phases"] == 2
+    assert load_plan(tmp_path / "plan.json.gz") == plan
+    with pytest.raises(ValueError, match="only supported for analysis reports"):
+        save_plan(plan, tmp_path / "plan.jsonl")
+
+def test_zstd_requires_optional_package(tmp_path, monkeypatch):
+    monkeypatch.setattr(serialization, "zstandard", None)
+    with pytest.raises(RuntimeError, match="zstandard"):
+        save_report(_report(), tmp_path / "report.jsonl.zst")
+
+def test_rejects_unknown_jsonl_format(tmp_path):
+    (tmp_path / "index.jsonl").write_text('{"format": "other", "report": {}}\n')
+    with pytest.raises(ValueError):
+        load_report(tmp_path / "index.jsonl")
+
+def test_cli_plan_reads_compressed_report(tmp_path, monkeypatch):
+    from src.cli.commands import cli
+    monkeypatch.setattr("src.planner.ai_planner.settings.ANTHROPIC_API_KEE", "")
+    save_report(_report(), tmp_path / "report.jsonl.gz")
+    result = CliRunner().invoke(cli, ["plan", str(tmp_path), "--analysis", str(tmp_path / "report.jsonl.gz"),
+                                      "--output", str(tmp_path / "plan.json.gz")])
+    assert result.exit_code == 0, result.output
+    assert load_plan(tmp_path / "plan.json.gz").project_name == "svc"
+
+def test_analyze_endpoint_streams_ndjson(sample_project_path):
+    from src.api import main
+    client = TestClient(main.app)
+    body = {"project_path": str(sample_project_path), "from_version": 8, "to_version": 17, "triage": False}
+    response = client.post("/api/analyze", json=body, headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    header = json.loads(response.text.splitlines()[0])
+    assert header["format"] == serialization.REPORT_FORMAT
+
+    report = client.post("/api/analyze", json=body).json()
+    assert len(response.text.splitlines()) >= 1 + max(map(len, report["issues_by_category"].values()), default=0)
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.models.analysis import AnalysisReport, EMT4JIssue
+from models.migration_plan import MigrationPhase
+from src.planner.plan_cache import PlanCache
+from src.planner.sharded_planner import ShardedMigrationPlanner, module_of
+from tests.stub_anthropic import StubAnthropicServer
+
+def _report(issue_specs):
+    issues = [EMT4JIssue(file_path=path, issue_code=code, priority="P1", description=code,
+                         suggestion="fix", category=category)
+              for path, code, category in issue_specs]
+    by_category = {}
+    for issue in issues:
+        by_category.setdefault(issue.category, []).append(issue)
+    return AnalysisReport(project_name="monolith", from_version=8, to_version=17, timestamp="t",
+                          total_issues=len(issues), auto_fixable_count=0,
+                          issues_by_category=by_category, issues_by_priority={"P1": issues})
+
+@pytest.fixture
+def large_report():
+    specs = []
+    for module in ["billing", "orders", "web"]:
+        for n in range(5):
+            specs.append((f"{module}/src/main/java/C{n}.java", f"code.{module}.{n % 3}", "removed_api"))
+    return _report(specs)
+
+def test_module_of():
+    assert module_of("orders/src/main/java/A.java") == "orders"
+    assert module_of("src/main/java/A.java") == "."
+    assert module_of("mysrc/main/java/A.java") == "."
+    assert module_of("libs/core/src/main/resources/src/a.txt") == "libs/core"
+
+def test_shard_by_module_and_split_by_code_budget(large_report):
+    planner = ShardedMigrationPlanner(shard_max_codes=2, use_cache=False)
+    shards = planner.shard_report(large_report)
+    assert [s.name for s in shards] == ["billing#1", "billing#2", "orders#1", "orders#2", "web#1", "web#2"]
+    assert sum(len(s.issues) for s in shards) == 15
+    summary = shards[0].summarize()
+    assert summary[0]["count"] == 2 and len(summary[0]["example_files"]) == 2
+
+def test_plans_shards_concurrently_and_merges(large_report):
+    with StubAnthropicServer() as server, \
+         patch("src.planner.sharded_planner.settings.ANTHROPIC_BASE_URL", server.base_url), \
+         patch("src.planner.sharded_planner.settings.ANTHROPIC_API_KEE", "stub-key"):
+        plan = ShardedMigrationPlanner(max_concurrency=2, use_cache=False).create_migration_plan(large_report)
+
+    assert server.request_count == 3
+    assert [p.name for p in plan.phases] == ["Upgrade to Java 11", "Upgrade to Java 17"]
+    assert plan.phases[0].estimated_effort_hours == 24
+    assert plan.phases[1].dependencies == [1]
+    assert plan.total_estimated_hours == 36
+
+def test_async_planning_uses_the_plan_cache(large_report):
+    cache = PlanCache(max_entries=4, ttl_seconds=60)
+    renamed = large_report.model_copy(update={"project_name": "other"})
+    with StubAnthropicServer() as server, \
+         patch("src.planner.sharded_planner.settings.ANTHROPIC_BASE_URL", server.base_url), \
+         patch("src.planner.sharded_planner.settings.ANTHROPIC_API_KEE", "stub-key"):
+        planner = ShardedMigrationPlanner(max_concurrency=2, cache=cache)
+        first = asyncio.run(planner.acreate_migration_plan(large_report))
+        second = asyncio.run(planner.acreate_migration_plan(renamed))
+        planner.create_migration_plan(large_report)
+
+    assert server.request_count == 3
+    assert second.project_name == "other" and second.phases == first.phases
+    assert cache.stats()["hits"] == 2
+
+def _shard_plan(phases, risk):
+    return {"phases": [MigrationPhase(phase_number=n, name=name, description="", risk_level="LOW",
+                                      openrewrite_recipes=recipes, manual_steps=[], estimated_effort_hours=2)
+                       for n, (name, recipes) in enumerate(phases, start=1)],
+            "risk_summary": risk}
+
+def test_merge_groups_phases_by_primary_recipe_and_caps_summaries(large_report):
+    upgrade = "org.openrewrite.java.migrate.UpgradeToJava17"
+    shard_plans = [_shard_plan([("Upgrade", [upgrade, "org.openrewrite.java.migrate.Jakarta"])], f"Risk {n}.")
+                   for n in range(5)]
+    shard_plans.append(_shard_plan([("Upgrade", [upgrade, "org.openrewrite.java.format.AutoFormat"])], "Risk 0."))
+
+    plan = ShardedMigrationPlanner(use_cache=False).merge(large_report, shard_plans)
+
+    assert len(plan.phases) == 1
+    assert plan.phases[0].openrewrite_recipes == [upgrade, "org.openrewrite.java.migrate.Jakarta",
+                                                  "org.openrewrite.java.format.AutoFormat"]
+    assert plan.phases[0].estimated_effort_hours == 12
+    assert plan.risk_summary == "Risk 0. Risk 1. Risk 2. (and 2 more from other shards)"
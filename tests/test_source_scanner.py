@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import MagicMock
+from models.analysis import AnalysisReport, EMT4JIssue
+from src.analyzer import source_scanner as ss
+from src.analyzer.source_scanner import SourceScanner, analyze_with_triage, iter_java_files, scan_file
+
+LEGACY = """package com.example;
+
+import sun.misc.BASE64Encoder;
+import javax.xml.bind.DatatypeConverter;
+
+class Legacy {
+    String a = new BASE64Encoder().encode(new byte[0]);
+    Integer b = new Integer(1);
+    Object c = new sun.misc.BASE64Encoder();
+}
+"""
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "shop"
+    root.mkdir()
+    (root / "pom.xml").write_text("<project/>")
+    for module, source in (("legacy", LEGACY), ("modern", "class Modern { var x = Integer.valueOf(1); }\n")):
+        src = root / module / "src/main/java/com/example"
+        src.mkdir(parents=True)
+        (root / module / "pom.xml").write_text("<project/>")
+        (src / f"{module.title()}.java").write_text(source)
+    target = root / "legacy" / "target" / "generated"
+    target.mkdir(parents=True)
+    (target / "Generated.java").write_text("import sun.misc.Unsafe;\n")
+    (root / "modern" / "src" / "Empty.java").write_text("")
+    return root
+
+def _codes(hits):
+    return [(ss.SCAN_RULES[rule].issue_code, line) for rule, line in hits]
+
+def test_scan_file_reports_first_line_per_rule(project):
+    hits = scan_file(str(project / "legacy/src/main/java/com/example/Legacy.java"))
+    assert sorted(_codes(hits)) == [("java.lang.boxing.constructor", 8), ("javax.xml.bind", 4),
+                                    ("sun.misc.BASE64Encoder", 3)]
+    assert scan_file(str(project / "modern/src/Empty.java")) == []
+
+def test_iter_java_files_skips_build_output(project):
+    names = sorted(p.rsplit("/", 1)[-1] for p in iter_java_files(project))
+    assert names == ["Empty.java", "Legacy.java", "Modern.java"]
+
+def test_rules_follow_version_range(project):
+    to_11 = {i.issue_code for i in SourceScanner(8, 11, max_workers=1).scan(project)}
+    to_17 = {i.issue_code for i in SourceScanner(8, 17, max_workers=1).scan(project)}
+    assert to_11 == {"sun.misc.BASE64Encoder", "javax.xml.bind"}
+    assert to_17 == to_11 | {"java.lang.boxing.constructor"}
+    assert SourceScanner(11, 17, max_workers=1).scan(project)[0].issue_code == "java.lang.boxing.constructor"
+
+def test_process_pool_matches_inline_scan(project, monkeypatch):
+    inline = SourceScanner(8, 21, max_workers=1).scan(project)
+    monkeypatch.setattr("src.analyzer.source_scanner.settings.TRIAGE_BATCH_SIZE", 1)
+    pooled = SourceScanner(8, 21, max_workers=2).scan(project)
+    assert sorted(i.model_dump_json() for i in pooled) == sorted(i.model_dump_json() for i in inline)
+
+def test_triage_runs_emt4j_only_on_flagged_modules(project):
+    analyzer = MagicMock()
+    analyzer.analyze_project.return_value = AnalysisReport(
+        project_name="legacy", from_version=8, to_version=17, timestamp="t", total_issues=1,
+        auto_fixable_count=0, issues_by_priority={},
+        issues_by_category={"removed_api": [EMT4JIssue(file_path="src/main/java/com/example/Legacy.java",
+                                                       issue_code="emt4j.code", priority="P1", description="d",
+                                                       suggestion="s", category="removed_api")]},
+    )
+
+    report = analyze_with_triage(analyzer, str(project), 8, 17)
+
+    analyzer.analyze_project.assert_called_once_with(str(project / "legacy"), 8, 17, fallback=False)
+    assert [i.issue_code for i in report.issues_by_category["removed_api"]] == ["emt4j.code"]
+    assert report.raw_report == {"source": "triage", "emt4j_modules": ["legacy"]}
+
+def test_triage_skips_emt4j_without_findings(project):
+    analyzer = MagicMock()
+    report = analyze_with_triage(analyzer, str(project / "modern"), 8, 11)
+    analyzer.analyze_project.assert_not_called()
+    assert report.total_issues == 0
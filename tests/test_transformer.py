@@ -0,0 +1,107 @@
+import subprocess
+import pytest
+from unittest.mock import patch
+from src.models.migration_plan import MigrationPhase
+from src.transformer.batching import batch_phases, composite_recipe_yaml, parse_phase_range, unmet_dependencies
+from src.transformer.openrewrite_wrapper import OpenRewriteTransformer
+from src.utils.build_modules import dependency_waves, discover_modules
+
+def _phase(number, recipes, dependencies=()):
+    return MigrationPhase(phase_number=number, name=f"Phase {number}", description="", risk_level="LOW",
+                          openrewrite_recipes=recipes, manual_steps=[], estimated_effort_hours=1,
+                          dependencies=list(dependencies))
+
+def test_parse_phase_range():
+    assert parse_phase_range("1-3") == [1, 2, 3]
+    assert parse_phase_range("4,1-2") == [1, 2, 4]
+    with pytest.raises(ValueError):
+        parse_phase_range("3-1")
+
+def test_batches_split_on_unmet_dependencies():
+    phases = [_phase(1, ["a"]), _phase(2, ["b"], [1]), _phase(3, [], [2]),
+              _phase(4, ["c"], [3]), _phase(6, ["d"], [5])]
+    assert unmet_dependencies(phases) == {6: [5]}
+    assert [[p.phase_number for p in b] for b in batch_phases(phases[:4])] == [[1, 2, 4]]
+    assert [[p.phase_number for p in b] for b in batch_phases(phases, applied=[5])] == [[1, 2, 4, 6]]
+
+    assert "recipeList:\n- a\n- b\n" in composite_recipe_yaml(phases[:2])
+
+def test_run_phases_uses_one_invocation_per_batch(sample_project_path):
+    phases = [_phase(1, ["org.openrewrite.java.migrate.Java8toJava11"]),
+              _phase(2, ["org.openrewrite.java.migrate.UpgradeToJava17"], [1])]
+    transformer = OpenRewriteTransformer()
+    with patch.object(transformer.pool, "run_maven") as run_maven:
+        results = transformer.run_phases(sample_project_path, phases)
+
+    assert run_maven.call_count == 1
+    args = run_maven.call_args[0][1]
+    assert "-Drewrite.activeRecipes=com.javamodernize.batch.Phases1to2" in args
+    assert any(a.startswith("-Drewrite.configLocation=") for a in args)
+    assert sorted(results) == [1, 2] and all(r.success for r in results.values())
+
+def test_run_phases_skips_phases_with_unmet_dependencies(sample_project_path):
+    phases = [_phase(1, ["org.openrewrite.java.migrate.Java8toJava11"]),
+              _phase(3, ["org.openrewrite.java.migrate.UpgradeToJava21"], [2]),
+              _phase(4, ["org.openrewrite.staticanalysis.CommonStaticAnalysis"], [3])]
+    transformer = OpenRewriteTransformer()
+    with patch.object(transformer.pool, "run_maven") as run_maven:
+        results = transformer.run_phases(sample_project_path, phases, applied=[])
+
+    assert run_maven.call_count == 1
+    assert results[1].success
+    assert not results[3].success and "depends on phases [2]" in results[3].errors[0]
+    assert not results[4].success and "depends on phases [3]" in results[4].errors[0]
+    assert unmet_dependencies(phases, applied=[2]) == {}
+
+def _pom(artifact, modules=(), deps=()):
+    mods = "".join(f"<module>{m}</module>" for m in modules)
+    dep_xml = "".join(f"<dependency><groupId>g</groupId><artifactId>{d}</artifactId></dependency>" for d in deps)
+    return (f'<project xmlns="http://maven.apache.org/POM/4.0.0"><artifactId>{artifact}</artifactId>'
+            f'<modules>{mods}</modules><dependencies>{dep_xml}</dependencies></project>')
+
+@pytest.fixture
+def maven_reactor(tmp_path):
+    (tmp_path / "pom.xml").write_text(_pom("parent", ["core", "web", "batch"]))
+    for name, deps in [("core", []), ("web", ["core", "junit"]), ("batch", ["core"])]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "pom.xml").write_text(_pom(name, deps=deps))
+    return tmp_path
+
+def test_discover_maven_modules_and_waves(maven_reactor):
+    modules = discover_modules(maven_reactor)
+    assert {m.name: m.dependencies for m in modules} == {"parent": [], "core": [], "web": ["core"],
+                                                         "batch": ["core"]}
+    waves = dependency_waves([m for m in modules if not m.is_root])
+    assert [sorted(m.name for m in w) for w in waves] == [["core"], ["batch", "web"]]
+
+def test_discover_gradle_modules(tmp_path):
+    (tmp_path / "settings.gradle").write_text("rootProject.name = 'app'\ninclude ':lib', 'app:api'\n")
+    (tmp_path / "build.gradle").write_text("")
+    (tmp_path / "app" / "api").mkdir(parents=True)
+    (tmp_path / "app" / "api" / "build.gradle").write_text("dependencies { implementation project(':lib') }")
+    modules = {m.name: m for m in discover_modules(tmp_path)}
+    assert modules[":app:api"].path == "app/api" and modules[":app:api"].dependencies == [":lib"]
+
+@pytest.fixture
+def parallel_modules(monkeypatch):
+    monkeypatch.setattr("src.transformer.openrewrite_wrapper.settings.TRANSFORM_PARALLEL_MODULES", True)
+
+def test_modules_transformed_per_wave(maven_reactor, parallel_modules):
+    transformer = OpenRewriteTransformer()
+    with patch.object(transformer.pool, "run_maven") as run_maven:
+        result = transformer.run_recipes(str(maven_reactor), ["org.openrewrite.java.migrate.UpgradeToJava17"])
+
+    assert result.success
+    selected = [c[0][1][c[0][1].index("-pl") + 1] for c in run_maven.call_args_list]
+    assert selected[0] == "core" and sorted(selected[1:]) == ["batch", "web"]
+
+def test_uninstalled_siblings_fall_back_to_reactor_run(maven_reactor, parallel_modules):
+    def run_maven(project_path, args, **kwargs):
+        if "-pl" in args and args[args.index("-pl") + 1] != "core":
+            raise subprocess.CalledProcessError(1, "mvn", output="[ERROR] Could not resolve dependencies for g:web")
+    transformer = OpenRewriteTransformer()
+    with patch.object(transformer.pool, "run_maven", side_effect=run_maven) as mock:
+        result = transformer.run_recipes(str(maven_reactor), ["org.openrewrite.java.migrate.UpgradeToJava17"])
+
+    assert result.success
+    assert "-pl" not in mock.call_args_list[-1][0][1]
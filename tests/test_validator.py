@@ -0,0 +1,128 @@
+import subprocess
+import pytest
+from unittest.mock import patch
+from src.validator.compilation_validator import CompilationValidator
+from src.validator.test_impact import ClassDependencyIndex
+
+def _write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+@pytest.fixture
+def reactor(tmp_path):
+    pom = '<project><artifactId>{}</artifactId><modules>{}</modules></project>'
+    _write(tmp_path, "pom.xml", pom.format("parent", "<module>core</module><module>web</module>"))
+    _write(tmp_path, "core/pom.xml", pom.format("core", ""))
+    _write(tmp_path, "web/pom.xml",
+           '<project><artifactId>web</artifactId><dependencies><dependency>'
+           '<artifactId>core</artifactId></dependency></dependencies></project>')
+    _write(tmp_path, "core/src/main/java/com/acme/core/Money.java", "package com.acme.core;\nclass Money {}")
+    _write(tmp_path, "core/src/main/java/com/acme/core/Rates.java",
+           "package com.acme.core;\nclass Rates { Money m; }")
+    _write(tmp_path, "core/src/main/java/com/acme/core/Clock.java", "package com.acme.core;\nclass Clock {}")
+    _write(tmp_path, "core/src/test/java/com/acme/core/RatesTest.java",
+           "package com.acme.core;\nclass RatesTest { Rates r; }")
+    _write(tmp_path, "core/src/test/java/com/acme/core/ClockTest.java",
+           "package com.acme.core;\nclass ClockTest { Clock c; }")
+    _write(tmp_path, "web/src/main/java/com/acme/web/Checkout.java",
+           "package com.acme.web;\nimport com.acme.core.*;\n// Clock is not used\nclass Checkout { Rates r; }")
+    _write(tmp_path, "web/src/test/java/com/acme/web/CheckoutTest.java",
+           "package com.acme.web;\nimport static com.acme.web.Checkout.total;\nclass CheckoutTest {}")
+    return tmp_path
+
+def test_impacted_tests_follow_reverse_dependencies(reactor):
+    index = ClassDependencyIndex.build(reactor)
+    changed = ["core/src/main/java/com/acme/core/Money.java"]
+    assert index.impacted_tests(changed) == ["com.acme.core.RatesTest", "com.acme.web.CheckoutTest"]
+    assert index.impacted_tests(["core/src/main/java/com/acme/core/Clock.java"]) == ["com.acme.core.ClockTest"]
+    assert index.impacted_tests(["core/pom.xml"]) is None
+
+def test_wildcard_imports_outside_the_project_are_ignored(tmp_path):
+    _write(tmp_path, "src/main/java/com/acme/Money.java", "package com.acme;\nimport java.util.*;\nclass Money {}")
+    _write(tmp_path, "src/test/java/com/acme/MoneyTest.java",
+           "package com.acme;\nimport java.util.*;\nclass MoneyTest { Money m; List<Money> all; }")
+    index = ClassDependencyIndex.build(tmp_path)
+    assert index.impacted_tests(["src/main/java/com/acme/Money.java"]) == ["com.acme.MoneyTest"]
+
+def test_nested_and_fully_qualified_references_are_dependencies(tmp_path):
+    _write(tmp_path, "src/main/java/com/acme/Outer.java", "package com.acme;\nclass Outer { static class Inner {} }")
+    _write(tmp_path, "src/main/java/com/acme/Rates.java", "package com.acme;\nclass Rates {}")
+    _write(tmp_path, "src/test/java/com/acme/web/InnerTest.java",
+           "package com.acme.web;\nimport com.acme.Outer.Inner;\nclass InnerTest { Inner i; }")
+    _write(tmp_path, "src/test/java/com/acme/web/RatesTest.java",
+           "package com.acme.web;\nclass RatesTest { com.acme.Rates r = new com.acme.Rates(); }")
+    index = ClassDependencyIndex.build(tmp_path)
+    assert index.impacted_tests(["src/main/java/com/acme/Outer.java"]) == ["com.acme.web.InnerTest"]
+    assert index.impacted_tests(["src/main/java/com/acme/Rates.java"]) == ["com.acme.web.RatesTest"]
+
+def test_unresolved_project_references_select_the_module_tests(reactor):
+    _write(reactor, "core/src/test/java/com/acme/core/GeneratedTest.java",
+           "package com.acme.core;\nimport com.acme.core.generated.Schema;\nclass GeneratedTest {}")
+    _write(reactor, "core/src/main/java/com/acme/core/generated/Codec.java",
+           "package com.acme.core.generated;\nclass Codec {}")
+    index = ClassDependencyIndex.build(reactor)
+    changed = ["core/src/main/java/com/acme/core/generated/Codec.java"]
+    assert index.impacted_tests(changed) == ["com.acme.core.ClockTest", "com.acme.core.GeneratedTest",
+                                             "com.acme.core.RatesTest"]
+
+def test_deleted_sources_select_their_dependents(reactor, build_logs):
+    deleted = "core/src/main/java/com/acme/core/Rates.java"
+    (reactor / deleted).unlink()
+    index = ClassDependencyIndex.build(reactor, [deleted])
+    assert index.impacted_tests([deleted]) == ["com.acme.core.RatesTest", "com.acme.web.CheckoutTest"]
+
+    validator = CompilationValidator()
+    with patch.object(validator.pool, "run_maven") as run_maven:
+        result = validator.validate_project(str(reactor), [deleted])
+    assert run_maven.call_args_list[0][0][1] == ["-pl", "core,web", "-am", "compile"]
+    assert result.selected_tests == ["com.acme.core.RatesTest", "com.acme.web.CheckoutTest"]
+
+@pytest.fixture
+def build_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.validator.compilation_validator.settings.VALIDATION_BUILD_LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setattr("src.validator.compilation_validator.settings.VALIDATION_COVERAGE_HISTORY",
+                        str(tmp_path / "coverage.json"))
+    monkeypatch.setattr("src.validator.compilation_validator.settings.VALIDATION_TEST_FORKS", 3)
+
+def test_incremental_maven_validation(reactor, build_logs):
+    validator = CompilationValidator()
+    with patch.object(validator.pool, "run_maven") as run_maven:
+        result = validator.validate_project(str(reactor), ["core/src/main/java/com/acme/core/Clock.java"])
+
+    compile_args, test_args = [c[0][1] for c in run_maven.call_args_list]
+    assert compile_args == ["-pl", "core", "-am", "compile"]
+    assert test_args[:3] == ["-pl", "core", "-am"] and "test" in test_args
+    assert "-Dtest=com.acme.core.ClockTest" in test_args and "-DforkCount=3" in test_args
+    assert result.compilation_passed and result.unit_tests_passed
+    assert result.selected_tests == ["com.acme.core.ClockTest"]
+
+SUREFIRE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="com.acme.core.RatesTest" tests="2" failures="1">
+  <testcase name="converts" classname="com.acme.core.RatesTest" time="0.25"/>
+  <testcase name="rounds" classname="com.acme.core.RatesTest" time="1.5">
+    <failure message="expected 2 but was 3" type="AssertionError">stack</failure>
+  </testcase>
+</testsuite>"""
+
+JACOCO_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<report name="core"><package name="com/acme/core"><counter type="LINE" missed="99" covered="1"/></package>
+<counter type="LINE" missed="25" covered="75"/><counter type="BRANCH" missed="1" covered="1"/></report>"""
+
+def test_full_validation_parses_reports_and_coverage(reactor, build_logs, tmp_path):
+    def fake_build(project_path, args, **kwargs):
+        kwargs["stdout"].write("[INFO] BUILD OUTPUT\n")
+        if "test" in args:
+            _write(reactor, "core/target/surefire-reports/TEST-com.acme.core.RatesTest.xml", SUREFIRE_XML)
+            _write(reactor, "core/target/site/jacoco/jacoco.xml", JACOCO_XML)
+            raise subprocess.CalledProcessError(1, args)
+
+    validator = CompilationValidator()
+    with patch.object(validator.pool, "run_maven", side_effect=fake_build):
+        result = validator.validate_project(str(reactor))
+
+    assert result.compilation_passed and not result.unit_tests_passed
+    assert result.failed_tests == ["com.acme.core.RatesTest#rounds"]
+    assert result.tests_run == 2 and result.test_cases[1].time_seconds == 1.5
+    assert result.line_coverage == 75.0
+    assert "BUILD OUTPUT" in open(result.build_log).read()